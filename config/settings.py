@@ -3,11 +3,51 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
 DEBUG_DIR = os.path.join(LOGS_DIR, 'debug')
+# Métricas (JSON por ejecución) y perfiles por etapa de main.py --profile
+METRICS_DIR = os.path.join(LOGS_DIR, 'metrics')
+PROFILES_DIR = os.path.join(LOGS_DIR, 'profiles')
+# Fichero de debug por ejecución en DEBUG_DIR (main.py --debug) y trazas de cada mano (--trace-hands)
+LOG_DEBUG = False
+LOG_HAND_TRACE = False
 
 RAW_HAND_HISTORIES_DIR = os.path.join(BASE_DIR, 'data', 'raw_hand_history')
 PROCESSED_HAND_HISTORIES_DIR = os.path.join(BASE_DIR, 'data', 'processed_hand_history')
 FORMATTED_HANDS_DIR = os.path.join(BASE_DIR, 'data', 'formatted_hands')
 ANALYZED_HANDS_DIR = os.path.join(BASE_DIR, 'data', 'analyzed_hands')
+HAND_STORE_DIR = os.path.join(BASE_DIR, 'data', 'hand_store')
+DATABASE_PATH = os.path.join(BASE_DIR, 'data', 'database', 'hands.db')
+HAND_INDEX_PATH = os.path.join(BASE_DIR, 'data', 'database', 'hand_index.bin')
+WATCH_STATE_DIR = os.path.join(BASE_DIR, 'data', 'watch')
+COLLECTOR_MANIFEST_PATH = os.path.join(BASE_DIR, 'data', 'database', 'collector_manifest.json')
+# Backends a los que ya se importó el histórico anterior (formatted_hands y backups)
+HISTORY_IMPORT_PATH = os.path.join(BASE_DIR, 'data', 'database', 'history_import.json')
+EQUITY_DIR = os.path.join(BASE_DIR, 'data', 'equity')
+
+PREFLOP_EQUITY_CACHE_PATH = os.path.join(EQUITY_DIR, 'preflop_equity.npy')
+
+# Base de datos de manos: 'sqlite' o 'columnar' (almacén de segmentos en HAND_STORE_DIR)
+DB_BACKEND = 'sqlite'
+# Segmentos del almacén columnar a partir de los que insert_hands une los del final
+HAND_STORE_MAX_SEGMENTS = 16
+
+# Repetir la importación del histórico aunque ya se hiciera para este backend (main.py --import-history)
+FORCE_HISTORY_IMPORT = False
+
+# Guardar cada mano también como .txt en processed_hand_history/<room>/debug
+SAVE_PROCESSED_HANDS = False
+
+# Procesos para parsear manos (1 = secuencial) y manos por bloque enviado a cada proceso
+PARSER_WORKERS = 1
+PARSER_CHUNK_SIZE = 250
+
+# Manos cargadas en memoria (HandTable) por bloque en el recorrido de los analizadores
+SCAN_CHUNK_HANDS = 20000
+
+# Segundos entre comprobaciones del directorio del cliente en modo watch
+WATCH_INTERVAL = 0.5
+
+# Segundos sin cambios para que el collector dé por cerrado un fichero del cliente
+COLLECTOR_MIN_AGE = 120
 
 POKERSTARS_HAND_HISTORY_PATH = r"C:\Users\Pablo\AppData\Local\PokerStars.ES\HandHistory\SrLyce"
 #POKERSTARS_HAND_HISTORY_PATH = r"C:\Users\PABLO\Documents\projects\SrLyce"
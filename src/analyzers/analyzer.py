@@ -1,7 +1,11 @@
-
 from config import settings
-import os
 import logging
+import time
+from collections import defaultdict
+from src.base.base_analyzer import ANALYZER_REGISTRY, BaseAnalyzer
+from src.database.db_manager_factory import create_db_manager
+from src.utils.metrics import metrics
+# Los módulos de analizadores se importan para que se registren
 from src.analyzers.preflop_analyzer import PreflopAnalyzer
 from src.analyzers.pot_analyzer import PotAnalyzer
 
@@ -14,20 +18,66 @@ class Analyzer():
         self.analyzed_dir = settings.ANALYZED_HANDS_DIR
 
         self.analyzers = [
-            PreflopAnalyzer(self.analyzed_dir, self.formatted_dir, self.hero_name),
-            PotAnalyzer(self.analyzed_dir, self.formatted_dir, self.hero_name)
+            analyzer_cls(self.analyzed_dir, self.formatted_dir, self.hero_name)
+            for analyzer_cls in ANALYZER_REGISTRY
         ]
 
         analyzer_logger.debug("PokerStars Analyzer initializated.")
+        analyzer_logger.debug(f"Registered analyzers: {[a.__class__.__name__ for a in self.analyzers]}")
         analyzer_logger.debug(f"Formatted path: {self.formatted_dir}")
         analyzer_logger.debug(f"Analyzed path: {self.analyzed_dir}")
 
         if active:
             self.execute_analyzers()
 
+    def add_analyzer(self, analyzer: BaseAnalyzer) -> None:
+        self.analyzers.append(analyzer)
+
     def execute_analyzers(self) -> None:
         analyzer_logger.info("Starting analysis of PokerStars hands...")
+        with create_db_manager() as db:
+            last_seq = db.last_seq()
+
+            # Analizadores al día comparten un único recorrido; uno nuevo (o reiniciado)
+            # necesita su propio recorrido desde su watermark
+            groups = defaultdict(list)
+            for analyzer in self.analyzers:
+                groups[analyzer.begin_analysis(last_seq)].append(analyzer)
+
+            for watermark, group in sorted(groups.items()):
+                where, params = self.combined_filter(group, db)
+                analyzer_logger.debug(
+                    f"Scanning hands {watermark}..{last_seq} for {[a.__class__.__name__ for a in group]}"
+                )
+                hands_count = 0
+                # Tiempo de cada analizador acumulado en local para no medir mano a mano en metrics
+                elapsed = [0.0] * len(group)
+                scan_start = time.perf_counter()
+                for hand_data in db.scan_hands(where=where, params=params, after_seq=watermark, until_seq=last_seq):
+                    hands_count += 1
+                    for i, analyzer in enumerate(group):
+                        start = time.perf_counter()
+                        analyzer.process_hand(hand_data)
+                        elapsed[i] += time.perf_counter() - start
+                scan_time = time.perf_counter() - scan_start
+                for analyzer, seconds in zip(group, elapsed):
+                    metrics.add_time(f"analyzer.{analyzer.__class__.__name__}.process_hand", seconds, hands_count)
+                # Lectura y decodificación de las manos: lo que no gastan los analizadores
+                metrics.add_time("analyzer.read_hands", scan_time - sum(elapsed), hands_count)
+                metrics.incr("analyzer.hands_scanned", hands_count)
+                analyzer_logger.debug(f"{hands_count} hands dispatched to {len(group)} analyzers")
+
         for analyzer in self.analyzers:
-            analyzer_logger.debug(f"Executing analyzer: {analyzer.__class__.__name__}")
-            analyzer.analyze_all()
-        analyzer_logger.info("All analyzers executed successfully.")
\ No newline at end of file
+            analyzer_logger.debug(f"Finishing analyzer: {analyzer.__class__.__name__}")
+            with metrics.timer(f"analyzer.{analyzer.__class__.__name__}.end_analysis"):
+                analyzer.end_analysis(last_seq)
+        analyzer_logger.info("All analyzers executed successfully.")
+
+    @staticmethod
+    def combined_filter(analyzers, db):
+        # Una mano entra en el recorrido si algún analizador del grupo la quiere
+        if not db.SQL_FILTERS or any(a.HAND_FILTER is None for a in analyzers):
+            return None, ()
+        where = " OR ".join(f"({a.HAND_FILTER})" for a in analyzers)
+        params = tuple(p for a in analyzers for p in a.hand_filter_params())
+        return where, params
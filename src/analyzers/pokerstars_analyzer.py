@@ -6,8 +6,10 @@ import json
 from src.tables.preflop_ranges import preflop_ranges
 from collections import defaultdict
 from datetime import datetime
+from src.utils.logger_config import get_hand_trace_logger
 
 pokerstars_analyzer_logger = logging.getLogger(__name__)
+pokerstars_analyzer_trace_logger = get_hand_trace_logger(__name__)
 
 class PokerStarsAnalyzer(BaseAnalyzer):
     def __init__(self, name_room: str, active: bool):
@@ -39,11 +41,11 @@ class PokerStarsAnalyzer(BaseAnalyzer):
             filepath = os.path.join(self.formatted_dir, filename)
             with open(filepath, 'r', encoding='utf-8') as f:
                 hand_data = json.load(f)
-            pokerstars_analyzer_logger.debug(f"Analyzing hand: {filename}")
+            pokerstars_analyzer_trace_logger.debug("Analyzing hand: %s", filename)
             result = self.analyze_hand(hand_data)
             if result:
                 result["filename"] = filename
-                pokerstars_analyzer_logger.debug(f"Result for {filename}: {result}")
+                pokerstars_analyzer_trace_logger.debug("Result for %s: %s", filename, result)
                 all_results.append(result)
 
         # Guardar todo en un único archivo
@@ -62,12 +64,12 @@ class PokerStarsAnalyzer(BaseAnalyzer):
 
     def analyze_hand(self, hand_data: dict) -> dict:
         results = {}
-        pokerstars_analyzer_logger.debug(f"Analyzing PREFLOP hand data: {hand_data}")
+        pokerstars_analyzer_trace_logger.debug("Analyzing PREFLOP hand data: %s", hand_data)
         preflop_result = self.analyze_preflop(hand_data)
         if preflop_result:
             results["preflop"] = preflop_result
         
-        pokerstars_analyzer_logger.debug(f"Results for hand: {results}")
+        pokerstars_analyzer_trace_logger.debug("Results for hand: %s", results)
 
         return results if results else None
 
@@ -1,14 +1,21 @@
-from src.base.base_analyzer import BaseAnalyzer
+from src.base.base_analyzer import BaseAnalyzer, day_key, register_analyzer
 import os
 import logging
-import json
 from config import settings
-from collections import defaultdict
-from datetime import datetime
+from src.utils.logger_config import get_hand_trace_logger
 
 pot_analyzer_logger = logging.getLogger(__name__)
+pot_analyzer_trace_logger = get_hand_trace_logger(__name__)
 
+@register_analyzer
 class PotAnalyzer(BaseAnalyzer):
+    RESULTS_FILENAME = "pot.jsonl"
+    # Solo manos en las que hero no foldea preflop
+    HAND_FILTER = (
+        "NOT EXISTS (SELECT 1 FROM actions a WHERE a.hand_id = h.hand_id AND a.player = ? "
+        "AND a.street = 'preflop' AND a.action = 'FOLD')"
+    )
+
     def __init__(self, analyzed_dir, formatted_dir, hero_name: str):
         self.analyzed_dir = analyzed_dir
         self.formatted_dir = formatted_dir
@@ -19,14 +26,17 @@ class PotAnalyzer(BaseAnalyzer):
         super().__init__(self.formatted_dir, self.analyzed_dir_pot)
         pot_analyzer_logger.debug("Pot Analyzer initializated.")
 
+    def hand_filter_params(self) -> tuple:
+        return (self.hero_name,)
+
     def analyze_hand(self, hand_data: dict) -> dict:
         results = {}
-        pot_analyzer_logger.debug(f"Analyzing POT hand data: {hand_data}")
+        pot_analyzer_trace_logger.debug("Analyzing POT hand data: %s", hand_data)
         pot_result = self.analyze_pot(hand_data)
         if pot_result:
             results["pot"] = pot_result
         
-        pot_analyzer_logger.debug(f"Results for hand: {results}")
+        pot_analyzer_trace_logger.debug("Results for hand: %s", results)
 
         return results if results else None
 
@@ -41,7 +51,7 @@ class PotAnalyzer(BaseAnalyzer):
         # Validar si el hero ha foldeado en preflop
         for action in hero_preflop_actions:
             if action.get("action") == "FOLD":
-                pot_analyzer_logger.debug(f"Hero ({hero_name}) folded preflop. Skipping hand {hand_data.get('hand_id')}")
+                pot_analyzer_trace_logger.debug("Hero (%s) folded preflop. Skipping hand %s", hero_name, hand_data.get('hand_id'))
                 return None
         
         # Obtener el stack final del héroe
@@ -88,76 +98,58 @@ class PotAnalyzer(BaseAnalyzer):
             "is_winner": is_winner
         }
 
-    def generate_daily_or_reports(self):
-        try:
-            pot_analyzer_logger.info("Generando informes de Pots por día y el informe general...")
-            pot_analyzer_logger.debug("Inicializando el proceso de generación de informes.")
-
-            json_file = os.path.join(self.analyzed_dir_pot, "pot.json")
-
-            if not os.path.exists(json_file):
-                pot_analyzer_logger.critical(f"Error: El archivo JSON '{json_file}' no existe.")
-                return
-
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            reports_by_day = defaultdict(lambda: {
-                "total_pots": 0,
-                "ganados": 0,
-                "perdidos": 0,
-                "ganancias": 0.0,
-                "perdidas": 0.0
-            })
-            pot_analyzer_logger.debug(f"Procesando {len(data)} jugadas en total.")
-
-            total_ganados_global = 0
-            total_perdidos_global = 0
-            total_ganancias_global = 0.0
-            total_perdidas_global = 0.0
-            total_pots_global = 0
-
-            for item in data:
-                pot = item.get("pot", {})
-                date_played_str = pot.get("date_played")
-
-                if not date_played_str:
-                    pot_analyzer_logger.critical(f"Mano sin fecha encontrada. Saltando... Hand: {pot.get('hand_id', 'Unknown')}")
-                    continue
-                
-                try:
-                    date_obj = datetime.strptime(date_played_str, "%d-%m-%Y %H:%M:%S")
-                    formated_date = date_obj.strftime("%y%m%d")
-                except ValueError:
-                    pot_analyzer_logger.error(f"Formato de fecha inválido para '{date_played_str}'. Saltando...")
-                    continue
-                
-                total_pots_global += 1
-                is_winner = pot.get("is_winner", False)
-                pot_invested_bb = pot.get("pot_invested_bb", 0.0)
+    def merge_result(self, days: dict, result: dict):
+        pot = result.get("pot", {})
+        date_played_str = pot.get("date_played")
 
-                reports_by_day[formated_date]["total_pots"] += 1
-                
-                if is_winner:
-                    net_profit = pot.get("pot_final_bb", 0.0) - pot_invested_bb
-                    reports_by_day[formated_date]["ganados"] += 1
-                    reports_by_day[formated_date]["ganancias"] += net_profit
-                    
-                    total_ganados_global += 1
-                    total_ganancias_global += net_profit
-                else:
-                    reports_by_day[formated_date]["perdidos"] += 1
-                    reports_by_day[formated_date]["perdidas"] += pot_invested_bb
-                    
-                    total_perdidos_global += 1
-                    total_perdidas_global += pot_invested_bb
+        if not date_played_str:
+            pot_analyzer_logger.critical(f"Mano sin fecha encontrada. Saltando... Hand: {pot.get('hand_id', 'Unknown')}")
+            return None
 
-            # --- GENERACIÓN DEL INFORME DIARIO ---
-            for date, report_data in reports_by_day.items():
+        try:
+            formated_date = day_key(date_played_str)
+        except ValueError:
+            pot_analyzer_logger.error(f"Formato de fecha inválido para '{date_played_str}'. Saltando...")
+            return None
+
+        day = days.setdefault(formated_date, {
+            "total_pots": 0,
+            "ganados": 0,
+            "perdidos": 0,
+            "ganancias": 0.0,
+            "perdidas": 0.0
+        })
+        is_winner = pot.get("is_winner", False)
+        pot_invested_bb = pot.get("pot_invested_bb", 0.0)
+
+        day["total_pots"] += 1
+        if is_winner:
+            day["ganados"] += 1
+            day["ganancias"] += pot.get("pot_final_bb", 0.0) - pot_invested_bb
+        else:
+            day["perdidos"] += 1
+            day["perdidas"] += pot_invested_bb
+        return formated_date
+
+    def generate_daily_or_reports(self, days: dict, touched_days=None):
+        try:
+            pot_analyzer_logger.info("Generando informes de Pots por día y el informe general...")
+            touched_days = days.keys() if touched_days is None else touched_days
+            pot_analyzer_logger.debug(f"Actualizando {len(touched_days)} de {len(days)} días.")
+
+            total_ganados_global = sum(day["ganados"] for day in days.values())
+            total_perdidos_global = sum(day["perdidos"] for day in days.values())
+            total_ganancias_global = sum(day["ganancias"] for day in days.values())
+            total_perdidas_global = sum(day["perdidas"] for day in days.values())
+            total_pots_global = sum(day["total_pots"] for day in days.values())
+
+            # --- GENERACIÓN DEL INFORME DIARIO (solo días con manos nuevas) ---
+            for date in sorted(touched_days):
+                report_data = days[date]
                 output_filename = f"{date} - POT.txt"
                 output_file_path = os.path.join(self.analyzed_dir_pot, output_filename)
                 pot_analyzer_logger.debug(f"Generando informe para la fecha: {date} en {output_file_path}")
-                
+
                 with open(output_file_path, "w", encoding="utf-8") as f:
                     f.write(f"Informe de Pots jugados del día {date}\n")
                     f.write("=" * 40 + "\n\n")
@@ -194,38 +186,5 @@ class PotAnalyzer(BaseAnalyzer):
             pot_analyzer_logger.info("Informes de Pots generados correctamente.")
             pot_analyzer_logger.debug(f"Informe general guardado en: {brief_report_path}")
 
-        except FileNotFoundError:
-            pot_analyzer_logger.critical(f"Error: El archivo JSON '{json_file}' no se encontró.")
-        except json.JSONDecodeError:
-            pot_analyzer_logger.critical(f"Error: No se pudo decodificar el JSON del archivo '{json_file}'.")
         except Exception as e:
             pot_analyzer_logger.critical(f"Ocurrió un error inesperado: {e}")
-
-    def analyze_all(self) -> None:
-        pot_analyzer_logger.info("Starting analysis of all formatted hands...")
-
-        all_results = []
-
-        for filename in os.listdir(self.formatted_dir):
-            if not filename.endswith('.json'):
-                continue
-
-            filepath = os.path.join(self.formatted_dir, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                hand_data = json.load(f)
-            pot_analyzer_logger.debug(f"Analyzing hand: {filename}")
-            result = self.analyze_hand(hand_data)
-            if result:
-                result["filename"] = filename
-                pot_analyzer_logger.debug(f"Result for {filename}: {result}")
-                all_results.append(result)
-
-        # Guardar todo en un único archivo
-        result_path = os.path.join(self.analyzed_dir_pot, "pot.json")
-        with open(result_path, 'w', encoding='utf-8') as f_out:
-            json.dump(all_results, f_out, ensure_ascii=False, indent=2)
-
-        pot_analyzer_logger.info(
-            f"Se guardaron {len(all_results)} open raises en {result_path}"
-        )
-        self.generate_daily_or_reports()
\ No newline at end of file
@@ -1,15 +1,23 @@
-from src.base.base_analyzer import BaseAnalyzer
+from src.base.base_analyzer import BaseAnalyzer, day_key, register_analyzer
 import os
 import logging
-import json
 from config import settings
-from collections import defaultdict
-from datetime import datetime
 from src.tables.preflop_ranges import preflop_ranges
+from src.utils.logger_config import get_hand_trace_logger
 
 preflop_analyzer_logger = logging.getLogger(__name__)
+preflop_analyzer_trace_logger = get_hand_trace_logger(__name__)
 
+@register_analyzer
 class PreflopAnalyzer(BaseAnalyzer):
+    RESULTS_FILENAME = "open_raises.jsonl"
+    # Solo manos en las que hero no es BB y actúa preflop
+    HAND_FILTER = (
+        "EXISTS (SELECT 1 FROM players p WHERE p.hand_id = h.hand_id AND p.name = ? "
+        "AND (p.position IS NULL OR p.position != 'BB')) "
+        "AND EXISTS (SELECT 1 FROM actions a WHERE a.hand_id = h.hand_id AND a.player = ? AND a.street = 'preflop')"
+    )
+
     def __init__(self, analyzed_dir, formatted_dir, hero_name: str):
         self.analyzed_dir = analyzed_dir
         self.formatted_dir = formatted_dir
@@ -20,14 +28,17 @@ class PreflopAnalyzer(BaseAnalyzer):
         super().__init__(self.formatted_dir, self.analyzed_dir_or)
         preflop_analyzer_logger.debug("Preflop Analyzer initializated.")
 
+    def hand_filter_params(self) -> tuple:
+        return (self.hero_name, self.hero_name)
+
     def analyze_hand(self, hand_data: dict) -> dict:
         results = {}
-        preflop_analyzer_logger.debug(f"Analyzing PREFLOP hand data: {hand_data}")
+        preflop_analyzer_trace_logger.debug("Analyzing PREFLOP hand data: %s", hand_data)
         preflop_result = self.analyze_preflop(hand_data)
         if preflop_result:
             results["preflop"] = preflop_result
         
-        preflop_analyzer_logger.debug(f"Results for hand: {results}")
+        preflop_analyzer_trace_logger.debug("Results for hand: %s", results)
 
         return results if results else None
 
@@ -121,90 +132,78 @@ class PreflopAnalyzer(BaseAnalyzer):
         # En cualquier otro caso (call, check, etc.), no hay un error de OR.
         return None
 
-    def generate_daily_or_reports(self):
+    def merge_result(self, days: dict, result: dict):
+        preflop = result.get("preflop", {})
+        date_played_str = preflop.get("date_played")
+
+        if not date_played_str:
+            preflop_analyzer_logger.critical(f"Mano sin fecha encontrada. Saltando... Hand: {result.get('hand_id', 'Unknown')}")
+            return None
+
+        try:
+            formated_date = day_key(date_played_str)
+        except ValueError:
+            preflop_analyzer_logger.error(f"Formato de fecha inválido para '{date_played_str}'. Saltando...")
+            return None
+
+        day = days.setdefault(formated_date, {
+            "correct_opens": 0,
+            "incorrect_count": 0,
+            "incorrect_opens": [],
+            "made_opens": 0,
+            "missed_opens": 0
+        })
+        action_type = preflop.get("action_type")
+        correct_open = preflop.get("correct_open", False)
+
+        if correct_open:
+            day["correct_opens"] += 1
+            day["made_opens"] += 1
+        else:
+            position = preflop.get("position", "Unknown")
+            hand_str = preflop.get("hand_str", "Xx")
+
+            # Modificación clave: añadir el tipo de acción
+            if action_type == "OR_missed":
+                incorrect_play_string = f"{position} {hand_str} OR missed"
+                day["missed_opens"] += 1
+            else: # OR_made con mano incorrecta
+                incorrect_play_string = f"{position} {hand_str} OR made"
+                day["made_opens"] += 1
+
+            if incorrect_play_string not in day["incorrect_opens"]:
+                day["incorrect_opens"].append(incorrect_play_string)
+                day["incorrect_opens"].sort()
+            day["incorrect_count"] += 1
+        return formated_date
+
+    def generate_daily_or_reports(self, days: dict, touched_days=None):
         try:
             preflop_analyzer_logger.info("Generando informes de Open Raises por día y el informe general...")
-            preflop_analyzer_logger.debug("Inicializando el proceso de generación de informes.")
-
-            json_file = os.path.join(self.analyzed_dir_or, "open_raises.json")
-
-            if not os.path.exists(json_file):
-                preflop_analyzer_logger.critical(f"Error: El archivo JSON '{json_file}' no existe.")
-                return
-
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            reports_by_day = defaultdict(lambda: {
-                "correct_opens": 0,
-                "incorrect_opens": set(),
-                "made_opens": 0,
-                "missed_opens": 0
-            })
-            preflop_analyzer_logger.debug(f"Procesando {len(data)} jugadas en total.")
-
-            total_correct_global = 0
-            total_incorrect_global = 0
-            total_made_global = 0
-            total_missed_global = 0
-
-            for item in data:
-                preflop = item.get("preflop", {})
-                date_played_str = preflop.get("date_played")
-
-                if not date_played_str:
-                    preflop_analyzer_logger.critical(f"Mano sin fecha encontrada. Saltando... Hand: {item.get('filename', 'Unknown')}")
-                    continue
-
-                try:
-                    date_obj = datetime.strptime(date_played_str, "%d-%m-%Y %H:%M:%S")
-                    formated_date = date_obj.strftime("%y%m%d")
-                except ValueError:
-                    preflop_analyzer_logger.error(f"Formato de fecha inválido para '{date_played_str}'. Saltando...")
-                    continue
-                
-                action_type = preflop.get("action_type")
-                correct_open = preflop.get("correct_open", False)
-
-                if correct_open:
-                    reports_by_day[formated_date]["correct_opens"] += 1
-                    reports_by_day[formated_date]["made_opens"] += 1
-                    total_correct_global += 1
-                    total_made_global += 1
-                else:
-                    position = preflop.get("position", "Unknown")
-                    hand_str = preflop.get("hand_str", "Xx")
-                    
-                    # Modificación clave: añadir el tipo de acción
-                    if action_type == "OR_missed":
-                        incorrect_play_string = f"{position} {hand_str} OR missed"
-                        reports_by_day[formated_date]["missed_opens"] += 1
-                        total_missed_global += 1
-                    else: # OR_made con mano incorrecta
-                        incorrect_play_string = f"{position} {hand_str} OR made"
-                        reports_by_day[formated_date]["made_opens"] += 1
-                        total_made_global += 1
-                    
-                    reports_by_day[formated_date]["incorrect_opens"].add(incorrect_play_string)
-                    total_incorrect_global += 1
-            
-            preflop_analyzer_logger.debug(f"Reports sets for days: {reports_by_day}")
+            touched_days = days.keys() if touched_days is None else touched_days
+            preflop_analyzer_logger.debug(f"Actualizando {len(touched_days)} de {len(days)} días.")
 
-            # --- GENERACIÓN DEL INFORME DIARIO ---
-            for date, report_data in reports_by_day.items():
+            total_correct_global = sum(day["correct_opens"] for day in days.values())
+            total_incorrect_global = sum(day["incorrect_count"] for day in days.values())
+            total_made_global = sum(day["made_opens"] for day in days.values())
+            total_missed_global = sum(day["missed_opens"] for day in days.values())
+
+            # --- GENERACIÓN DEL INFORME DIARIO (solo días con manos nuevas) ---
+            for date in sorted(touched_days):
+                report_data = days[date]
                 output_filename = f"{date} - OR.txt"
                 output_file_path = os.path.join(self.analyzed_dir_or, output_filename)
                 preflop_analyzer_logger.debug(f"Generando informe para la fecha: {date} en {output_file_path}")
-                
+
+                correct_count = report_data["correct_opens"]
+                incorrect_plays = report_data["incorrect_opens"]
+                incorrect_count = len(incorrect_plays)
+                made_count = report_data["made_opens"]
+                missed_count = report_data["missed_opens"]
+
                 with open(output_file_path, "w", encoding="utf-8") as f:
                     f.write(f"Informe de Open Raises del día {date}\n")
                     f.write("=" * 40 + "\n\n")
-                    
-                    correct_count = report_data["correct_opens"]
-                    incorrect_plays = report_data["incorrect_opens"]
-                    incorrect_count = len(incorrect_plays)
-                    made_count = report_data["made_opens"]
-                    missed_count = report_data["missed_opens"]
 
                     total_plays = made_count + missed_count
                     
@@ -223,9 +222,7 @@ class PreflopAnalyzer(BaseAnalyzer):
 
                     if incorrect_count > 0:
                         f.write("Detalles de las manos incorrectas:\n")
-                        unique_incorrect_plays = sorted(list(incorrect_plays))
-                        
-                        for play_string in unique_incorrect_plays:
+                        for play_string in incorrect_plays:
                             f.write(f"- {play_string}\n")
 
             # --- GENERACIÓN DEL INFORME GENERAL ---
@@ -254,38 +251,5 @@ class PreflopAnalyzer(BaseAnalyzer):
             preflop_analyzer_logger.info("Informes de Open Raises generados correctamente.")
             preflop_analyzer_logger.debug(f"Informe general guardado en: {brief_report_path}")
 
-        except FileNotFoundError:
-            preflop_analyzer_logger.critical(f"Error: El archivo JSON '{json_file}' no se encontró.")
-        except json.JSONDecodeError:
-            preflop_analyzer_logger.critical(f"Error: No se pudo decodificar el JSON del archivo '{json_file}'.")
         except Exception as e:
             preflop_analyzer_logger.critical(f"Ocurrió un error inesperado: {e}")
-
-    def analyze_all(self) -> None:
-        preflop_analyzer_logger.info("Starting analysis of all formatted hands...")
-    
-        all_results = []
-
-        for filename in os.listdir(self.formatted_dir):
-            if not filename.endswith('.json'):
-                continue
-
-            filepath = os.path.join(self.formatted_dir, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                hand_data = json.load(f)
-            preflop_analyzer_logger.debug(f"Analyzing hand: {filename}")
-            result = self.analyze_hand(hand_data)
-            if result:
-                result["filename"] = filename
-                preflop_analyzer_logger.debug(f"Result for {filename}: {result}")
-                all_results.append(result)
-
-        # Guardar todo en un único archivo
-        result_path = os.path.join(self.analyzed_dir_or, "open_raises.json")
-        with open(result_path, 'w', encoding='utf-8') as f_out:
-            json.dump(all_results, f_out, ensure_ascii=False, indent=2)
-
-        preflop_analyzer_logger.info(
-            f"Se guardaron {len(all_results)} open raises en {result_path}"
-        )
-        self.generate_daily_or_reports()
\ No newline at end of file
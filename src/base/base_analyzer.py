@@ -1,14 +1,153 @@
 import abc
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from src.database.db_manager_factory import create_db_manager
+from src.utils.metrics import metrics
+from src.utils.logger_config import get_hand_trace_logger
+
+base_analyzer_logger = logging.getLogger(__name__)
+base_analyzer_trace_logger = get_hand_trace_logger(__name__)
+
+# Clases de analizador registradas con @register_analyzer, en orden de registro
+ANALYZER_REGISTRY = []
+
+
+TIME_RE = re.compile(r"\d{1,2}:\d{1,2}:\d{1,2}")
+
+
+@lru_cache(maxsize=4096)
+def _day_key(date_part: str) -> str:
+    return datetime.strptime(date_part, "%d-%m-%Y").strftime("%y%m%d")
+
+
+metrics.add_collector(lambda: {"cache.day_key.hits": _day_key.cache_info().hits,
+                               "cache.day_key.misses": _day_key.cache_info().misses})
+
+
+def day_key(date_played: str) -> str:
+    """Día de una mano ('dd-mm-YYYY HH:MM:SS' -> 'yymmdd'). ValueError si el formato no es válido.
+
+    Solo se parsea una vez cada día distinto, no cada mano.
+    """
+    date_part, _, time_part = date_played.partition(" ")
+    if not TIME_RE.fullmatch(time_part):
+        raise ValueError(f"Invalid time in '{date_played}'")
+    return _day_key(date_part)
+
+
+def register_analyzer(cls):
+    """Registra un analizador para que Analyzer lo incluya en el recorrido compartido."""
+    if cls not in ANALYZER_REGISTRY:
+        ANALYZER_REGISTRY.append(cls)
+    return cls
+
 
 class BaseAnalyzer(abc.ABC):
+    STATE_FILENAME = "state.json"
+    # Fichero JSON Lines con los resultados de cada mano
+    RESULTS_FILENAME = "results.jsonl"
+    # Filtro SQL previo sobre la tabla hands (alias h); None para recibir todas las manos
+    HAND_FILTER = None
+
     def __init__(self, formatted_dir: str, analyzed_dir: str):
         self.formatted_dir = formatted_dir
         self.analyzed_dir = analyzed_dir
+        self.state = None
+        self.new_results = []
+        self.touched_days = set()
 
     @abc.abstractmethod
-    def analyze_all(self) -> None:
+    def analyze_hand(self, hand_data) -> dict:
         pass
 
     @abc.abstractmethod
-    def analyze_hand(self, hand_data) -> dict:
-        pass
\ No newline at end of file
+    def merge_result(self, days: dict, result: dict):
+        # Suma un resultado al agregado de su día y devuelve el día (o None si se descarta)
+        pass
+
+    @abc.abstractmethod
+    def generate_daily_or_reports(self, days: dict, touched_days=None):
+        # Genera los informes de touched_days (todos si es None) y el informe general
+        pass
+
+    def hand_filter_params(self) -> tuple:
+        return ()
+
+    def hand_filter(self, db) -> tuple:
+        """(where, params) del filtro previo, o (None, ()) si el backend no admite filtros SQL."""
+        if self.HAND_FILTER is None or not db.SQL_FILTERS:
+            return None, ()
+        return self.HAND_FILTER, self.hand_filter_params()
+
+    def load_state(self) -> dict:
+        # watermark: última secuencia de la base de datos ya analizada
+        # days: agregados por día acumulados en ejecuciones anteriores
+        state_path = os.path.join(self.analyzed_dir, self.STATE_FILENAME)
+        if not os.path.exists(state_path):
+            return {"watermark": 0, "days": {}}
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_state(self, state: dict) -> None:
+        state_path = os.path.join(self.analyzed_dir, self.STATE_FILENAME)
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, state_path)
+
+    def begin_analysis(self, last_seq: int) -> int:
+        """Prepara una pasada y devuelve la secuencia a partir de la que hay manos nuevas."""
+        self.state = self.load_state()
+        self.new_results = []
+        self.touched_days = set()
+        if self.state["watermark"] > last_seq:
+            base_analyzer_logger.warning(
+                f"{self.__class__.__name__}: la base de datos tiene menos manos que las ya analizadas. Se reinicia el análisis."
+            )
+            self.state = {"watermark": 0, "days": {}}
+        return self.state["watermark"]
+
+    def process_hand(self, hand_data: dict) -> None:
+        hand_id = hand_data.get("hand_id")
+        base_analyzer_trace_logger.debug("%s analyzing hand: %s", self.__class__.__name__, hand_id)
+        result = self.analyze_hand(hand_data)
+        if result:
+            result["hand_id"] = hand_id
+            base_analyzer_trace_logger.debug("Result for %s: %s", hand_id, result)
+            self.new_results.append(result)
+            # Los agregados por día se actualizan en memoria durante el recorrido
+            day = self.merge_result(self.state["days"], result)
+            if day:
+                self.touched_days.add(day)
+
+    def end_analysis(self, last_seq: int) -> None:
+        # Los resultados nuevos se añaden al final; si se empieza de cero se reescribe
+        result_path = os.path.join(self.analyzed_dir, self.RESULTS_FILENAME)
+        with open(result_path, 'a' if self.state["watermark"] else 'w', encoding='utf-8') as f_out:
+            for result in self.new_results:
+                f_out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+        self.state["watermark"] = last_seq
+        self.save_state(self.state)
+
+        base_analyzer_logger.info(
+            f"{self.__class__.__name__}: {len(self.new_results)} resultados nuevos guardados en {result_path}"
+        )
+        self.generate_daily_or_reports(self.state["days"], self.touched_days)
+        self.new_results = []
+        self.touched_days = set()
+
+    def analyze_all(self) -> None:
+        """Analiza las manos nuevas con un recorrido propio (fuera del Analyzer compartido)."""
+        with create_db_manager() as db:
+            last_seq = db.last_seq()
+            watermark = self.begin_analysis(last_seq)
+            where, params = self.hand_filter(db)
+            for hand_data in db.scan_hands(where=where, params=params, after_seq=watermark, until_seq=last_seq):
+                self.process_hand(hand_data)
+        self.end_analysis(last_seq)
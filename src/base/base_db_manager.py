@@ -0,0 +1,79 @@
+import abc
+import logging
+from typing import Any, Dict, Iterator, Optional
+
+from config import settings
+from src.models.hand_model import CompactHand, HandTable
+
+base_db_manager_logger = logging.getLogger(__name__)
+
+class BaseDBManager(abc.ABC):
+    # Si iter_hands/load_hands aceptan el filtro where en SQL sobre la tabla hands
+    SQL_FILTERS = True
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @abc.abstractmethod
+    def connect(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def create_tables(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def insert_hands(self, hands) -> int:
+        pass
+
+    @abc.abstractmethod
+    def hand_exists(self, hand_id: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def get_raw_text(self, hand_id: str) -> Optional[str]:
+        pass
+
+    @abc.abstractmethod
+    def count_hands(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def last_seq(self) -> int:
+        # Secuencia de inserción de la última mano (0 si no hay ninguna)
+        pass
+
+    @abc.abstractmethod
+    def iter_hands(self, where: Optional[str] = None, params: tuple = (), raw_text: bool = False,
+                   after_seq: int = 0, until_seq: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        # where es un filtro SQL sobre la tabla hands (alias h). Los backends sin
+        # SQL (SQL_FILTERS = False) lanzan NotImplementedError si se les pasa. Los
+        # analizadores vuelven a comprobar cada mano: el filtro solo descarta antes.
+        # after_seq/until_seq limitan el recorrido a las manos insertadas en ese tramo.
+        pass
+
+    def load_hands(self, where: Optional[str] = None, params: tuple = (),
+                   after_seq: int = 0, until_seq: Optional[int] = None) -> HandTable:
+        # Carga las manos en memoria en formato compacto; el raw_text de cada
+        # mano se lee de la base de datos solo cuando se pide.
+        table = HandTable(raw_text_loader=self.get_raw_text)
+        table.extend(self.iter_hands(where, params, raw_text=False, after_seq=after_seq, until_seq=until_seq))
+        base_db_manager_logger.debug(f"{len(table)} manos cargadas en memoria ({table.nbytes() / 1e6:.1f} MB)")
+        return table
+
+    def scan_hands(self, where: Optional[str] = None, params: tuple = (), after_seq: int = 0,
+                   until_seq: Optional[int] = None, chunk_size: Optional[int] = None) -> Iterator[CompactHand]:
+        # Recorre las manos como vistas de HandTable, cargando como mucho chunk_size
+        # manos a la vez para que la memoria no crezca con el histórico
+        until_seq = self.last_seq() if until_seq is None else until_seq
+        chunk_size = chunk_size or settings.SCAN_CHUNK_HANDS
+        for start in range(after_seq, until_seq, chunk_size):
+            yield from self.load_hands(where, params, after_seq=start, until_seq=min(start + chunk_size, until_seq))
@@ -1,19 +1,52 @@
 from src.base.base_collector import BaseCollector
 import os
+import errno
+import hashlib
+import json
 import shutil
+import time
 import logging
-import filecmp
 
 from config import settings
+from src.utils.metrics import metrics
 
 pokerstars_collector_logger = logging.getLogger(__name__)
 
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file(source_path: str, end_path: str) -> str:
+    """Copia source_path en end_path por bloques y devuelve el hash del contenido.
+
+    Se escribe en un .part y se renombra al final, así que end_path nunca queda a medias.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    tmp_path = end_path + ".part"
+    with open(source_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            dst.write(chunk)
+    shutil.copystat(source_path, tmp_path)
+    os.replace(tmp_path, end_path)
+    return digest.hexdigest()
+
+
 class PokerStarsCollector(BaseCollector):
     def __init__(self, name_room: str, active: bool):
         source_dir = settings.POKERSTARS_HAND_HISTORY_PATH
         end_dir = os.path.join(settings.RAW_HAND_HISTORIES_DIR, name_room)
 
         super().__init__(source_dir, end_dir)
+        self.manifest_path = settings.COLLECTOR_MANIFEST_PATH
+        self.manifest = {}
         pokerstars_collector_logger.info("PokerStars Collector initializated.")
         pokerstars_collector_logger.debug(f"Source path: {source_dir}")
         pokerstars_collector_logger.debug(f"Destiny path: {end_dir}")
@@ -26,6 +59,26 @@ class PokerStarsCollector(BaseCollector):
         os.makedirs(self.end_dir, exist_ok=True)
         pokerstars_collector_logger.info("Destination directory checked.")
 
+    def load_manifest(self) -> None:
+        # filename -> {"size", "mtime_ns", "hash"} de cada fichero ya recogido. Un fichero
+        # movido con os.replace no se lee, así que su hash es None hasta que hace falta
+        # compararlo (destination_hash), y entonces se calcula y se guarda
+        self.manifest = {}
+        if not os.path.isfile(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            pokerstars_collector_logger.error(f"Could not read collector manifest {self.manifest_path}: {e}")
+
+    def save_manifest(self) -> None:
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
     def collect_files(self):
         self.checkDestinationFolder()
         files_count = 0
@@ -34,40 +87,109 @@ class PokerStarsCollector(BaseCollector):
             pokerstars_collector_logger.critical(f"Source directory does not exist: {self.source_dir}")
             return 0
 
+        self.load_manifest()
         try:
-            all_files = os.listdir(self.source_dir)
-            hand_history_files = [f for f in all_files if f.endswith('.txt')]
+            with os.scandir(self.source_dir) as entries:
+                hand_history_files = [e for e in entries if e.name.endswith('.txt') and e.is_file()]
 
             if not hand_history_files:
                 pokerstars_collector_logger.warning("There aren't files at source directory")
                 return 0
 
-            for filename in hand_history_files:
-                source_path = os.path.join(self.source_dir, filename)
-                end_path = os.path.join(self.end_dir, filename)
-
-                if not os.path.exists(end_path):
-                    try:
-                        shutil.copy2(source_path, end_path)
+            now = time.time()
+            for entry in hand_history_files:
+                try:
+                    if self.collect_file(entry, now):
                         files_count += 1
-                        pokerstars_collector_logger.debug(f"File copied: {filename}")
-
-                        os.remove(source_path)
-                        pokerstars_collector_logger.debug(f"File deleted: {filename}")
-                    except Exception as e:
-                        pokerstars_collector_logger.critical(f"Error critical: {e}")
-                else:
-                    pokerstars_collector_logger.warning(f"File already exists at destination: {filename}")
-                    try:
-                        if filecmp.cmp(source_path, end_path, shallow=False):
-                            os.remove(source_path)
-                            pokerstars_collector_logger.debug(f"File deleted: {filename}")
-                    except Exception as e:
-                        pokerstars_collector_logger.critical(f"Error critical: {e}")
-            
-            pokerstars_collector_logger.debug(f"Recollect of Pokerstars Collected ended with success. Files copied: {files_count}")
+                except Exception as e:
+                    pokerstars_collector_logger.critical(f"Error critical collecting {entry.name}: {e}")
+
+            pokerstars_collector_logger.debug(f"Recollect of Pokerstars Collected ended with success. Files moved: {files_count}")
 
         except Exception as e:
             pokerstars_collector_logger.critical(f"Unexpected error during collection: {e}")
+        finally:
+            self.save_manifest()
+
+        return files_count
 
-        return files_count
\ No newline at end of file
+    def collect_file(self, entry: os.DirEntry, now: float) -> bool:
+        """Mueve un fichero de historial al directorio raw. Devuelve True si se movió."""
+        filename = entry.name
+        stat = entry.stat()
+        end_path = os.path.join(self.end_dir, filename)
+
+        # El cliente sigue escribiendo en el fichero mientras la mesa está abierta
+        if now - stat.st_mtime < settings.COLLECTOR_MIN_AGE:
+            pokerstars_collector_logger.debug(f"File {filename} modified recently. Leaving it for the next run.")
+            return False
+
+        record = self.manifest.get(filename)
+        if record and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+            # Ya recogido con este mismo contenido: la copia en origen sobra
+            pokerstars_collector_logger.debug(f"File {filename} already collected. Deleting source copy.")
+            self.remove_source(entry.path)
+            return False
+
+        if os.path.exists(end_path):
+            pokerstars_collector_logger.warning(f"File already exists at destination: {filename}")
+            source_hash = file_hash(entry.path)
+            if source_hash != self.destination_hash(filename, end_path):
+                pokerstars_collector_logger.critical(f"File {filename} differs from the one at destination. Keeping both.")
+                return False
+            self.manifest[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": source_hash}
+            self.remove_source(entry.path)
+            return False
+
+        content_hash = self.move_file(entry.path, end_path)
+        if content_hash is False:
+            return False
+        self.manifest[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+        metrics.incr("collector.files_moved")
+        metrics.incr("collector.bytes_moved", stat.st_size)
+        pokerstars_collector_logger.debug(f"File moved: {filename}")
+        return True
+
+    def destination_hash(self, filename: str, end_path: str) -> str:
+        """Hash del fichero ya recogido en end_path, calculado la primera vez que se pide.
+
+        Se reutiliza el del manifiesto mientras end_path conserve su tamaño y mtime
+        (os.replace los mantiene); si no, se lee el fichero y se guarda el nuevo hash.
+        """
+        stat = os.stat(end_path)
+        record = self.manifest.get(filename)
+        if record and record.get("hash") and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+            return record["hash"]
+        content_hash = file_hash(end_path)
+        self.manifest[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+        return content_hash
+
+    def move_file(self, source_path: str, end_path: str):
+        """Mueve con os.replace; entre sistemas de ficheros distintos copia por bloques y borra.
+
+        Devuelve el hash si hubo que leer el fichero, None si bastó con renombrar
+        y False si el fichero está en uso y se deja para la próxima vez. Renombrar
+        no lee el contenido y hashearlo aquí costaría una lectura por fichero para
+        un dato que solo se usa en conflictos: destination_hash lo calcula entonces.
+        """
+        try:
+            os.replace(source_path, end_path)
+            return None
+        except PermissionError:
+            pokerstars_collector_logger.warning(f"File {source_path} is in use. Leaving it for the next run.")
+            return False
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+        content_hash = copy_file(source_path, end_path)
+        self.remove_source(source_path)
+        return content_hash
+
+    @staticmethod
+    def remove_source(source_path: str) -> None:
+        try:
+            os.remove(source_path)
+            pokerstars_collector_logger.debug(f"File deleted: {source_path}")
+        except PermissionError:
+            pokerstars_collector_logger.warning(f"File {source_path} is in use. It will be deleted on the next run.")
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+
+from config import settings
+from src.utils.metrics import metrics
+
+pokerstars_tailer_logger = logging.getLogger(__name__)
+
+
+def complete_hands_end(data: bytes) -> int:
+    # El cliente cierra cada mano con líneas en blanco: todo lo anterior a la
+    # última línea en blanco son manos completas; lo que sigue aún se está escribiendo
+    end = max(data.rfind(b"\n\n"), data.rfind(b"\n\r\n"))
+    if end < 0:
+        return 0
+    return data.index(b"\n", end + 1) + 1
+
+
+class PokerStarsTailer:
+    """Sigue los historiales que el cliente de PokerStars va escribiendo.
+
+    Guarda por fichero el offset hasta el que ya se leyeron manos completas,
+    junto con su tamaño y mtime, así que cada poll solo abre los ficheros que
+    han crecido y solo lee los bytes nuevos. Los offsets se persisten para
+    continuar donde se quedó al reiniciar.
+    """
+
+    def __init__(self, name_room: str, source_dir: str = None):
+        self.name_room = name_room
+        self.source_dir = source_dir or settings.POKERSTARS_HAND_HISTORY_PATH
+        self.state_path = os.path.join(settings.WATCH_STATE_DIR, f"{name_room}.json")
+        self.files = {}
+        self.changed = False
+        self.load_state()
+
+        pokerstars_tailer_logger.info("PokerStars Tailer initializated.")
+        pokerstars_tailer_logger.debug(f"Source path: {self.source_dir}")
+
+    def load_state(self) -> None:
+        if not os.path.isfile(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f)
+        except (OSError, ValueError) as e:
+            pokerstars_tailer_logger.error(f"No se pudo leer el estado de {self.state_path}: {e}. Se empieza de cero.")
+            self.files = {}
+
+    def save_state(self) -> None:
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.files, f)
+        os.replace(tmp_path, self.state_path)
+        self.changed = False
+
+    def poll(self):
+        """Devuelve (filename, texto) con las manos completas nuevas de cada fichero."""
+        if not os.path.isdir(self.source_dir):
+            pokerstars_tailer_logger.critical(f"Source directory does not exist: {self.source_dir}")
+            return []
+
+        chunks = []
+        seen = set()
+        with os.scandir(self.source_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.txt') or not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                stat = entry.stat()
+                state = self.files.get(entry.name)
+                if state and state["size"] == stat.st_size and state["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+
+                offset = state["offset"] if state else 0
+                if stat.st_size < offset:
+                    pokerstars_tailer_logger.warning(f"File {entry.name} is smaller than before. Reading it again.")
+                    offset = 0
+                text, consumed = self.read_new_hands(entry.path, offset, stat.st_size)
+                if text:
+                    chunks.append((entry.name, text))
+                self.files[entry.name] = {"offset": offset + consumed, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                self.changed = True
+
+        # Ficheros que ya no están (movidos por el collector o borrados)
+        for filename in set(self.files) - seen:
+            del self.files[filename]
+            self.changed = True
+        return chunks
+
+    @staticmethod
+    def read_new_hands(path: str, offset: int, size: int):
+        """Lee de offset a size y devuelve (texto de las manos completas, bytes consumidos)."""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+        except OSError as e:
+            pokerstars_tailer_logger.error(f"Error reading {path}: {e}")
+            return "", 0
+        metrics.incr("watch.bytes_read", len(data))
+
+        end = complete_hands_end(data)
+        if not end:
+            return "", 0
+        try:
+            text = data[:end].decode('utf-8-sig' if offset == 0 else 'utf-8')
+        except UnicodeDecodeError as e:
+            pokerstars_tailer_logger.error(f"Error decoding {path} at offset {offset}: {e}")
+            return "", 0
+        return text.replace('\r\n', '\n'), end
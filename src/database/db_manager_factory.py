@@ -0,0 +1,19 @@
+import logging
+
+from config import settings
+from src.base.base_db_manager import BaseDBManager
+
+db_manager_factory_logger = logging.getLogger(__name__)
+
+
+def create_db_manager(backend: str = None) -> BaseDBManager:
+    """Devuelve el gestor de la base de datos de manos configurado en settings.DB_BACKEND."""
+    backend = backend or settings.DB_BACKEND
+    db_manager_factory_logger.debug(f"Creating hand database manager: {backend}")
+    if backend == "sqlite":
+        from src.database.implementations.sqlite_manager import SQLiteManager
+        return SQLiteManager(settings.DATABASE_PATH)
+    if backend == "columnar":
+        from src.database.hand_store import HandStore
+        return HandStore(settings.HAND_STORE_DIR)
+    raise ValueError(f"Unknown database backend: {backend}")
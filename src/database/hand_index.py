@@ -0,0 +1,94 @@
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+from config import settings
+
+hand_index_logger = logging.getLogger(__name__)
+
+# Fichero append-only de registros de 16 bytes: hand_id y hash del texto original
+RECORD = np.dtype([("hand_id", "<i8"), ("hash", "<u8")])
+
+
+def content_hash(hand_text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(hand_text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HandIndex:
+    """Índice persistente hand_id -> hash del contenido de la mano.
+
+    Se carga entero en un dict al abrir, así que comprobar si una mano ya está
+    guardada (y si su contenido coincide) no lee nada de disco. Las manos nuevas
+    se añaden al final del fichero con flush().
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.HAND_INDEX_PATH
+        self.hashes = {}
+        self._pending = []
+
+    @classmethod
+    def open(cls, db) -> "HandIndex":
+        """Carga el índice y lo reconstruye desde db si no cuadra con ella."""
+        index = cls()
+        index.load()
+        count = db.count_hands()
+        if len(index) != count:
+            hand_index_logger.warning(
+                f"El índice de manos tiene {len(index)} manos y la base de datos {count}. Reconstruyendo..."
+            )
+            index.rebuild(db)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __contains__(self, hand_id) -> bool:
+        return int(hand_id) in self.hashes
+
+    def get(self, hand_id):
+        return self.hashes.get(int(hand_id))
+
+    def load(self) -> None:
+        self.hashes = {}
+        if not os.path.isfile(self.path):
+            return
+        data = np.fromfile(self.path, dtype=np.uint8)
+        # Un registro a medias (escritura interrumpida) se descarta
+        usable = len(data) - len(data) % RECORD.itemsize
+        records = data[:usable].view(RECORD)
+        self.hashes = dict(zip(records["hand_id"].tolist(), records["hash"].tolist()))
+        hand_index_logger.debug(f"{len(self.hashes)} manos cargadas del índice {self.path}")
+
+    def add(self, hand_id, hand_text: str) -> None:
+        hand_id = int(hand_id)
+        if hand_id in self.hashes:
+            return
+        digest = content_hash(hand_text)
+        self.hashes[hand_id] = digest
+        self._pending.append((hand_id, digest))
+
+    def matches(self, hand_id, hand_text: str) -> bool:
+        """True si la mano guardada con ese id tiene el mismo contenido."""
+        return self.get(hand_id) == content_hash(hand_text)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(np.array(self._pending, dtype=RECORD).tobytes())
+        self._pending = []
+
+    def rebuild(self, db) -> None:
+        self.hashes = {int(hand["hand_id"]): content_hash(hand["raw_text"]) for hand in db.iter_hands(raw_text=True)}
+        self._pending = []
+        records = np.array(list(self.hashes.items()), dtype=RECORD)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(records.tobytes())
+        os.replace(tmp_path, self.path)
+        hand_index_logger.info(f"Índice de manos reconstruido con {len(self.hashes)} manos")
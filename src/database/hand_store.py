@@ -0,0 +1,687 @@
+import argparse
+import bisect
+import json
+import logging
+import os
+import struct
+import zlib
+from array import array
+
+import numpy as np
+
+from config import settings
+from src.base.base_db_manager import BaseDBManager
+from src.models.hand_model import ACTION_TYPES, CARD_CODES, CARDS, STREETS, HandTable
+
+hand_store_logger = logging.getLogger(__name__)
+
+# Formato de un segmento (.seg):
+#   MAGIC | u64 longitud del índice | índice JSON | columnas alineadas a 64 bytes
+# El índice guarda, por columna, dtype, forma y offset, así que cada columna se
+# abre con memory-mapping sin leer el resto del fichero.
+MAGIC = b"HSTORE01"
+ALIGNMENT = 64
+SEGMENT_SUFFIX = ".seg"
+# El texto original se comprime en bloques de este número de manos: leer una
+# mano solo descomprime su bloque
+RAW_BLOCK_HANDS = 32
+# Ficheros JSON por segmento al importar una carpeta (import_json_dir)
+IMPORT_BATCH_FILES = 500
+
+# Columnas de cada tabla. Los textos se guardan como código en el diccionario
+# de cadenas del segmento (-1 = None); las cartas como entero 0..51 (-1 = vacío).
+TABLES = {
+    "hands": ("hand_id", "room_name", "game_type", "sb", "bb", "date_played", "table_name", "table_size",
+              "board", "winner", "win_amount", "rake", "player_offset", "action_offset", "raw_offset"),
+    "players": ("name", "stack", "seat", "position", "cards", "active"),
+    "actions": ("street", "player", "action", "amount"),
+}
+# Columnas que guardan códigos del diccionario de cadenas
+STRING_COLUMNS = ("room_name", "game_type", "date_played", "table_name", "winner", "name", "position", "player")
+# Columnas de offsets de la tabla hands (n + 1 elementos)
+OFFSET_COLUMNS = ("player_offset", "action_offset", "raw_offset")
+
+
+class _StringPool:
+    def __init__(self):
+        self.codes = {}
+
+    def code(self, value) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def columns(self) -> dict:
+        encoded = [s.encode("utf-8") for s in self.codes]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return {
+            "strings.offsets": offsets,
+            "strings.data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        }
+
+
+def _card_codes(cards, width: int) -> list:
+    codes = [CARD_CODES[c] for c in cards[:width]]
+    return codes + [-1] * (width - len(codes))
+
+
+def _compress_raw(raw: bytes, raw_offsets) -> dict:
+    """Comprime el texto original en bloques de RAW_BLOCK_HANDS manos.
+
+    raw.block_rows guarda la primera fila de cada bloque y raw.block_offsets su
+    posición dentro de raw.data (ambos con un elemento final de cierre).
+    """
+    rows = len(raw_offsets) - 1
+    blocks = []
+    block_rows = [0]
+    block_offsets = [0]
+    for start in range(0, rows, RAW_BLOCK_HANDS):
+        stop = min(start + RAW_BLOCK_HANDS, rows)
+        block = zlib.compress(raw[raw_offsets[start]:raw_offsets[stop]], 6)
+        blocks.append(block)
+        block_rows.append(stop)
+        block_offsets.append(block_offsets[-1] + len(block))
+    return {
+        "raw.data": np.frombuffer(b"".join(blocks), dtype=np.uint8),
+        "raw.block_rows": np.array(block_rows, dtype=np.int64),
+        "raw.block_offsets": np.array(block_offsets, dtype=np.int64),
+    }
+
+
+def _build_columns(hands) -> dict:
+    """Convierte una lista de manos (dicts) en las columnas de un segmento."""
+    pool = _StringPool()
+    h = {name: [] for name in TABLES["hands"]}
+    p = {name: [] for name in TABLES["players"]}
+    a = {name: [] for name in TABLES["actions"]}
+    raw_texts = []
+    h["player_offset"].append(0)
+    h["action_offset"].append(0)
+    h["raw_offset"].append(0)
+    raw_size = 0
+
+    for hand in hands:
+        h["hand_id"].append(int(hand["hand_id"]))
+        h["room_name"].append(pool.code(hand.get("room_name")))
+        h["game_type"].append(pool.code(hand.get("game_type")))
+        h["sb"].append(hand.get("sb", 0.0))
+        h["bb"].append(hand.get("bb", 0.0))
+        h["date_played"].append(pool.code(hand.get("date_played")))
+        h["table_name"].append(pool.code(hand.get("table_name")))
+        table_size = hand.get("table_size")
+        h["table_size"].append(-1 if table_size is None else table_size)
+        h["board"].append(_card_codes(hand.get("board", []), 5))
+        h["winner"].append(pool.code(hand.get("winner")))
+        h["win_amount"].append(hand.get("win_amount", 0.0))
+        h["rake"].append(hand.get("rake", 0.0))
+
+        for player in hand.get("players", []):
+            p["name"].append(pool.code(player["name"]))
+            p["stack"].append(player["stack"])
+            p["seat"].append(player["seat"])
+            p["position"].append(pool.code(player.get("position")))
+            p["cards"].append(_card_codes(player.get("cards", []), 2))
+            p["active"].append(bool(player.get("active")))
+        h["player_offset"].append(len(p["name"]))
+
+        for street_code, street in enumerate(STREETS):
+            for action in hand.get("actions", {}).get(street, []):
+                a["street"].append(street_code)
+                a["player"].append(pool.code(action["player"]))
+                a["action"].append(ACTION_TYPES.index(action["action"]))
+                a["amount"].append(action["amount"])
+        h["action_offset"].append(len(a["street"]))
+
+        raw = hand.get("raw_text", "").encode("utf-8")
+        raw_texts.append(raw)
+        raw_size += len(raw)
+        h["raw_offset"].append(raw_size)
+
+    dtypes = {
+        "hands": {"hand_id": np.int64, "sb": np.float64, "bb": np.float64, "table_size": np.int16,
+                  "board": np.int8, "win_amount": np.float64, "rake": np.float64, "raw_offset": np.int64},
+        "players": {"stack": np.float64, "seat": np.int16, "cards": np.int8, "active": np.bool_},
+        "actions": {"street": np.int8, "action": np.int8, "amount": np.float64},
+    }
+    columns = {}
+    for table, values in (("hands", h), ("players", p), ("actions", a)):
+        for name, column in values.items():
+            dtype = dtypes[table].get(name, np.int32)
+            array = np.array(column, dtype=dtype)
+            if name == "board" and not len(array):
+                array = array.reshape(0, 5)
+            elif name == "cards" and not len(array):
+                array = array.reshape(0, 2)
+            columns[f"{table}.{name}"] = array
+    columns.update(pool.columns())
+    # El texto original se guarda comprimido: solo se lee cuando se pide
+    columns.update(_compress_raw(b"".join(raw_texts), h["raw_offset"]))
+    return columns
+
+
+def _extend_array(target: array, values) -> None:
+    target.frombytes(np.ascontiguousarray(values, dtype=target.typecode).tobytes())
+
+
+def _merge_columns(segments) -> dict:
+    """Columnas de un segmento que une los dados, leyendo segmento a segmento.
+
+    Los códigos de cadenas se traducen al diccionario común y los offsets se
+    desplazan; el texto comprimido se copia por bloques sin descomprimir.
+    """
+    pool = _StringPool()
+    parts = {f"{table}.{name}": [] for table, names in TABLES.items() for name in names}
+    for name in OFFSET_COLUMNS:
+        parts[f"hands.{name}"].append(np.zeros(1, dtype=np.int64))
+    parts.update({"raw.data": [], "raw.block_rows": [np.zeros(1, dtype=np.int64)],
+                  "raw.block_offsets": [np.zeros(1, dtype=np.int64)]})
+    bases = dict.fromkeys(OFFSET_COLUMNS, 0)
+    hand_base = data_base = 0
+
+    for segment in segments:
+        mapping = np.array([pool.code(s) for s in segment.strings()] + [-1], dtype=np.int32)
+        for table, names in TABLES.items():
+            for name in names:
+                column = np.asarray(segment.column(f"{table}.{name}"))
+                if name in STRING_COLUMNS:
+                    column = mapping[column]
+                elif name in OFFSET_COLUMNS:
+                    column = column[1:].astype(np.int64) + bases[name]
+                    bases[name] = int(column[-1]) if len(column) else bases[name]
+                parts[f"{table}.{name}"].append(column)
+
+        raw = segment.raw_block_columns()
+        parts["raw.data"].append(raw["raw.data"])
+        parts["raw.block_rows"].append(raw["raw.block_rows"][1:] + hand_base)
+        parts["raw.block_offsets"].append(raw["raw.block_offsets"][1:] + data_base)
+        hand_base += len(segment)
+        data_base += len(raw["raw.data"])
+
+    columns = {}
+    for name, values in parts.items():
+        columns[name] = np.concatenate(values)
+    for name in OFFSET_COLUMNS:
+        columns[f"hands.{name}"] = columns[f"hands.{name}"].astype(np.int64 if name == "raw_offset" else np.int32)
+    columns.update(pool.columns())
+    return columns
+
+
+def write_segment(path: str, columns: dict, meta: dict = None) -> None:
+    """Escribe un segmento de forma atómica (fichero temporal + os.replace).
+
+    meta va en la cabecera junto al índice de columnas (p. ej. los segmentos que sustituye).
+    """
+    index = {"meta": meta or {}}
+    offset = 0
+    for name, array in columns.items():
+        array = np.ascontiguousarray(array)
+        columns[name] = array
+        index[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps(index).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in columns.items():
+            f.seek(data_start + index[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """Segmento de solo lectura: columnas abiertas bajo demanda con memory-mapping."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} no es un segmento del almacén de manos")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            self.index = json.loads(f.read(header_len).decode("utf-8"))
+        self.meta = self.index.pop("meta", {})
+        self.data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGNMENT) * ALIGNMENT
+        self._columns = {}
+        self._strings = None
+        self._raw_blocks = None
+        # Último bloque de texto descomprimido: (número de bloque, bytes)
+        self._raw_block = (None, b"")
+
+    def __len__(self):
+        return self.index["hands.hand_id"]["shape"][0]
+
+    def column(self, name: str) -> np.ndarray:
+        array = self._columns.get(name)
+        if array is None:
+            info = self.index[name]
+            shape = tuple(info["shape"])
+            if not np.prod(shape):
+                array = np.zeros(shape, dtype=np.dtype(info["dtype"]))
+            else:
+                array = np.memmap(self.path, dtype=np.dtype(info["dtype"]), mode="r",
+                                  offset=self.data_start + info["offset"], shape=shape)
+            self._columns[name] = array
+        return array
+
+    def strings(self) -> list:
+        if self._strings is None:
+            offsets = self.column("strings.offsets").tolist()
+            data = self.column("strings.data").tobytes()
+            self._strings = [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        return self._strings
+
+    def raw_blocks(self):
+        """(primera fila, offset comprimido) de cada bloque de texto, con cierre final.
+
+        Los segmentos anteriores a los bloques tienen todo el texto en un solo bloque.
+        """
+        if self._raw_blocks is None:
+            if "raw.block_rows" in self.index:
+                self._raw_blocks = (self.column("raw.block_rows").tolist(), self.column("raw.block_offsets").tolist())
+            else:
+                self._raw_blocks = ([0, len(self)], [0, self.index["raw.data"]["shape"][0]])
+        return self._raw_blocks
+
+    def raw_block_columns(self) -> dict:
+        """Columnas raw.* del segmento; las de un segmento antiguo se recomprimen en bloques."""
+        if "raw.block_rows" in self.index:
+            return {name: np.asarray(self.column(name)) for name in ("raw.data", "raw.block_rows", "raw.block_offsets")}
+        raw = zlib.decompress(self.column("raw.data").tobytes())
+        return _compress_raw(raw, self.column("hands.raw_offset").tolist())
+
+    def raw_text(self, row: int) -> str:
+        rows, offsets = self.raw_blocks()
+        block = bisect.bisect_right(rows, row) - 1
+        if self._raw_block[0] != block:
+            data = self.column("raw.data")[offsets[block]:offsets[block + 1]]
+            self._raw_block = (block, zlib.decompress(data.tobytes()))
+        raw_offset = self.column("hands.raw_offset")
+        base = raw_offset[rows[block]]
+        return self._raw_block[1][raw_offset[row] - base:raw_offset[row + 1] - base].decode("utf-8")
+
+    def iter_hands(self, raw_text: bool = False, start: int = 0, stop: int = None):
+        """Reconstruye las manos start..stop como el dict que producía StandardHand.__dict__."""
+        strings = self.strings()
+
+        def text(code):
+            return None if code < 0 else strings[code]
+
+        h = {name: self.column(f"hands.{name}").tolist() for name in TABLES["hands"]}
+        p = {name: self.column(f"players.{name}").tolist() for name in TABLES["players"]}
+        a = {name: self.column(f"actions.{name}").tolist() for name in TABLES["actions"]}
+
+        for row in range(start, len(self) if stop is None else stop):
+            players = []
+            for i in range(h["player_offset"][row], h["player_offset"][row + 1]):
+                players.append({
+                    "name": text(p["name"][i]),
+                    "stack": p["stack"][i],
+                    "seat": p["seat"][i],
+                    "position": text(p["position"][i]),
+                    "cards": [CARDS[c] for c in p["cards"][i] if c >= 0],
+                    "active": p["active"][i],
+                })
+            actions = {street: [] for street in STREETS}
+            for i in range(h["action_offset"][row], h["action_offset"][row + 1]):
+                actions[STREETS[a["street"][i]]].append({
+                    "player": text(a["player"][i]),
+                    "action": ACTION_TYPES[a["action"][i]],
+                    "amount": a["amount"][i],
+                })
+            table_size = h["table_size"][row]
+            yield {
+                "hand_id": str(h["hand_id"][row]),
+                "room_name": text(h["room_name"][row]),
+                "game_type": text(h["game_type"][row]),
+                "sb": h["sb"][row],
+                "bb": h["bb"][row],
+                "date_played": text(h["date_played"][row]),
+                "table_name": text(h["table_name"][row]),
+                "table_size": None if table_size < 0 else table_size,
+                "players": players,
+                "actions": actions,
+                "board": [CARDS[c] for c in h["board"][row] if c >= 0],
+                "winner": text(h["winner"][row]),
+                "win_amount": h["win_amount"][row],
+                "rake": h["rake"][row],
+                "raw_text": self.raw_text(row) if raw_text else "",
+            }
+
+
+    def extend_table(self, table: HandTable, start: int = 0, stop: int = None) -> None:
+        """Añade las manos start..stop a una HandTable copiando columnas, sin crear dicts."""
+        stop = len(self) if stop is None else stop
+        if stop <= start:
+            return
+        strings = self.strings()
+        # Código en la tabla de cada código del segmento; el último elemento traduce el -1 (None)
+        mapping = np.full(len(strings) + 1, -1, dtype=np.int32)
+
+        def codes(values):
+            used = np.unique(values[values >= 0])
+            mapping[used] = [table.code(strings[c]) for c in used]
+            return mapping[values]
+
+        def column(name, first, last):
+            return np.asarray(self.column(name)[first:last])
+
+        p_offset = column("hands.player_offset", start, stop + 1).astype(np.int64)
+        a_offset = column("hands.action_offset", start, stop + 1).astype(np.int64)
+        p_first, p_last = p_offset[0], p_offset[-1]
+        a_first, a_last = a_offset[0], a_offset[-1]
+
+        # Manos. El día y los segundos salen de cada fecha distinta del tramo
+        dates = column("hands.date_played", start, stop)
+        day_map = np.full(len(strings) + 1, -1, dtype=np.int32)
+        time_map = np.full(len(strings) + 1, -1, dtype=np.int32)
+        for c in np.unique(dates[dates >= 0]):
+            day_map[c], time_map[c] = table.date_codes(strings[c])
+        _extend_array(table.hand_id, column("hands.hand_id", start, stop))
+        _extend_array(table.room_name, codes(column("hands.room_name", start, stop)))
+        _extend_array(table.game_type, codes(column("hands.game_type", start, stop)))
+        _extend_array(table.day, day_map[dates])
+        _extend_array(table.time, time_map[dates])
+        _extend_array(table.table_name, codes(column("hands.table_name", start, stop)))
+        _extend_array(table.table_size, column("hands.table_size", start, stop))
+        for name in ("sb", "bb", "board", "win_amount", "rake"):
+            _extend_array(getattr(table, name), column(f"hands.{name}", start, stop))
+        _extend_array(table.winner, codes(column("hands.winner", start, stop)))
+
+        # Jugadores
+        names = column("players.name", p_first, p_last)
+        p_base = len(table.p_name)
+        _extend_array(table.p_name, codes(names))
+        _extend_array(table.p_stack, column("players.stack", p_first, p_last))
+        _extend_array(table.p_seat, column("players.seat", p_first, p_last))
+        _extend_array(table.p_position, codes(column("players.position", p_first, p_last)))
+        _extend_array(table.p_cards, column("players.cards", p_first, p_last))
+        _extend_array(table.p_active, column("players.active", p_first, p_last))
+        _extend_array(table.player_offset, p_offset[1:] - p_first + p_base)
+
+        # Acciones. El segmento guarda el nombre del jugador; la tabla, su índice en la
+        # mano (el primero con ese nombre), o -1 y el nombre en a_names si no tiene asiento
+        players = column("actions.player", a_first, a_last)
+        hands = stop - start
+        counts = np.diff(p_offset)
+        seats = np.full((hands, max(int(counts.max()), 1)), -2, dtype=np.int64)
+        hand_rows = np.repeat(np.arange(hands), counts)
+        seats[hand_rows, np.arange(len(names)) - (p_offset[hand_rows] - p_first)] = names
+        matches = seats[np.repeat(np.arange(hands), np.diff(a_offset))] == players[:, None]
+        a_player = np.where(matches.any(axis=1), matches.argmax(axis=1), -1)
+        a_base = len(table.a_street)
+        for i in np.flatnonzero(a_player < 0).tolist():
+            table.a_names[a_base + i] = None if players[i] < 0 else strings[players[i]]
+        _extend_array(table.a_street, column("actions.street", a_first, a_last))
+        _extend_array(table.a_player, a_player)
+        _extend_array(table.a_action, column("actions.action", a_first, a_last))
+        _extend_array(table.a_amount, column("actions.amount", a_first, a_last))
+        _extend_array(table.action_offset, a_offset[1:] - a_first + a_base)
+
+
+def _check_no_filter(where) -> None:
+    if where:
+        raise NotImplementedError("El almacén columnar no admite filtros SQL (where)")
+
+
+class HandStore(BaseDBManager):
+    """Almacén de manos append-only en segmentos columnares.
+
+    Cada append escribe un segmento nuevo con las tablas hands, players y
+    actions. Un índice ordenado de hand_id permite comprobar duplicados sin
+    leer las manos. Es el backend "columnar" de create_db_manager.
+    """
+
+    SQL_FILTERS = False
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.HAND_STORE_DIR
+        os.makedirs(self.path, exist_ok=True)
+        self.segments = []
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._locations = np.zeros((0, 2), dtype=np.int64)
+        self.reload()
+
+    def reload(self) -> None:
+        names = sorted(f for f in os.listdir(self.path) if f.endswith(SEGMENT_SUFFIX))
+        segments = [Segment(os.path.join(self.path, name)) for name in names]
+        # Segmentos ya unidos por un compact() que no llegó a borrarlos
+        replaced = {name for segment in segments for name in segment.meta.get("replaces", ())}
+        self.segments = []
+        for segment in segments:
+            if os.path.basename(segment.path) not in replaced:
+                self.segments.append(segment)
+                continue
+            hand_store_logger.warning(f"Segment {segment.path} was already compacted. Removing it.")
+            try:
+                os.remove(segment.path)
+            except OSError as e:
+                hand_store_logger.error(f"Could not remove {segment.path}: {e}")
+        self._rebuild_index()
+        hand_store_logger.debug(f"Hand store {self.path}: {len(self.segments)} segments, {len(self)} hands")
+
+    def _rebuild_index(self) -> None:
+        if not self.segments:
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._locations = np.zeros((0, 2), dtype=np.int64)
+            return
+        ids = np.concatenate([s.column("hands.hand_id") for s in self.segments])
+        locations = np.concatenate([
+            np.column_stack((np.full(len(s), i), np.arange(len(s)))) for i, s in enumerate(self.segments)
+        ]).astype(np.int64)
+        order = np.argsort(ids, kind="stable")
+        self._ids = ids[order]
+        self._locations = locations[order]
+
+    def _add_to_index(self, segment_number: int) -> None:
+        """Intercala los hand_id de un segmento nuevo en el índice ya ordenado."""
+        ids = np.asarray(self.segments[segment_number].column("hands.hand_id"))
+        order = np.argsort(ids, kind="stable")
+        locations = np.column_stack((np.full(len(ids), segment_number), order)).astype(np.int64)
+        # side="right": con ids repetidos, la fila más antigua queda delante como en _rebuild_index
+        positions = np.searchsorted(self._ids, ids[order], side="right")
+        self._ids = np.insert(self._ids, positions, ids[order])
+        self._locations = np.insert(self._locations, positions, locations, axis=0)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _next_segment_path(self) -> str:
+        number = 1
+        if self.segments:
+            name = os.path.basename(self.segments[-1].path)
+            number = int(name[len("segment_"):-len(SEGMENT_SUFFIX)]) + 1
+        return os.path.join(self.path, f"segment_{number:06d}{SEGMENT_SUFFIX}")
+
+    def _find(self, hand_id):
+        hand_id = int(hand_id)
+        pos = int(np.searchsorted(self._ids, hand_id))
+        if pos < len(self._ids) and self._ids[pos] == hand_id:
+            return tuple(int(x) for x in self._locations[pos])
+        return None
+
+    def __contains__(self, hand_id) -> bool:
+        return self._find(hand_id) is not None
+
+    def raw_text(self, hand_id):
+        """Texto original de la mano, o None si no está en el almacén."""
+        location = self._find(hand_id)
+        if location is None:
+            return None
+        segment, row = location
+        return self.segments[segment].raw_text(row)
+
+    def append(self, hands) -> int:
+        """Añade las manos que aún no están en el almacén. Devuelve cuántas se escribieron."""
+        new_hands = []
+        seen = set()
+        for hand in hands:
+            hand = hand if isinstance(hand, dict) else hand.__dict__
+            if hand["hand_id"] in seen or hand["hand_id"] in self:
+                hand_store_logger.warning(f"Mano {hand['hand_id']} ya existe en el almacén. Se omite.")
+                continue
+            seen.add(hand["hand_id"])
+            new_hands.append(hand)
+        if not new_hands:
+            return 0
+
+        segment_path = self._next_segment_path()
+        write_segment(segment_path, _build_columns(new_hands))
+        self.segments.append(Segment(segment_path))
+        self._add_to_index(len(self.segments) - 1)
+        hand_store_logger.debug(f"{len(new_hands)} hands appended to {segment_path}")
+        return len(new_hands)
+
+    def iter_hands(self, where=None, params=(), raw_text: bool = False, after_seq: int = 0, until_seq=None):
+        """Recorre las manos en orden de inserción como dicts.
+
+        La secuencia de una mano es su posición en el almacén (1..n), estable porque
+        los segmentos solo se añaden. El almacén no entiende SQL: pasar where es un error.
+        """
+        _check_no_filter(where)
+        until_seq = len(self) if until_seq is None else until_seq
+        base = 0
+        for segment in self.segments:
+            if base + len(segment) > after_seq and base < until_seq:
+                yield from segment.iter_hands(raw_text=raw_text, start=max(after_seq - base, 0),
+                                              stop=min(until_seq - base, len(segment)))
+            base += len(segment)
+
+    def load_hands(self, where=None, params=(), after_seq: int = 0, until_seq=None) -> HandTable:
+        """Como BaseDBManager.load_hands, pero la HandTable se llena copiando columnas de los segmentos."""
+        _check_no_filter(where)
+        table = HandTable(raw_text_loader=self.get_raw_text)
+        until_seq = len(self) if until_seq is None else until_seq
+        base = 0
+        for segment in self.segments:
+            if base + len(segment) > after_seq and base < until_seq:
+                segment.extend_table(table, start=max(after_seq - base, 0), stop=min(until_seq - base, len(segment)))
+            base += len(segment)
+        return table
+
+    # Interfaz de BaseDBManager
+    def connect(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def create_tables(self) -> None:
+        pass
+
+    def insert_hands(self, hands) -> int:
+        written = self.append(hands)
+        if len(self.segments) > settings.HAND_STORE_MAX_SEGMENTS:
+            self.compact(self._compaction_start())
+        return written
+
+    def hand_exists(self, hand_id) -> bool:
+        return hand_id in self
+
+    def get_raw_text(self, hand_id):
+        return self.raw_text(hand_id)
+
+    def count_hands(self) -> int:
+        return len(self)
+
+    def last_seq(self) -> int:
+        return len(self)
+
+    def table(self, name: str, columns=None) -> dict:
+        """Columnas de una tabla (hands, players o actions) concatenadas entre segmentos.
+
+        Para players y actions se añade la columna hand_row con la fila de la mano
+        en la tabla hands. Los textos se devuelven decodificados en arrays de objetos.
+        """
+        columns = columns or TABLES[name]
+        result = {}
+        hand_base = 0
+        parts = {col: [] for col in columns}
+        hand_rows = []
+        for segment in self.segments:
+            strings = np.array(segment.strings() + [None], dtype=object)
+            for col in columns:
+                values = np.asarray(segment.column(f"{name}.{col}"))
+                if col in STRING_COLUMNS:
+                    values = strings[values]
+                parts[col].append(values)
+            if name != "hands":
+                offsets = segment.column(f"hands.{'player' if name == 'players' else 'action'}_offset")
+                hand_rows.append(hand_base + np.repeat(np.arange(len(segment)), np.diff(offsets)))
+            hand_base += len(segment)
+        for col in columns:
+            result[col] = np.concatenate(parts[col]) if parts[col] else np.zeros(0)
+        if name != "hands":
+            result["hand_row"] = np.concatenate(hand_rows) if hand_rows else np.zeros(0, dtype=np.int64)
+        return result
+
+    def _compaction_start(self) -> int:
+        """Primer segmento de la cola que se une al pasar de HAND_STORE_MAX_SEGMENTS.
+
+        Se toman los segmentos del final mientras el anterior no tenga más manos que
+        los ya tomados, y al menos dos: los segmentos grandes apenas se reescriben
+        y cada mano se copia un número logarítmico de veces.
+        """
+        start = len(self.segments) - 1
+        hands = len(self.segments[start])
+        while start > 0 and len(self.segments[start - 1]) <= hands:
+            start -= 1
+            hands += len(self.segments[start])
+        return min(start, len(self.segments) - 2)
+
+    def compact(self, start: int = 0) -> None:
+        """Reescribe los segmentos desde start (por defecto, todos) en uno solo.
+
+        El segmento nuevo lista en su cabecera los que sustituye: si el proceso se
+        corta antes de borrarlos, reload() los ignora en lugar de duplicar manos.
+        """
+        if len(self.segments) - start <= 1:
+            return
+        old_paths = [s.path for s in self.segments[start:]]
+        write_segment(self._next_segment_path(), _merge_columns(self.segments[start:]),
+                      meta={"replaces": [os.path.basename(path) for path in old_paths]})
+        # Se sueltan los memory-maps antes de borrar (necesario en Windows)
+        self.segments = self.segments[:start]
+        for path in old_paths:
+            os.remove(path)
+        self.reload()
+        hand_store_logger.debug(f"{len(old_paths)} segments compacted. {len(self.segments)} segments left")
+
+    def import_json_dir(self, folder: str) -> int:
+        """Importa los ficheros <room>_<id>.json de formatted_hands al almacén.
+
+        Se leen y escriben por lotes de IMPORT_BATCH_FILES ficheros (un segmento por
+        lote, compactados como en insert_hands), sin cargar la carpeta en memoria.
+        """
+        filenames = sorted(name for name in os.listdir(folder) if name.endswith(".json"))
+        written = 0
+        for start in range(0, len(filenames), IMPORT_BATCH_FILES):
+            hands = []
+            for filename in filenames[start:start + IMPORT_BATCH_FILES]:
+                with open(os.path.join(folder, filename), "r", encoding="utf-8") as f:
+                    hands.append(json.load(f))
+            written += self.insert_hands(hands)
+        return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Utilidades del almacén de manos.")
+    parser.add_argument("--path", default=settings.HAND_STORE_DIR)
+    parser.add_argument("--import-json", default=None, help="Importar los JSON de una carpeta (formatted_hands)")
+    parser.add_argument("--compact", action="store_true", help="Unir todos los segmentos en uno")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = HandStore(args.path)
+    if args.import_json:
+        print(f"{store.import_json_dir(args.import_json)} manos importadas")
+    if args.compact:
+        store.compact()
+    print(f"{len(store)} manos en {len(store.segments)} segmentos -> {store.path}")
@@ -0,0 +1,242 @@
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+from src.base.base_db_manager import BaseDBManager
+from src.models.hand_model import STREETS
+
+sqlite_manager_logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hands (
+    hand_id     INTEGER PRIMARY KEY,
+    room_name   TEXT,
+    game_type   TEXT,
+    sb          REAL,
+    bb          REAL,
+    date_played TEXT,
+    played_at   TEXT,
+    table_name  TEXT,
+    table_size  INTEGER,
+    board       TEXT,
+    winner      TEXT,
+    win_amount  REAL,
+    rake        REAL,
+    raw_text    TEXT,
+    ingest_seq  INTEGER
+);
+CREATE TABLE IF NOT EXISTS players (
+    hand_id     INTEGER NOT NULL REFERENCES hands(hand_id),
+    seq         INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    stack       REAL,
+    seat        INTEGER,
+    position    TEXT,
+    cards       TEXT,
+    active      INTEGER,
+    PRIMARY KEY (hand_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS actions (
+    hand_id     INTEGER NOT NULL REFERENCES hands(hand_id),
+    seq         INTEGER NOT NULL,
+    street      TEXT NOT NULL,
+    player      TEXT NOT NULL,
+    action      TEXT NOT NULL,
+    amount      REAL,
+    PRIMARY KEY (hand_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_hands_date_played ON hands(date_played);
+CREATE INDEX IF NOT EXISTS idx_hands_played_at ON hands(played_at);
+CREATE INDEX IF NOT EXISTS idx_players_name ON players(name, hand_id);
+CREATE INDEX IF NOT EXISTS idx_players_position ON players(position, hand_id);
+CREATE INDEX IF NOT EXISTS idx_actions_player ON actions(player, street, hand_id);
+"""
+
+# Orden de inserción de las manos: los analizadores guardan el último que han procesado
+SEQ_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_hands_ingest_seq ON hands(ingest_seq)"
+
+
+def _played_at(date_played: str) -> Optional[str]:
+    # Fecha en formato ISO para poder filtrar y ordenar por rangos en SQL
+    try:
+        return datetime.strptime(date_played, "%d-%m-%Y %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+class SQLiteManager(BaseDBManager):
+    """Base de datos de manos en SQLite: tablas hands, players y actions normalizadas."""
+
+    def __init__(self, db_path: str, batch_size: int = 5000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.conn = None
+        self.connect()
+        self.create_tables()
+
+    def connect(self) -> None:
+        if self.conn is not None:
+            return
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=OFF")
+        sqlite_manager_logger.debug(f"SQLite database opened: {self.db_path}")
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            sqlite_manager_logger.debug(f"SQLite database closed: {self.db_path}")
+
+    def create_tables(self) -> None:
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(hands)")]
+        if "ingest_seq" not in columns:
+            # Bases de datos anteriores: las manos existentes quedan ordenadas por hand_id
+            with self.conn:
+                self.conn.execute("ALTER TABLE hands ADD COLUMN ingest_seq INTEGER")
+                self.conn.execute("UPDATE hands SET ingest_seq = hand_id")
+        self.conn.execute(SEQ_INDEX)
+
+    def _existing_ids(self, hand_ids) -> set:
+        existing = set()
+        hand_ids = list(hand_ids)
+        # SQLite limita el número de parámetros por consulta
+        for i in range(0, len(hand_ids), 500):
+            chunk = hand_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT hand_id FROM hands WHERE hand_id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            existing.update(row[0] for row in rows)
+        return existing
+
+    def insert_hands(self, hands) -> int:
+        """Inserta las manos nuevas en una sola transacción. Devuelve cuántas se escribieron."""
+        hands = [hand if isinstance(hand, dict) else hand.__dict__ for hand in hands]
+        existing = self._existing_ids(int(hand["hand_id"]) for hand in hands)
+
+        hand_rows, player_rows, action_rows = [], [], []
+        ingest_seq = self.last_seq()
+        for hand in hands:
+            hand_id = int(hand["hand_id"])
+            if hand_id in existing:
+                sqlite_manager_logger.warning(f"Mano {hand_id} ya existe en la base de datos. Se omite.")
+                continue
+            existing.add(hand_id)
+            ingest_seq += 1
+            hand_rows.append((
+                hand_id, hand.get("room_name"), hand.get("game_type"), hand.get("sb"), hand.get("bb"),
+                hand.get("date_played"), _played_at(hand.get("date_played")), hand.get("table_name"),
+                hand.get("table_size"), " ".join(hand.get("board", [])), hand.get("winner"),
+                hand.get("win_amount"), hand.get("rake"), hand.get("raw_text", ""), ingest_seq,
+            ))
+            for seq, p in enumerate(hand.get("players", [])):
+                player_rows.append((
+                    hand_id, seq, p["name"], p["stack"], p["seat"], p.get("position"),
+                    " ".join(p.get("cards", [])), int(bool(p.get("active"))),
+                ))
+            seq = 0
+            for street in STREETS:
+                for a in hand.get("actions", {}).get(street, []):
+                    action_rows.append((hand_id, seq, street, a["player"], a["action"], a["amount"]))
+                    seq += 1
+
+        if not hand_rows:
+            return 0
+        with self.conn:
+            self.conn.executemany("INSERT INTO hands VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", hand_rows)
+            self.conn.executemany("INSERT INTO players VALUES (?,?,?,?,?,?,?,?)", player_rows)
+            self.conn.executemany("INSERT INTO actions VALUES (?,?,?,?,?,?)", action_rows)
+        sqlite_manager_logger.debug(f"{len(hand_rows)} hands inserted into {self.db_path}")
+        return len(hand_rows)
+
+    def hand_exists(self, hand_id: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM hands WHERE hand_id = ?", (int(hand_id),)).fetchone()
+        return row is not None
+
+    def get_raw_text(self, hand_id: str) -> Optional[str]:
+        row = self.conn.execute("SELECT raw_text FROM hands WHERE hand_id = ?", (int(hand_id),)).fetchone()
+        return row[0] if row else None
+
+    def count_hands(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM hands").fetchone()[0]
+
+    def last_seq(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(ingest_seq), 0) FROM hands").fetchone()[0]
+
+    def query(self, sql: str, params: tuple = ()) -> list:
+        return self.conn.execute(sql, params).fetchall()
+
+    def iter_hands(self, where: Optional[str] = None, params: tuple = (), raw_text: bool = False,
+                   after_seq: int = 0, until_seq: Optional[int] = None):
+        """Manos que cumplen el filtro, como el dict que producía StandardHand.__dict__.
+
+        Solo se devuelven las insertadas con after_seq < ingest_seq <= until_seq.
+        Las tres tablas se leen ordenadas por hand_id y se combinan en una sola pasada.
+        """
+        conditions = [f"({where})"] if where else []
+        if after_seq:
+            conditions.append(f"h.ingest_seq > {int(after_seq)}")
+        if until_seq is not None:
+            conditions.append(f"h.ingest_seq <= {int(until_seq)}")
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        selected = f"SELECT h.hand_id FROM hands h {where_sql}"
+        raw_column = "h.raw_text" if raw_text else "''"
+        hands = self.conn.execute(
+            "SELECT h.hand_id, h.room_name, h.game_type, h.sb, h.bb, h.date_played, h.table_name, "
+            f"h.table_size, h.board, h.winner, h.win_amount, h.rake, {raw_column} "
+            f"FROM hands h {where_sql} ORDER BY h.hand_id", params
+        )
+        # Cursores independientes para recorrer jugadores y acciones en paralelo
+        players = self.conn.cursor().execute(
+            "SELECT hand_id, name, stack, seat, position, cards, active FROM players "
+            f"WHERE hand_id IN ({selected}) ORDER BY hand_id, seq", params
+        )
+        actions = self.conn.cursor().execute(
+            "SELECT hand_id, street, player, action, amount FROM actions "
+            f"WHERE hand_id IN ({selected}) ORDER BY hand_id, seq", params
+        )
+        next_player = next(players, None)
+        next_action = next(actions, None)
+
+        for row in hands:
+            hand_id = row[0]
+            hand_players = []
+            while next_player is not None and next_player[0] == hand_id:
+                _, name, stack, seat, position, cards, active = next_player
+                hand_players.append({
+                    "name": name,
+                    "stack": stack,
+                    "seat": seat,
+                    "position": position,
+                    "cards": cards.split() if cards else [],
+                    "active": bool(active),
+                })
+                next_player = next(players, None)
+            hand_actions = {street: [] for street in STREETS}
+            while next_action is not None and next_action[0] == hand_id:
+                _, street, player, action, amount = next_action
+                hand_actions[street].append({"player": player, "action": action, "amount": amount})
+                next_action = next(actions, None)
+
+            yield {
+                "hand_id": str(hand_id),
+                "room_name": row[1],
+                "game_type": row[2],
+                "sb": row[3],
+                "bb": row[4],
+                "date_played": row[5],
+                "table_name": row[6],
+                "table_size": row[7],
+                "players": hand_players,
+                "actions": hand_actions,
+                "board": row[8].split() if row[8] else [],
+                "winner": row[9],
+                "win_amount": row[10],
+                "rake": row[11],
+                "raw_text": row[12],
+            }
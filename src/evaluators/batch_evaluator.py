@@ -0,0 +1,161 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from src.evaluators.hand_evaluator import (
+    CARD_KEYS, CARD_RANK_BITS, FLUSH_SUIT, FLUSH_TABLE, NONFLUSH_TABLE, SUIT_MASK, SUIT_SHIFT,
+)
+
+# Tablas del evaluador vistas como arrays de NumPy (sin copia)
+NP_CARD_KEYS = np.array(CARD_KEYS, dtype=np.int64)
+NP_NONFLUSH = np.frombuffer(NONFLUSH_TABLE, dtype=np.uint16)
+NP_FLUSH = np.frombuffer(FLUSH_TABLE, dtype=np.uint16)
+NP_FLUSH_SUIT = np.frombuffer(FLUSH_SUIT, dtype=np.int8)
+
+# Máscara de 52 bits por carta: 13 bits de rango por cada palo
+NP_CARD_BITS = np.array([CARD_RANK_BITS[c] << (13 * (c & 3)) for c in range(52)], dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def colex_combinations(n: int, k: int) -> np.ndarray:
+    """Todas las combinaciones de k índices de range(n) en orden colexicográfico.
+
+    En este orden las combinaciones de range(m) con m < n son un prefijo de la
+    tabla, así que una sola tabla sirve para cualquier tamaño de mazo restante.
+    """
+    if k == 0:
+        return np.zeros((1, 0), dtype=np.int16)
+    combos = np.array(list(itertools.combinations(range(n), k)), dtype=np.int16).reshape(-1, k)
+    order = np.lexsort(combos.T)
+    return combos[order]
+
+
+def board_chunks(live, n_cards: int, firsts=None):
+    """Genera los boards de n_cards cartas sobre el mazo vivo, por bloques.
+
+    Cada bloque agrupa los boards que empiezan por la misma primera carta, así que
+    la memoria queda acotada por C(len(live) - 1, n_cards - 1) filas. Con firsts
+    se generan solo los bloques de esos índices de primera carta.
+    """
+    live = np.asarray(live, dtype=np.int16)
+    n = len(live)
+    if n_cards == 0:
+        yield np.zeros((1, 0), dtype=np.int16)
+        return
+
+    rest = colex_combinations(n - 1, n_cards - 1)
+    for first in (range(n - n_cards + 1) if firsts is None else firsts):
+        remaining = n - first - 1
+        count = _n_choose_k(remaining, n_cards - 1)
+        tail = live[first + 1:][rest[:count]]
+        head = np.full((count, 1), live[first], dtype=np.int16)
+        yield np.hstack((head, tail))
+
+
+def _n_choose_k(n: int, k: int) -> int:
+    if k < 0 or k > n:
+        return 0
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def with_board(board, runouts: np.ndarray) -> np.ndarray:
+    """Antepone las cartas conocidas del board a cada fila de runouts."""
+    known = np.tile(np.array(board, dtype=np.int16).reshape(1, -1), (len(runouts), 1))
+    return np.hstack((known, runouts.astype(np.int16)))
+
+
+class BoardBatch:
+    """Claves y máscaras de 52 bits de un bloque de boards, compartidas entre jugadores."""
+
+    def __init__(self, boards: np.ndarray):
+        self.boards = boards
+        self.keys = NP_CARD_KEYS[boards].sum(axis=1)
+        self.masks = NP_CARD_BITS[boards].sum(axis=1)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def evaluate(self, hole) -> np.ndarray:
+        """Valor de la mejor mano (1..7462) del jugador con esas cartas en cada board."""
+        hole_key = sum(CARD_KEYS[c] for c in hole)
+        hole_mask = int(NP_CARD_BITS[list(hole)].sum())
+
+        keys = self.keys + hole_key
+        values = NP_NONFLUSH[keys >> SUIT_SHIFT]
+        suits = NP_FLUSH_SUIT[keys & SUIT_MASK]
+
+        flushes = np.flatnonzero(suits >= 0)
+        if len(flushes):
+            masks = (self.masks[flushes] | hole_mask) >> (13 * suits[flushes].astype(np.int64))
+            values[flushes] = NP_FLUSH[masks & 0x1FFF]
+        return values
+
+    def evaluate_many(self, holes) -> np.ndarray:
+        """Evalúa varias manos a la vez: array (len(holes), len(boards)) de valores.
+
+        Las manos que chocan con un board dan un valor sin sentido en esa celda;
+        el llamador es quien las descarta.
+        """
+        holes = np.asarray(holes, dtype=np.int16).reshape(len(holes), -1)
+        hole_keys = NP_CARD_KEYS[holes].sum(axis=1)
+        hole_masks = NP_CARD_BITS[holes].sum(axis=1)
+
+        keys = self.keys[None, :] + hole_keys[:, None]
+        values = NP_NONFLUSH.take(keys >> SUIT_SHIFT, mode="clip")
+        suits = NP_FLUSH_SUIT[keys & SUIT_MASK]
+
+        rows, cols = np.nonzero(suits >= 0)
+        if len(rows):
+            masks = (self.masks[cols] | hole_masks[rows]) >> (13 * suits[rows, cols].astype(np.int64))
+            values[rows, cols] = NP_FLUSH[masks & 0x1FFF]
+        return values
+
+
+def evaluate_batch(hole, boards) -> np.ndarray:
+    """Evalúa unas cartas propias contra un array (m, 5) de boards."""
+    return BoardBatch(np.asarray(boards, dtype=np.int16)).evaluate(hole)
+
+
+def _count_chunks(hero, villain, board, chunks):
+    wins = ties = losses = 0
+    for runouts in chunks:
+        batch = BoardBatch(with_board(board, runouts))
+        hero_values = batch.evaluate(hero)
+        villain_values = batch.evaluate(villain)
+        wins += int(np.count_nonzero(hero_values > villain_values))
+        losses += int(np.count_nonzero(hero_values < villain_values))
+        ties += int(np.count_nonzero(hero_values == villain_values))
+    return wins, ties, losses
+
+
+def _count_shard(args):
+    hero, villain, board, live, first = args
+    return _count_chunks(hero, villain, board, board_chunks(live, 5 - len(board), firsts=[first]))
+
+
+def count_showdowns(hero, villain, dead=(), board=(), workers=None):
+    """Cuenta victorias, empates y derrotas de hero sobre todos los runouts posibles.
+
+    Con workers > 1 el espacio de boards se reparte por primera carta entre
+    procesos; el resultado es idéntico al de la versión en serie.
+    """
+    blocked = set(hero) | set(villain) | set(dead) | set(board)
+    live = [c for c in range(52) if c not in blocked]
+    missing = 5 - len(board)
+
+    if not workers or workers <= 1 or missing == 0:
+        return _count_chunks(hero, villain, board, board_chunks(live, missing))
+
+    # Los fragmentos más grandes salen primero, así que el reparto queda equilibrado
+    shards = [(list(hero), list(villain), list(board), live, first) for first in range(len(live) - missing + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_count_shard, shards))
+    wins = sum(r[0] for r in results)
+    ties = sum(r[1] for r in results)
+    losses = sum(r[2] for r in results)
+    return wins, ties, losses
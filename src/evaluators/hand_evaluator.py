@@ -1,46 +1,358 @@
 import itertools
+from array import array
+
+from src.utils.metrics import metrics
 
 RANKS = "23456789TJQKA"
-SUITS = "shdc"  
+SUITS = "shdc"
 DECK = [r + s for r in RANKS for s in SUITS]
 
+# Cada carta se codifica como un entero 0..51: rank * 4 + suit
+CARD_INDEX = {card: i for i, card in enumerate(DECK)}
+
+# -------------------
+# 1. Claves de las cartas
+# -------------------
+# Claves de rango elegidas para que la suma de 7 rangos (máximo 4 por rango)
+# sea única: sirve como hash perfecto de la tabla de manos sin color.
+RANK_KEYS = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+# Claves de palo en base 8: la suma de 7 palos identifica cuántas cartas hay de cada uno.
+SUIT_KEYS = (1, 8, 64, 512)
+SUIT_SHIFT = 12
+SUIT_MASK = (1 << SUIT_SHIFT) - 1
+
+CARD_KEYS = tuple((RANK_KEYS[c >> 2] << SUIT_SHIFT) | SUIT_KEYS[c & 3] for c in range(52))
+CARD_RANK_BITS = tuple(1 << (c >> 2) for c in range(52))
+
+# Categorías de mano, de menor a mayor
+HAND_CATEGORIES = (
+    "HIGH_CARD", "PAIR", "TWO_PAIR", "THREE_OF_A_KIND", "STRAIGHT",
+    "FLUSH", "FULL_HOUSE", "FOUR_OF_A_KIND", "STRAIGHT_FLUSH",
+)
+HIGH_CARD, PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH = range(9)
+
+
+# -------------------
+# 2. Construcción de tablas
+# -------------------
+def _straight_high(mask: int) -> int:
+    """Rango más alto de la escalera contenida en la máscara de rangos, o -1."""
+    for high in range(12, 3, -1):
+        window = 0b11111 << (high - 4)
+        if mask & window == window:
+            return high
+    # Escalera al 5 (A-2-3-4-5)
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return -1
+
+
+def _pack(category: int, ranks) -> int:
+    score = category
+    for i in range(5):
+        score = (score << 4) | (ranks[i] if i < len(ranks) else 0)
+    return score
+
+
+def _top_bits(mask: int, n: int) -> list:
+    ranks = []
+    for r in range(12, -1, -1):
+        if mask & (1 << r):
+            ranks.append(r)
+            if len(ranks) == n:
+                break
+    return ranks
+
+
+def _score_flush(mask: int) -> int:
+    high = _straight_high(mask)
+    if high >= 0:
+        return _pack(STRAIGHT_FLUSH, [high])
+    return _pack(FLUSH, _top_bits(mask, 5))
+
+
+def _score_counts(counts) -> int:
+    """Puntuación bruta de un multiconjunto de rangos sin color (5 a 7 cartas)."""
+    by_count = {4: [], 3: [], 2: [], 1: []}
+    mask = 0
+    for r in range(12, -1, -1):
+        if counts[r]:
+            by_count[counts[r]].append(r)
+            mask |= 1 << r
+
+    if by_count[4]:
+        quad = by_count[4][0]
+        kicker = max(r for r in range(13) if counts[r] and r != quad)
+        return _pack(FOUR_OF_A_KIND, [quad, kicker])
+
+    if by_count[3]:
+        trips = by_count[3][0]
+        pairs = sorted(by_count[3][1:] + by_count[2], reverse=True)
+        if pairs:
+            return _pack(FULL_HOUSE, [trips, pairs[0]])
+
+    high = _straight_high(mask)
+    if high >= 0:
+        return _pack(STRAIGHT, [high])
+
+    if by_count[3]:
+        trips = by_count[3][0]
+        return _pack(THREE_OF_A_KIND, [trips] + _top_bits(mask & ~(1 << trips), 2))
+
+    if len(by_count[2]) >= 2:
+        p1, p2 = by_count[2][0], by_count[2][1]
+        return _pack(TWO_PAIR, [p1, p2] + _top_bits(mask & ~(1 << p1) & ~(1 << p2), 1))
+
+    if by_count[2]:
+        pair = by_count[2][0]
+        return _pack(PAIR, [pair] + _top_bits(mask & ~(1 << pair), 3))
+
+    return _pack(HIGH_CARD, _top_bits(mask, 5))
+
+
+def _build_tables():
+    # Máscaras de rangos con 5 o más bits -> puntuación de color / escalera de color
+    flush_raw = {mask: _score_flush(mask) for mask in range(1 << 13) if bin(mask).count("1") >= 5}
+
+    # Multiconjuntos de 7 rangos (máximo 4 por rango) -> puntuación sin color
+    nonflush_raw = {}
+    for combo in itertools.combinations_with_replacement(range(13), 7):
+        counts = [0] * 13
+        for r in combo:
+            counts[r] += 1
+        if max(counts) > 4:
+            continue
+        nonflush_raw[sum(RANK_KEYS[r] for r in combo)] = _score_counts(counts)
+
+    # Las manos de 5 cartas aportan las clases que nunca son la mejor mano entre 7
+    five_raw = set()
+    for combo in itertools.combinations_with_replacement(range(13), 5):
+        counts = [0] * 13
+        for r in combo:
+            counts[r] += 1
+        if max(counts) <= 4:
+            five_raw.add(_score_counts(counts))
+
+    # Comprimir las puntuaciones brutas a clases de equivalencia densas 1..7462
+    classes = sorted(set(flush_raw.values()) | set(nonflush_raw.values()) | five_raw)
+    class_of = {raw: i + 1 for i, raw in enumerate(classes)}
+
+    flush_table = array("H", bytes(2 << 13))
+    for mask, raw in flush_raw.items():
+        flush_table[mask] = class_of[raw]
+
+    nonflush_table = array("H", bytes(2 * (max(nonflush_raw) + 1)))
+    for key, raw in nonflush_raw.items():
+        nonflush_table[key] = class_of[raw]
+
+    # Suma de claves de palo de 7 cartas -> palo con 5 o más cartas, o -1
+    flush_suit = array("b", [-1]) * (SUIT_MASK + 1)
+    for counts in itertools.product(range(8), repeat=4):
+        if sum(counts) != 7:
+            continue
+        for suit, n in enumerate(counts):
+            if n >= 5:
+                flush_suit[sum(n_s * k for n_s, k in zip(counts, SUIT_KEYS))] = suit
+
+    category_bounds = [0] * len(HAND_CATEGORIES)
+    for i, raw in enumerate(classes):
+        category_bounds[raw >> 20] = i + 1
+
+    return flush_table, nonflush_table, flush_suit, class_of, tuple(category_bounds)
+
+
+FLUSH_TABLE, NONFLUSH_TABLE, FLUSH_SUIT, _CLASS_OF, _CATEGORY_BOUNDS = _build_tables()
+HAND_CLASSES = len(_CLASS_OF)
+
+
+# -------------------
+# 3. Evaluación
+# -------------------
+def cards_to_ints(cards) -> list:
+    return [c if isinstance(c, int) else CARD_INDEX[c] for c in cards]
+
+
+def _evaluate_key(key: int, cards) -> int:
+    suit = FLUSH_SUIT[key & SUIT_MASK]
+    if suit < 0:
+        return NONFLUSH_TABLE[key >> SUIT_SHIFT]
+    mask = 0
+    for c in cards:
+        if c & 3 == suit:
+            mask |= CARD_RANK_BITS[c]
+    return FLUSH_TABLE[mask]
+
+
+def evaluate7(cards) -> int:
+    """Clase de la mejor mano de 5 cartas entre 7 enteros de carta (mayor es mejor)."""
+    key = 0
+    for c in cards:
+        key += CARD_KEYS[c]
+    return _evaluate_key(key, cards)
+
+
+def best_hand(cards7):
+    """Valor de la mejor mano de 5 cartas (1..7462, mayor es mejor).
+
+    Acepta 5, 6 o 7 cartas, como strings ("As") o enteros 0..51.
+    """
+    cards = cards_to_ints(cards7)
+    if len(cards) == 7:
+        return evaluate7(cards)
+
+    # Con menos de 7 cartas se evalúan todas las combinaciones de 5
+    best = 0
+    for five in itertools.combinations(cards, 5):
+        counts = [0] * 13
+        suits = set()
+        mask = 0
+        for c in five:
+            counts[c >> 2] += 1
+            suits.add(c & 3)
+            mask |= CARD_RANK_BITS[c]
+        if len(suits) == 1:
+            value = FLUSH_TABLE[mask]
+        else:
+            value = _CLASS_OF[_score_counts(counts)]
+        best = max(best, value)
+    return best
+
+
+def hand_category(value: int) -> str:
+    for category, upper in enumerate(_CATEGORY_BOUNDS):
+        if value <= upper:
+            return HAND_CATEGORIES[category]
+    return HAND_CATEGORIES[-1]
+
+
+# -------------------
+# 4. Equity
+# -------------------
 def generate_boards(dead_cards):
     available_deck = [c for c in DECK if c not in dead_cards]
     return itertools.combinations(available_deck, 5)
 
 
-def best_hand(cards7):
-    # TODO: implementar ranking real de 5 cartas
-    return len("".join(cards7))  # <- dummy
+def equity_result(wins: int, ties: int, losses: int) -> dict:
+    total = wins + ties + losses
+    equity = (wins + 0.5 * ties) / total if total > 0 else 0
+    return {
+        "wins": wins,
+        "losses": losses,
+        "ties": ties,
+        "total": total,
+        "equity": equity,
+    }
+
+
+def _enumerate_exhaustive(hero, villain):
+    """Recorre todos los boards acumulando las claves carta a carta."""
+    dead = set(hero) | set(villain)
+    live = [c for c in range(52) if c not in dead]
+    keys = [CARD_KEYS[c] for c in live]
+    n = len(live)
+    hero_key = sum(CARD_KEYS[c] for c in hero)
+    villain_key = sum(CARD_KEYS[c] for c in villain)
 
-def compute_equity(hero, villain, max_boards=None):
-    dead = hero + villain
     wins = ties = losses = 0
-    total = 0
+    for a in range(n - 4):
+        ka = keys[a]
+        for b in range(a + 1, n - 3):
+            kb = ka + keys[b]
+            for c in range(b + 1, n - 2):
+                kc = kb + keys[c]
+                for d in range(c + 1, n - 1):
+                    kd = kc + keys[d]
+                    for e in range(d + 1, n):
+                        board_key = kd + keys[e]
+                        h = hero_key + board_key
+                        v = villain_key + board_key
+                        if FLUSH_SUIT[h & SUIT_MASK] < 0:
+                            hv = NONFLUSH_TABLE[h >> SUIT_SHIFT]
+                        else:
+                            hv = _evaluate_key(h, hero + [live[a], live[b], live[c], live[d], live[e]])
+                        if FLUSH_SUIT[v & SUIT_MASK] < 0:
+                            vv = NONFLUSH_TABLE[v >> SUIT_SHIFT]
+                        else:
+                            vv = _evaluate_key(v, villain + [live[a], live[b], live[c], live[d], live[e]])
+                        if hv > vv:
+                            wins += 1
+                        elif hv < vv:
+                            losses += 1
+                        else:
+                            ties += 1
+    return wins, ties, losses
 
-    for i, board in enumerate(generate_boards(dead)):
-        best_hero = best_hand(hero + list(board))
-        best_villain = best_hand(villain + list(board))
 
+def _enumerate_runouts(hero, villain, board):
+    """Recuento exacto con board parcial: como mucho C(45, 2) runouts."""
+    blocked = set(hero) | set(villain) | set(board)
+    live = [c for c in range(52) if c not in blocked]
+    wins = ties = losses = 0
+    for runout in itertools.combinations(live, 5 - len(board)):
+        full_board = board + list(runout)
+        best_hero = evaluate7(hero + full_board)
+        best_villain = evaluate7(villain + full_board)
         if best_hero > best_villain:
             wins += 1
         elif best_hero < best_villain:
             losses += 1
         else:
             ties += 1
-        total += 1
+    return wins, ties, losses
 
-        if max_boards and i + 1 >= max_boards:
-            break
 
-    equity = (wins + 0.5 * ties) / total if total > 0 else 0
-    return {
-        "wins": wins,
-        "losses": losses,
-        "ties": ties,
-        "total": total,
-        "equity": equity,
-    }
+def _exact_counts(hero, villain, board, batch, workers=None):
+    if workers and workers > 1:
+        # Enumeración repartida por primera carta del board entre procesos
+        from src.evaluators.batch_evaluator import count_showdowns
+        return count_showdowns(hero, villain, board=board, workers=workers)
+    if batch:
+        # Modo batch: boards como arrays de NumPy evaluados por bloques
+        from src.evaluators.batch_evaluator import count_showdowns
+        return count_showdowns(hero, villain, board=board)
+    if board:
+        return _enumerate_runouts(hero, villain, board)
+    return _enumerate_exhaustive(hero, villain)
+
+
+def compute_equity(hero, villain, max_boards=None, batch=False, target_std_error=None, time_budget=None, seed=None,
+                   use_cache=True, board=None, workers=None):
+    hero = cards_to_ints(hero)
+    villain = cards_to_ints(villain)
+    board = cards_to_ints(board or [])
+
+    # Muestreo aleatorio uniforme: max_boards limita el número de boards muestreados.
+    # Un 0 también elige el muestreo, y simulate_equity lo valida
+    if max_boards is not None or target_std_error is not None or time_budget is not None:
+        from src.evaluators.monte_carlo import simulate_equity
+        return simulate_equity(
+            hero, villain,
+            target_std_error=target_std_error,
+            time_budget=time_budget,
+            max_samples=max_boards,
+            seed=seed,
+            board=board,
+        )
+
+    if not use_cache:
+        return equity_result(*_exact_counts(hero, villain, board, batch, workers))
+
+    # Las situaciones que solo difieren en los palos comparten entrada en la memo
+    from src.evaluators.isomorphism import canonical_key, equity_memo
+    key = canonical_key(hero, villain, board)
+    counts = equity_memo.get(key)
+    if counts is None:
+        if not board:
+            # Sin board, la equity exacta está precalculada en la caché preflop
+            from src.evaluators.preflop_cache import get_cache
+            cache = get_cache()
+            counts = cache.lookup(hero, villain) if cache else None
+            metrics.incr("cache.preflop_equity.misses" if counts is None else "cache.preflop_equity.hits")
+        if counts is None:
+            counts = _exact_counts(list(key[0]), list(key[1]), list(key[2]), batch, workers)
+        equity_memo.put(key, counts)
+    return equity_result(*counts)
 
 
 # -------------------
@@ -50,6 +362,6 @@ if __name__ == "__main__":
     hero = ["As", "Ks"]
     villain = ["9c", "9d"]
 
-    result = compute_equity(hero, villain, max_boards=1000)  # limitar boards para test
+    result = compute_equity(hero, villain, target_std_error=0.005, seed=1)  # muestreo para test
     print("Resultados de testeo:")
     print(result)
@@ -0,0 +1,74 @@
+import itertools
+from collections import OrderedDict
+
+from src.utils.metrics import metrics
+
+# Las 24 permutaciones de palos como tablas carta -> carta
+SUIT_PERMUTATIONS = tuple(
+    tuple((card & ~3) | perm[card & 3] for card in range(52))
+    for perm in itertools.permutations(range(4))
+)
+
+
+def canonical_key(hero, villain, board=()) -> tuple:
+    """Forma canónica de (hero, villain, board) bajo permutaciones de palos.
+
+    Dos situaciones que solo difieren en los palos tienen la misma clave y por
+    tanto la misma equity. Las cartas son enteros 0..51; el orden dentro de cada
+    grupo no importa.
+    """
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        key = (
+            tuple(sorted(perm[c] for c in hero)),
+            tuple(sorted(perm[c] for c in villain)),
+            tuple(sorted(perm[c] for c in board)),
+        )
+        if best is None or key < best:
+            best = key
+    return best
+
+
+class EquityMemo:
+    """Caché LRU acotada de recuentos de equity indexada por la clave canónica."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        counts = self.entries.get(key)
+        if counts is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return counts
+
+    def put(self, key, counts) -> None:
+        self.entries[key] = counts
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+
+# Memo compartida por todas las llamadas a compute_equity del proceso
+equity_memo = EquityMemo()
+metrics.add_collector(lambda: {"cache.equity_memo.hits": equity_memo.hits, "cache.equity_memo.misses": equity_memo.misses})
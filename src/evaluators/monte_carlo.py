@@ -0,0 +1,76 @@
+import math
+import time
+
+import numpy as np
+
+from src.evaluators.batch_evaluator import BoardBatch, with_board
+from src.evaluators.hand_evaluator import cards_to_ints, equity_result
+
+# Valor z del intervalo de confianza del 95%
+Z_95 = 1.959964
+
+
+def sample_boards(rng: np.random.Generator, live, n_cards: int, size: int) -> np.ndarray:
+    """Extrae `size` boards de n_cards cartas distintas, uniformes sobre el mazo vivo."""
+    live = np.asarray(live, dtype=np.int16)
+    if n_cards == 0:
+        return np.zeros((size, 0), dtype=np.int16)
+    # Las n_cards posiciones con menor clave aleatoria forman un subconjunto uniforme
+    keys = rng.random((size, len(live)))
+    picks = np.argpartition(keys, n_cards - 1, axis=1)[:, :n_cards]
+    return live[picks]
+
+
+def standard_error(wins: int, ties: int, total: int) -> float:
+    """Error estándar de la equity con resultados por board de 1, 0.5 o 0."""
+    if total == 0:
+        return math.inf
+    mean = (wins + 0.5 * ties) / total
+    variance = max((wins + 0.25 * ties) / total - mean * mean, 0.0)
+    return math.sqrt(variance / total)
+
+
+def simulate_equity(hero, villain, target_std_error=0.001, time_budget=None, max_samples=None,
+                    batch_size=20000, min_samples=1000, seed=None, board=()) -> dict:
+    """Equity por Monte Carlo con parada temprana.
+
+    Se detiene cuando el error estándar baja de target_std_error, cuando se agota
+    time_budget (segundos) o al llegar a max_samples boards, lo que ocurra antes.
+    Sin ninguna de las tres condiciones la simulación no terminaría: ValueError.
+    """
+    if not target_std_error and time_budget is None and not max_samples:
+        raise ValueError("simulate_equity needs target_std_error, time_budget or max_samples")
+    hero = cards_to_ints(hero)
+    villain = cards_to_ints(villain)
+    board = cards_to_ints(board)
+    blocked = set(hero) | set(villain) | set(board)
+    live = [c for c in range(52) if c not in blocked]
+
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    wins = ties = losses = 0
+
+    while True:
+        total = wins + ties + losses
+        size = batch_size if not max_samples else min(batch_size, max_samples - total)
+        batch = BoardBatch(with_board(board, sample_boards(rng, live, 5 - len(board), size)))
+        hero_values = batch.evaluate(hero)
+        villain_values = batch.evaluate(villain)
+        wins += int(np.count_nonzero(hero_values > villain_values))
+        losses += int(np.count_nonzero(hero_values < villain_values))
+        ties += int(np.count_nonzero(hero_values == villain_values))
+
+        total = wins + ties + losses
+        std_error = standard_error(wins, ties, total)
+        if max_samples and total >= max_samples:
+            break
+        if target_std_error and total >= min_samples and std_error <= target_std_error:
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+
+    result = equity_result(wins, ties, losses)
+    result["std_error"] = std_error
+    result["ci_low"] = max(result["equity"] - Z_95 * std_error, 0.0)
+    result["ci_high"] = min(result["equity"] + Z_95 * std_error, 1.0)
+    return result
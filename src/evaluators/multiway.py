@@ -0,0 +1,111 @@
+import math
+import time
+
+import numpy as np
+
+from src.evaluators.batch_evaluator import BoardBatch, board_chunks, with_board, _n_choose_k
+from src.evaluators.hand_evaluator import DECK, cards_to_ints
+from src.evaluators.monte_carlo import Z_95, sample_boards
+
+# Por encima de este número de runouts se muestrea en lugar de enumerar
+MAX_EXACT_BOARDS = 250000
+# Mesas 6-max: de 3 a 6 jugadores (heads-up va por compute_equity)
+MIN_PLAYERS = 3
+MAX_PLAYERS = 6
+
+
+class _ShareAccumulator:
+    """Acumula por jugador victorias en solitario, empates y la parte del bote ganada."""
+
+    def __init__(self, n_players: int):
+        self.wins = np.zeros(n_players, dtype=np.int64)
+        self.ties = np.zeros(n_players, dtype=np.int64)
+        self.shares = np.zeros(n_players, dtype=np.float64)
+        self.shares_sq = np.zeros(n_players, dtype=np.float64)
+        self.total = 0
+
+    def add(self, values: np.ndarray) -> None:
+        # values: (n_players, m). Todos los jugadores se comparan en la misma pasada.
+        best = values.max(axis=0)
+        winners = values == best
+        n_winners = winners.sum(axis=0)
+        shares = winners / n_winners
+
+        sole = winners & (n_winners == 1)
+        self.wins += sole.sum(axis=1)
+        self.ties += (winners & ~sole).sum(axis=1)
+        self.shares += shares.sum(axis=1)
+        self.shares_sq += (shares * shares).sum(axis=1)
+        self.total += values.shape[1]
+
+    def std_errors(self) -> np.ndarray:
+        if self.total == 0:
+            return np.full(len(self.wins), math.inf)
+        mean = self.shares / self.total
+        variance = np.maximum(self.shares_sq / self.total - mean * mean, 0.0)
+        return np.sqrt(variance / self.total)
+
+
+def compute_multiway_equity(holes, board=None, max_exact_boards=MAX_EXACT_BOARDS, target_std_error=0.002,
+                            time_budget=None, max_samples=None, batch_size=20000, seed=None) -> dict:
+    """Equity de MIN_PLAYERS a MAX_PLAYERS jugadores con un board parcial opcional.
+
+    Enumera todos los runouts cuando hay como mucho max_exact_boards; si no,
+    muestrea boards hasta que el error estándar de cada jugador baja de
+    target_std_error, se agota time_budget o se llega a max_samples. Si hay que
+    muestrear sin ninguna de esas tres condiciones: ValueError.
+    """
+    if not MIN_PLAYERS <= len(holes) <= MAX_PLAYERS:
+        raise ValueError(f"Multi-way equity needs {MIN_PLAYERS}-{MAX_PLAYERS} players, got {len(holes)}")
+    holes = [cards_to_ints(hole) for hole in holes]
+    board = cards_to_ints(board or [])
+    blocked = set(board)
+    for hole in holes:
+        blocked |= set(hole)
+    if len(blocked) != len(board) + 2 * len(holes):
+        raise ValueError("Duplicate cards between players or board")
+
+    live = [c for c in range(52) if c not in blocked]
+    missing = 5 - len(board)
+    hole_array = np.array(holes, dtype=np.int16)
+    acc = _ShareAccumulator(len(holes))
+
+    exact = _n_choose_k(len(live), missing) <= max_exact_boards
+    if exact:
+        for runouts in board_chunks(live, missing):
+            acc.add(BoardBatch(with_board(board, runouts)).evaluate_many(hole_array))
+    else:
+        if not target_std_error and time_budget is None and not max_samples:
+            raise ValueError("compute_multiway_equity needs target_std_error, time_budget or max_samples to sample")
+        rng = np.random.default_rng(seed)
+        start = time.perf_counter()
+        while True:
+            size = batch_size if not max_samples else min(batch_size, max_samples - acc.total)
+            boards = with_board(board, sample_boards(rng, live, missing, size))
+            acc.add(BoardBatch(boards).evaluate_many(hole_array))
+
+            if max_samples and acc.total >= max_samples:
+                break
+            if target_std_error and acc.std_errors().max() <= target_std_error:
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+
+    std_errors = acc.std_errors() if not exact else np.zeros(len(holes))
+    players = []
+    for i, hole in enumerate(holes):
+        equity = float(acc.shares[i] / acc.total) if acc.total else 0.0
+        players.append({
+            "cards": [DECK[c] for c in hole],
+            "wins": int(acc.wins[i]),
+            "ties": int(acc.ties[i]),
+            "equity": equity,
+            "std_error": float(std_errors[i]),
+            "ci_low": max(equity - Z_95 * float(std_errors[i]), 0.0),
+            "ci_high": min(equity + Z_95 * float(std_errors[i]), 1.0),
+        })
+    return {
+        "players": players,
+        "total": acc.total,
+        "exact": exact,
+    }
@@ -0,0 +1,145 @@
+import argparse
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import settings
+from src.evaluators.batch_evaluator import count_showdowns
+from src.evaluators.isomorphism import canonical_key
+
+preflop_cache_logger = logging.getLogger(__name__)
+
+# Una fila por enfrentamiento canónico: cartas de hero y villain y recuentos.
+# Las filas pendientes de calcular tienen wins == -1.
+CACHE_DTYPE = np.dtype([
+    ("cards", np.int8, (4,)),
+    ("wins", np.int32),
+    ("ties", np.int32),
+    ("losses", np.int32),
+])
+
+
+def canonical_matchups() -> list:
+    """Todos los enfrentamientos preflop heads-up distintos salvo permutación de palos.
+
+    Cada enfrentamiento se guarda una sola vez: (hero, villain) y (villain, hero)
+    comparten fila intercambiando victorias y derrotas.
+    """
+    # Basta con un representante por cada una de las 169 manos de hero
+    hero_classes = {}
+    for hero in itertools.combinations(range(52), 2):
+        hero_classes.setdefault(canonical_key(hero, ())[0], hero)
+
+    keys = set()
+    for hero in hero_classes.values():
+        for villain in itertools.combinations(range(52), 2):
+            if set(hero) & set(villain):
+                continue
+            key = canonical_key(hero, villain)[:2]
+            keys.add(min(key, canonical_key(villain, hero)[:2]))
+    return sorted(keys)
+
+
+class PreflopEquityCache:
+    """Tabla en disco con la equity de todos los enfrentamientos canónicos preflop.
+
+    El fichero .npy se abre con memory-mapping y un diccionario clave -> fila
+    da acceso O(1).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.table = np.load(path, mmap_mode="r")
+        self.index = {
+            (tuple(row[:2].tolist()), tuple(row[2:].tolist())): i
+            for i, row in enumerate(self.table["cards"])
+        }
+
+    def lookup(self, hero, villain):
+        """(wins, ties, losses) del enfrentamiento, o None si no está calculado."""
+        swapped = False
+        row = self.index.get(canonical_key(hero, villain)[:2])
+        if row is None:
+            swapped = True
+            row = self.index.get(canonical_key(villain, hero)[:2])
+        if row is None:
+            return None
+        entry = self.table[row]
+        if entry["wins"] < 0:
+            return None
+        if swapped:
+            return int(entry["losses"]), int(entry["ties"]), int(entry["wins"])
+        return int(entry["wins"]), int(entry["ties"]), int(entry["losses"])
+
+    def __len__(self):
+        return len(self.table)
+
+
+_CACHE = None
+_CACHE_LOADED = False
+
+
+def get_cache():
+    """Caché compartida del proceso; None si la tabla aún no se ha construido."""
+    global _CACHE, _CACHE_LOADED
+    if not _CACHE_LOADED:
+        _CACHE_LOADED = True
+        if os.path.isfile(settings.PREFLOP_EQUITY_CACHE_PATH):
+            _CACHE = PreflopEquityCache(settings.PREFLOP_EQUITY_CACHE_PATH)
+            preflop_cache_logger.debug(f"Preflop equity cache loaded: {len(_CACHE)} matchups")
+    return _CACHE
+
+
+def _solve_matchup(cards):
+    return count_showdowns(cards[:2], cards[2:])
+
+
+def build_cache(path: str, workers=None, limit=None, flush_every: int = 500) -> int:
+    """Calcula (o completa) la tabla en paralelo. Devuelve las filas calculadas.
+
+    Si el fichero ya existe solo se calculan las filas pendientes, así que una
+    construcción interrumpida se puede reanudar.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.isfile(path):
+        table = np.load(path, mmap_mode="r+")
+    else:
+        matchups = canonical_matchups()
+        table = np.lib.format.open_memmap(path, mode="w+", dtype=CACHE_DTYPE, shape=(len(matchups),))
+        table["cards"] = [hero + villain for hero, villain in matchups]
+        table["wins"] = -1
+        table.flush()
+
+    pending = np.flatnonzero(table["wins"] < 0)
+    if limit:
+        pending = pending[:limit]
+    preflop_cache_logger.info(f"Building preflop equity cache: {len(pending)} of {len(table)} matchups pending")
+
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = (tuple(int(c) for c in table["cards"][row]) for row in pending)
+        for row, (wins, ties, losses) in zip(pending, executor.map(_solve_matchup, jobs, chunksize=16)):
+            table[row] = (table["cards"][row], wins, ties, losses)
+            done += 1
+            if done % flush_every == 0:
+                table.flush()
+                preflop_cache_logger.info(f"{done}/{len(pending)} matchups computed")
+    table.flush()
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construye la caché de equity preflop.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--limit", type=int, default=None, help="Calcular como mucho N enfrentamientos")
+    parser.add_argument("--path", default=settings.PREFLOP_EQUITY_CACHE_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    computed = build_cache(args.path, workers=args.workers, limit=args.limit)
+    print(f"{computed} enfrentamientos calculados en {time.perf_counter() - start:.1f}s -> {args.path}")
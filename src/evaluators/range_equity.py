@@ -0,0 +1,171 @@
+import itertools
+
+import numpy as np
+
+from src.evaluators.batch_evaluator import BoardBatch, board_chunks, with_board, _n_choose_k
+from src.evaluators.hand_evaluator import RANKS, cards_to_ints
+from src.evaluators.monte_carlo import sample_boards
+
+# Los valores de mano (1..7462) caben en 13 bits: sirve para agrupar en una sola clave
+VALUE_SPAN = 1 << 13
+
+
+def expand_hand(hand_str: str) -> list:
+    """Combos concretos de una mano canónica: "AKs" -> 4, "AKo" -> 12, "77" -> 6, "AK" -> 16."""
+    r1, r2 = RANKS.index(hand_str[0]), RANKS.index(hand_str[1])
+    kind = hand_str[2:3]
+
+    if r1 == r2:
+        return [(r1 * 4 + s1, r1 * 4 + s2) for s1, s2 in itertools.combinations(range(4), 2)]
+
+    combos = []
+    for s1 in range(4):
+        for s2 in range(4):
+            if kind == "s" and s1 != s2:
+                continue
+            if kind == "o" and s1 == s2:
+                continue
+            combos.append((r1 * 4 + s1, r2 * 4 + s2))
+    return combos
+
+
+def range_weights(range_table, actions=None) -> dict:
+    """Normaliza un rango de las tablas a {mano: peso}.
+
+    Acepta un set de manos (peso 1), un dict mano -> peso o un dict de
+    frecuencias por acción, del que se suman las acciones indicadas.
+    """
+    if isinstance(actions, str):
+        actions = (actions,)
+
+    weights = {}
+    for hand in range_table:
+        value = range_table[hand] if isinstance(range_table, dict) else 1.0
+        if isinstance(value, dict):
+            value = sum(value.get(action, 0.0) for action in actions) if actions else 1.0 - value.get("FOLD", 0.0)
+        if value > 0:
+            weights[hand] = float(value)
+    return weights
+
+
+def range_combos(range_table, actions=None, dead=()):
+    """Combos ponderados de un rango, sin los combos bloqueados por cartas conocidas."""
+    dead = set(cards_to_ints(dead))
+    combos, weights = [], []
+    for hand, weight in range_weights(range_table, actions).items():
+        for combo in expand_hand(hand):
+            if combo[0] in dead or combo[1] in dead:
+                continue
+            combos.append(combo)
+            weights.append(weight)
+    return np.array(combos, dtype=np.int16).reshape(-1, 2), np.array(weights, dtype=np.float64)
+
+
+def _compare_groups(h_vals, h_w, h_grp, v_vals, v_w, v_grp):
+    """Suma w_h * w_v de los pares del mismo grupo en que hero gana, empata, y en total."""
+    v_keys = v_grp * VALUE_SPAN + v_vals
+    order = np.argsort(v_keys, kind="stable")
+    v_sorted = v_keys[order]
+    cum = np.concatenate(([0.0], np.cumsum(v_w[order])))
+
+    # Consultas ordenadas: searchsorted recorre el array de forma secuencial
+    h_keys = h_grp * VALUE_SPAN + h_vals
+    h_order = np.argsort(h_keys, kind="stable")
+    h_keys, h_grp, h_w = h_keys[h_order], h_grp[h_order], h_w[h_order]
+    group_lo = cum[np.searchsorted(v_sorted, h_grp * VALUE_SPAN, "left")]
+    group_hi = cum[np.searchsorted(v_sorted, (h_grp + 1) * VALUE_SPAN, "left")]
+    below = cum[np.searchsorted(v_sorted, h_keys, "left")]
+    upto = cum[np.searchsorted(v_sorted, h_keys, "right")]
+
+    return (
+        float(np.dot(h_w, below - group_lo)),
+        float(np.dot(h_w, upto - below)),
+        float(np.dot(h_w, group_hi - group_lo)),
+    )
+
+
+def _chunk_sums(batch, board_cards, hero, hero_w, villain, villain_w, shared):
+    m = len(batch)
+    hero_vals = batch.evaluate_many(hero).astype(np.int64)
+    villain_vals = batch.evaluate_many(villain).astype(np.int64)
+
+    # Peso 0 para los combos que chocan con el board
+    hero_bits = (np.int64(1) << hero.astype(np.int64)).sum(axis=1)
+    villain_bits = (np.int64(1) << villain.astype(np.int64)).sum(axis=1)
+    hero_w = hero_w[:, None] * ((hero_bits[:, None] & board_cards[None, :]) == 0)
+    villain_w = villain_w[:, None] * ((villain_bits[:, None] & board_cards[None, :]) == 0)
+
+    # 1) Todos los pares de combos por board
+    board_ids = np.broadcast_to(np.arange(m, dtype=np.int64), hero_vals.shape)
+    v_board_ids = np.broadcast_to(np.arange(m, dtype=np.int64), villain_vals.shape)
+    win, tie, total = _compare_groups(
+        hero_vals.ravel(), hero_w.ravel(), board_ids.ravel(),
+        villain_vals.ravel(), villain_w.ravel(), v_board_ids.ravel(),
+    )
+
+    # 2) Restar los pares que comparten alguna carta (agrupando por board y carta)
+    def per_card(vals, w, combos):
+        grp = np.arange(m, dtype=np.int64)[None, :] * 52
+        groups = [(grp + combos[:, k].astype(np.int64)[:, None]).ravel() for k in range(2)]
+        return np.tile(vals.ravel(), 2), np.tile(w.ravel(), 2), np.concatenate(groups)
+
+    c_win, c_tie, c_total = _compare_groups(*per_card(hero_vals, hero_w, hero), *per_card(villain_vals, villain_w, villain))
+    win -= c_win
+    tie -= c_tie
+    total -= c_total
+
+    # 3) Los pares con el mismo combo se restaron dos veces: siempre son empate
+    for i, j in shared:
+        same = float(np.dot(hero_w[i], villain_w[j]))
+        tie += same
+        total += same
+
+    return win, tie, total
+
+
+def range_vs_range_equity(hero_range, villain_range, hero_actions=None, villain_actions=None,
+                          board=(), dead=(), n_boards=2000, chunk_size=100, seed=None) -> dict:
+    """Equity de un rango contra otro sobre los mismos boards.
+
+    Todos los combos se evalúan a la vez sobre cada bloque de boards compartidos.
+    Si el número de runouts posibles no supera n_boards se enumeran todos; si no,
+    se muestrean n_boards boards uniformes.
+    """
+    board = cards_to_ints(board)
+    known = set(board) | set(cards_to_ints(dead))
+    hero, hero_w = range_combos(hero_range, hero_actions, known)
+    villain, villain_w = range_combos(villain_range, villain_actions, known)
+
+    villain_index = {tuple(sorted(c)): j for j, c in enumerate(villain.tolist())}
+    shared = [(i, villain_index[tuple(sorted(c))]) for i, c in enumerate(hero.tolist()) if tuple(sorted(c)) in villain_index]
+
+    live = [c for c in range(52) if c not in known]
+    missing = 5 - len(board)
+    if _n_choose_k(len(live), missing) <= n_boards:
+        chunks = board_chunks(live, missing)
+    else:
+        rng = np.random.default_rng(seed)
+        sizes = [chunk_size] * (n_boards // chunk_size) + ([n_boards % chunk_size] if n_boards % chunk_size else [])
+        chunks = (sample_boards(rng, live, missing, size) for size in sizes)
+
+    win = tie = total = 0.0
+    n_total = 0
+    for runouts in chunks:
+        boards = with_board(board, runouts)
+        board_cards = (np.int64(1) << boards.astype(np.int64)).sum(axis=1)
+        c_win, c_tie, c_total = _chunk_sums(BoardBatch(boards), board_cards, hero, hero_w, villain, villain_w, shared)
+        win += c_win
+        tie += c_tie
+        total += c_total
+        n_total += len(boards)
+
+    equity = (win + 0.5 * tie) / total if total > 0 else 0
+    return {
+        "win": win / total if total > 0 else 0,
+        "tie": tie / total if total > 0 else 0,
+        "lose": (total - win - tie) / total if total > 0 else 0,
+        "equity": equity,
+        "boards": n_total,
+        "hero_combos": len(hero),
+        "villain_combos": len(villain),
+    }
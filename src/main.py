@@ -1,14 +1,18 @@
+import argparse
 import os
 import sys
+import time
 import logging
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
+from config import settings
 from src.utils.logger_config import setup_logging
 from src.rooms.pokerstars_room import PokerStarsRoom
 from src.analyzers.analyzer import Analyzer
+from src.utils.metrics import metrics
 
 main_logger = logging.getLogger(__name__)
 
@@ -19,16 +23,66 @@ def main():
 
     rooms = [ PokerStarsRoom(True) ]
     
-    analyzers = Analyzer(active=True)
+    with metrics.stage("analyze"):
+        analyzers = Analyzer(active=True)
 
     for room in rooms:
         main_logger.info(f"Procesando sala: {room.name_room}")
 
     main_logger.info("Fin de aplicación\n\n")
 
+def watch(interval: float):
+    setup_logging()
+    main_logger.info("Inicio de aplicación en modo watch")
+
+    rooms = [ PokerStarsRoom(watch=True) ]
+    analyzers = Analyzer(active=True)
+
+    try:
+        with metrics.stage("watch"):
+            while True:
+                started = time.monotonic()
+                saved = 0
+                for room in rooms:
+                    saved += room.poll()
+                # Los analizadores son incrementales: solo recorren las manos nuevas
+                if saved:
+                    main_logger.info(f"{saved} manos nuevas. Actualizando estadísticas...")
+                    analyzers.execute_analyzers()
+                time.sleep(max(interval - (time.monotonic() - started), 0))
+    except KeyboardInterrupt:
+        main_logger.info("Modo watch detenido")
+    finally:
+        for room in rooms:
+            room.close()
+        main_logger.info("Fin de aplicación\n\n")
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Recoge, parsea y analiza historiales de manos.")
+    arg_parser.add_argument("--watch", action="store_true", help="Sigue los historiales del cliente según se escriben")
+    arg_parser.add_argument("--interval", type=float, default=settings.WATCH_INTERVAL, help="Segundos entre comprobaciones en modo watch")
+    arg_parser.add_argument("--debug", action="store_true", default=settings.LOG_DEBUG,
+                            help=f"Escribe también un fichero de debug por ejecución en {settings.DEBUG_DIR}")
+    arg_parser.add_argument("--trace-hands", action="store_true", default=settings.LOG_HAND_TRACE,
+                            help="Incluye en el debug el detalle de cada mano parseada y analizada (muy voluminoso)")
+    arg_parser.add_argument("--import-history", action="store_true",
+                            help="Vuelve a importar a la base de datos los backups y formatted_hands de versiones anteriores")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help=f"Guarda cProfile y tracemalloc de cada etapa en {settings.PROFILES_DIR}")
+    args = arg_parser.parse_args()
+    settings.LOG_DEBUG = args.debug
+    settings.LOG_HAND_TRACE = args.trace_hands
+    settings.FORCE_HISTORY_IMPORT = args.import_history
+    if args.profile:
+        metrics.enable_profiling(os.path.join(settings.PROFILES_DIR, metrics.started.strftime("%Y%m%d%H%M%S")))
     try:
-        main()
+        if args.watch:
+            watch(args.interval)
+        else:
+            main()
     except Exception as e:
         main_logger.critical(f"An critical error has been on main: {e}", exc_info=True)
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    finally:
+        # Resumen de la ejecución en consola y en el log, y volcado JSON en METRICS_DIR
+        print(metrics.report(settings.METRICS_DIR))
\ No newline at end of file
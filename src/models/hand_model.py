@@ -1,5 +1,14 @@
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable, Iterator
+
+
+# Códigos compartidos por el modelo compacto y los backends de base de datos
+STREETS = ("preflop", "flop", "turn", "river")
+ACTION_TYPES = ("FOLD", "CHECK", "CALL", "BET", "RAISE")
+ACTION_CODES = {action: i for i, action in enumerate(ACTION_TYPES)}
+CARDS = [r + s for r in "23456789TJQKA" for s in "shdc"]
+CARD_CODES = {card: i for i, card in enumerate(CARDS)}
 
 
 @dataclass
@@ -18,4 +27,289 @@ class StandardHand:
     winner: Optional[str] = None
     win_amount: float = 0.0  # En BB
     rake: float = 0.0        # En BB
-    raw_text: str = field(default="", repr=False)
\ No newline at end of file
+    raw_text: str = field(default="", repr=False)
+
+
+class HandTable:
+    """Colección de manos en memoria como struct-of-arrays.
+
+    Cada campo es un array tipado con una fila por mano, jugador o acción; los
+    textos (nombres, mesas, posiciones) se guardan como código en un diccionario
+    de cadenas compartido y las acciones apuntan al jugador por su índice dentro
+    de la mano. El raw_text no se guarda: se pide a raw_text_loader al acceder.
+    """
+
+    __slots__ = (
+        "strings", "_codes", "raw_text_loader",
+        "hand_id", "room_name", "game_type", "day", "time", "table_name", "table_size",
+        "sb", "bb", "board", "winner", "win_amount", "rake", "player_offset", "action_offset",
+        "p_name", "p_stack", "p_seat", "p_position", "p_cards", "p_active",
+        "a_street", "a_player", "a_action", "a_amount", "a_names",
+    )
+
+    def __init__(self, raw_text_loader: Optional[Callable[[str], Optional[str]]] = None):
+        self.strings = []
+        self._codes = {}
+        self.raw_text_loader = raw_text_loader
+
+        # Manos. La fecha se parte en día (código) y segundos del día para no
+        # guardar una cadena distinta por mano.
+        self.hand_id = array("q")
+        self.room_name = array("i")
+        self.game_type = array("i")
+        self.day = array("i")
+        self.time = array("i")
+        self.table_name = array("i")
+        self.table_size = array("b")
+        self.sb = array("d")
+        self.bb = array("d")
+        self.board = array("b")          # 5 cartas por mano (-1 = vacío)
+        self.winner = array("i")
+        self.win_amount = array("d")
+        self.rake = array("d")
+        self.player_offset = array("I", [0])
+        self.action_offset = array("I", [0])
+
+        # Jugadores
+        self.p_name = array("i")
+        self.p_stack = array("d")
+        self.p_seat = array("b")
+        self.p_position = array("i")
+        self.p_cards = array("b")        # 2 cartas por jugador (-1 = vacío)
+        self.p_active = array("b")
+
+        # Acciones. a_player es el índice del jugador en la mano; si el jugador
+        # no tiene asiento (-1) su nombre queda en a_names por fila de acción.
+        self.a_street = array("b")
+        self.a_player = array("b")
+        self.a_action = array("b")
+        self.a_amount = array("d")
+        self.a_names = {}
+
+    def __len__(self) -> int:
+        return len(self.hand_id)
+
+    def __getitem__(self, row: int) -> "CompactHand":
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return CompactHand(self, row)
+
+    def __iter__(self) -> Iterator["CompactHand"]:
+        for row in range(len(self)):
+            yield CompactHand(self, row)
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def text(self, code: int) -> Optional[str]:
+        return None if code < 0 else self.strings[code]
+
+    def date_codes(self, date_played: Optional[str]):
+        """(código del día, segundos del día) con los que se guarda date_played."""
+        day, seconds = _split_date(date_played)
+        return self.code(day), seconds
+
+    def append(self, hand) -> int:
+        """Añade una mano (StandardHand o su dict) y devuelve su fila."""
+        if not isinstance(hand, dict):
+            hand = hand.__dict__
+        code = self.code
+        row = len(self)
+
+        self.hand_id.append(int(hand["hand_id"]))
+        self.room_name.append(code(hand.get("room_name")))
+        self.game_type.append(code(hand.get("game_type")))
+        day, seconds = self.date_codes(hand.get("date_played"))
+        self.day.append(day)
+        self.time.append(seconds)
+        self.table_name.append(code(hand.get("table_name")))
+        table_size = hand.get("table_size")
+        self.table_size.append(-1 if table_size is None else table_size)
+        self.sb.append(hand.get("sb", 0.0))
+        self.bb.append(hand.get("bb", 0.0))
+        self.board.extend(_card_codes(hand.get("board", []), 5))
+        self.winner.append(code(hand.get("winner")))
+        self.win_amount.append(hand.get("win_amount", 0.0))
+        self.rake.append(hand.get("rake", 0.0))
+
+        index = {}
+        for i, player in enumerate(hand.get("players", [])):
+            index.setdefault(player["name"], i)
+            self.p_name.append(code(player["name"]))
+            self.p_stack.append(player["stack"])
+            self.p_seat.append(player["seat"])
+            self.p_position.append(code(player.get("position")))
+            self.p_cards.extend(_card_codes(player.get("cards", []), 2))
+            self.p_active.append(bool(player.get("active")))
+        self.player_offset.append(len(self.p_name))
+
+        actions = hand.get("actions", {})
+        for street_code, street in enumerate(STREETS):
+            for action in actions.get(street, []):
+                player = index.get(action["player"], -1)
+                if player < 0:
+                    self.a_names[len(self.a_street)] = action["player"]
+                self.a_street.append(street_code)
+                self.a_player.append(player)
+                self.a_action.append(ACTION_CODES[action["action"]])
+                self.a_amount.append(action["amount"])
+        self.action_offset.append(len(self.a_street))
+        return row
+
+    def extend(self, hands) -> None:
+        for hand in hands:
+            self.append(hand)
+
+    def raw_text(self, row: int) -> str:
+        if self.raw_text_loader is None:
+            return ""
+        return self.raw_text_loader(str(self.hand_id[row])) or ""
+
+    def players(self, row: int) -> List[Dict[str, Any]]:
+        # Cada columna se corta una vez para la mano en lugar de indexarla jugador a jugador
+        text = self.text
+        start, stop = self.player_offset[row], self.player_offset[row + 1]
+        cards = self.p_cards[2 * start:2 * stop]
+        return [
+            {
+                "name": text(name),
+                "stack": stack,
+                "seat": seat,
+                "position": text(position),
+                "cards": [CARDS[c] for c in cards[2 * i:2 * i + 2] if c >= 0],
+                "active": bool(active),
+            }
+            for i, (name, stack, seat, position, active) in enumerate(zip(
+                self.p_name[start:stop], self.p_stack[start:stop], self.p_seat[start:stop],
+                self.p_position[start:stop], self.p_active[start:stop]))
+        ]
+
+    def actions(self, row: int) -> Dict[str, List[Dict[str, Any]]]:
+        names = [self.strings[code] for code in self.p_name[self.player_offset[row]:self.player_offset[row + 1]]]
+        start, stop = self.action_offset[row], self.action_offset[row + 1]
+        actions = {street: [] for street in STREETS}
+        for i, street, player, action, amount in zip(
+                range(start, stop), self.a_street[start:stop], self.a_player[start:stop],
+                self.a_action[start:stop], self.a_amount[start:stop]):
+            actions[STREETS[street]].append({
+                "player": names[player] if player >= 0 else self.a_names[i],
+                "action": ACTION_TYPES[action],
+                "amount": amount,
+            })
+        return actions
+
+    def field(self, row: int, key: str):
+        """Un solo campo de la mano, con el mismo valor que tendría en to_dict."""
+        getter = _FIELDS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self, row)
+
+    def to_dict(self, row: int, raw_text: bool = False) -> Dict[str, Any]:
+        """Reconstruye la mano en el formato de StandardHand.__dict__."""
+        hand = {key: getter(self, row) for key, getter in _FIELDS.items() if key != "raw_text"}
+        hand["raw_text"] = self.raw_text(row) if raw_text else ""
+        return hand
+
+    def nbytes(self) -> int:
+        """Tamaño aproximado de los arrays y del diccionario de cadenas."""
+        size = sum(getattr(self, name).buffer_info()[1] * getattr(self, name).itemsize
+                   for name in self.__slots__ if isinstance(getattr(self, name), array))
+        return size + sum(len(s) + 49 for s in self.strings)
+
+
+class CompactHand:
+    """Vista de una fila de HandTable.
+
+    Se comporta como el dict de StandardHand para lectura (hand["actions"],
+    hand.get("players")), pero solo materializa los campos que se piden. Cada
+    campo se construye una vez por vista: varios analizadores leen la misma mano.
+    """
+
+    __slots__ = ("table", "row", "_fields")
+
+    def __init__(self, table: HandTable, row: int):
+        self.table = table
+        self.row = row
+        self._fields = {}
+
+    @property
+    def hand_id(self) -> str:
+        return str(self.table.hand_id[self.row])
+
+    @property
+    def raw_text(self) -> str:
+        return self.table.raw_text(self.row)
+
+    def to_dict(self, raw_text: bool = False) -> Dict[str, Any]:
+        return self.table.to_dict(self.row, raw_text)
+
+    def __getitem__(self, key: str):
+        try:
+            return self._fields[key]
+        except KeyError:
+            value = self._fields[key] = self.table.field(self.row, key)
+            return value
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return f"CompactHand(hand_id={self.hand_id})"
+
+
+def _card_codes(cards, width: int) -> list:
+    codes = [CARD_CODES[c] for c in cards[:width]]
+    return codes + [-1] * (width - len(codes))
+
+
+def _split_date(date_played: Optional[str]):
+    # 'dd-mm-YYYY HH:MM:SS' -> ('dd-mm-YYYY', segundos del día). Cualquier otro
+    # formato se guarda entero con segundos -1.
+    if date_played and len(date_played) == 19 and date_played[10] == " ":
+        hh, mm, ss = date_played[11:13], date_played[14:16], date_played[17:19]
+        if (hh + mm + ss).isdigit():
+            return date_played[:10], int(hh) * 3600 + int(mm) * 60 + int(ss)
+    return date_played, -1
+
+
+def _join_date(day: Optional[str], seconds: int) -> Optional[str]:
+    if seconds < 0:
+        return day
+    return f"{day} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _table_size(table: HandTable, row: int) -> Optional[int]:
+    size = table.table_size[row]
+    return None if size < 0 else size
+
+
+# Campos de StandardHand y cómo se leen de una fila de HandTable
+_FIELDS = {
+    "hand_id": lambda t, row: str(t.hand_id[row]),
+    "room_name": lambda t, row: t.text(t.room_name[row]),
+    "game_type": lambda t, row: t.text(t.game_type[row]),
+    "sb": lambda t, row: t.sb[row],
+    "bb": lambda t, row: t.bb[row],
+    "date_played": lambda t, row: _join_date(t.text(t.day[row]), t.time[row]),
+    "table_name": lambda t, row: t.text(t.table_name[row]),
+    "table_size": _table_size,
+    "players": HandTable.players,
+    "actions": HandTable.actions,
+    "board": lambda t, row: [CARDS[c] for c in t.board[5 * row:5 * row + 5] if c >= 0],
+    "winner": lambda t, row: t.text(t.winner[row]),
+    "win_amount": lambda t, row: t.win_amount[row],
+    "rake": lambda t, row: t.rake[row],
+    "raw_text": HandTable.raw_text,
+}
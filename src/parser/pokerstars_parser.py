@@ -1,21 +1,141 @@
 from src.base.base_parser import BaseParser
 import os
+import json
 import shutil
 import logging
 import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
 from config import settings
 from src.models.hand_model import StandardHand
+from src.database.db_manager_factory import create_db_manager
+from src.database.hand_index import HandIndex
+from src.utils.metrics import metrics
+from src.utils.logger_config import get_hand_trace_logger, setup_worker_logging, worker_logging_config
 from typing import Optional, List, Dict, Any
+from datetime import datetime
 
 pokerstars_parser_logger = logging.getLogger(__name__)
+# Debug de cada mano; se activa con set_hand_trace()
+pokerstars_parser_trace_logger = get_hand_trace_logger(__name__)
+
+# Expresiones del parser de una sola pasada, compiladas al cargar el módulo
+HEADER_RE = re.compile(
+    r"Mano n\.º (\d+) de (?:Zoom de )?PokerStars:  Hold'em No Limit \(([\d\.,]+)[^\d]+\/([\d\.,]+)[^\d]+\).* - ([\d\- :]+) CET"
+)
+TOURNAMENT_RE = re.compile(r"Torneo n\.º \d+")
+TABLE_RE = re.compile(r'Mesa "([^"]+)" (\d+)-max El asiento n\.º (\d+) es el botón')
+SEAT_RE = re.compile(r"Asiento (\d+):\s*(.+?)\s+\(([\d\.,]+).+en fichas\)( está ausente)?")
+OUT_RES = (
+    re.compile(r"^([^\:]+) deja la mesa"),
+    re.compile(r"^([^\:]+) ha agotado su tiempo mientras siga sin conexión"),
+    re.compile(r"^([^\:]+): está ausente$"),
+)
+SMALL_BLIND_RE = re.compile(r"^(.+?): pone la ciega pequeña")
+BIG_BLIND_RE = re.compile(r"^(.+?): pone la ciega grande")
+HOLE_CARDS_RE = re.compile(r"^Repartidas a (.+?) \[([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\]")
+ACTION_RE = re.compile(
+    r"^(?P<player>.+?): (?:(?P<FOLD>se retira)|(?P<CHECK>pasa)|iguala (?P<CALL>[\d\.,]+) €"
+    r"|apuesta (?P<BET>[\d\.,]+) €|sube .* a (?P<RAISE>[\d\.,]+) €)"
+)
+FLOP_RE = re.compile(r"\*\*\* FLOP \*\*\* \[([^\]]+)\]")
+TURN_RE = re.compile(r"\*\*\* TURN \*\*\* \[[^\]]+\] \[([^\]]+)\]")
+RIVER_RE = re.compile(r"\*\*\* RIVER \*\*\* \[[^\]]+\] \[([^\]]+)\]")
+WIN_RE = re.compile(r"([^\s]+) se lleva ([\d\.,]+)[^\d]+del bote")
+RAKE_RE = re.compile(r"Comisión ([\d\.,]+)[^\d]+")
+
+STREET_MARKERS = (
+    ("*** CARTAS DE MANO ***", "preflop"),
+    ("*** FLOP ***", "flop"),
+    ("*** TURN ***", "turn"),
+    ("*** RIVER ***", "river"),
+)
+
+
+def iter_hands(lines):
+    """Separa un historial en manos leyendo línea a línea.
+
+    Equivale a re.split(r'\n{2,}') sobre el fichero entero con los espacios duros
+    normalizados, pero sin cargar el fichero en memoria: cada línea vacía cierra
+    la mano en curso.
+    """
+    buffer = []
+    for line in lines:
+        if line == '\n':
+            hand = ''.join(buffer).strip()
+            buffer = []
+            if hand:
+                yield hand
+            continue
+        buffer.append(line.replace('\u00A0', ' '))
+
+    hand = ''.join(buffer).strip()
+    if hand:
+        yield hand
+
+
+def parse_hand_items(parser, items) -> list:
+    """Parsea una lista de (hand_id, hand_text, filename) con format_hand.
+
+    Devuelve (hand_id, StandardHand o None, error o None) en el mismo orden; un
+    fallo en una mano no interrumpe el resto.
+    """
+    results = []
+    parsed = 0
+    for hand_id, hand_text, filename in items:
+        start = time.perf_counter()
+        try:
+            hand = parser.format_hand(hand_text, filename=filename)
+        except Exception as e:
+            metrics.incr(f"parser.failed.{type(e).__name__}")
+            results.append((hand_id, None, f"{type(e).__name__}: {e}"))
+            continue
+        metrics.add_time("parser.format_hand", time.perf_counter() - start)
+        if hand:
+            parsed += 1
+        results.append((hand_id, hand, None))
+    metrics.incr("parser.hands_parsed", parsed)
+    return results
+
+
+# Parser propio de cada proceso del pool (sin conexión a la base de datos)
+_worker_parser = None
+
+
+def _init_worker(name_room: str, hero_name: str, log_config) -> None:
+    global _worker_parser
+    # Los logs del proceso van a la cola del principal, que es quien escribe los ficheros
+    setup_worker_logging(log_config)
+    _worker_parser = PokerStarsParser(name_room, hero_name, active=False, connect_db=False)
+    metrics.init_worker()
+
+
+def _parse_chunk(items):
+    # Las métricas del bloque viajan con los resultados para sumarse en el proceso principal
+    return parse_hand_items(_worker_parser, items), metrics.drain()
+
 
 class PokerStarsParser(BaseParser):
-    def __init__(self, name_room: str, hero_name: str, active: bool):
+    def __init__(self, name_room: str, hero_name: str, active: bool, workers: Optional[int] = None, connect_db: bool = True):
         self.hero_name = hero_name
         self.name_room = name_room
         self.source_dir = os.path.join(settings.RAW_HAND_HISTORIES_DIR, name_room)
         self.processed_dir = os.path.join(settings.PROCESSED_HAND_HISTORIES_DIR, name_room)
         self.formatted_dir = settings.FORMATTED_HANDS_DIR
+        self.workers = settings.PARSER_WORKERS if workers is None else workers
+        self.chunk_size = settings.PARSER_CHUNK_SIZE
+        self.executor = None
+        self.db = create_db_manager() if connect_db else None
+        # Índice hand_id -> hash en memoria para detectar duplicados sin leer la base de datos
+        self.index = HandIndex.open(self.db) if connect_db else None
+        self.pending_hands = {}
+        # Manos enviadas a parsear que aún no están en pending_hands (modo paralelo)
+        self.queued_hands = {}
+        # Ficheros con bloques enviados a parsear, en el orden en que se guardan
+        self.in_flight = deque()
+        self.stats = {"files": 0, "hands": 0, "saved": 0, "duplicates": 0, "errors": 0}
 
         super().__init__(self.source_dir, self.processed_dir, self.formatted_dir)
 
@@ -27,6 +147,11 @@ class PokerStarsParser(BaseParser):
         if active:
             self.parse_files()
             self.convert_all_to_json()
+        # Tras parsear lo nuevo, el histórico anterior solo completa las manos que falten
+        if connect_db and (settings.FORCE_HISTORY_IMPORT or not self.history_imported()):
+            self.import_history()
+        if active:
+            self.db.close()
 
     def check_dir(self) -> bool:
         pokerstars_parser_logger.debug("Checking source folder...")
@@ -47,76 +172,292 @@ class PokerStarsParser(BaseParser):
         return True
     
     def format_file(self, filename: str):
+        job = self.read_file(filename)
+        if job:
+            self.finish_file(job)
+
+    def read_file(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Separa las manos de un fichero, descarta duplicados y las envía a parsear."""
         filepath = os.path.join(self.source_dir, filename)
         pokerstars_parser_logger.debug(f"Processing file: {filename}")
         if not os.path.isfile(filepath):
             pokerstars_parser_logger.warning(f"File {filename} is not a file. Skipping...")
-            return
+            return None
         try:
             with open(filepath, 'r', encoding='utf-8') as file:
-                content = file.read()
-
-            content = content.replace('\u00A0', ' ').replace('\xa0', ' ')
-
-            hands = [h.strip() for h in re.split(r'\n{2,}', content) if h.strip()]
-
-            pokerstars_parser_logger.debug(f"Found {len(hands)} hands in file {filename}")
-
-            for idx, hand in enumerate(hands):
-                match = re.search(r'Mano n\.º (\d+)', hand)
-                if match:
-                    hand_id = match.group(1)
-                    pokerstars_parser_logger.debug(f"Found hand ID: {hand_id} in file {filename}")
-                    processed_file_path = os.path.join(self.processed_dir, f"{hand_id}.txt")
-                    
-                    if os.path.exists(processed_file_path):
-                        with open(processed_file_path, 'r', encoding='utf-8') as existing_file:
-                            existing_content = existing_file.read()
-                        if existing_content == hand:
-                            pokerstars_parser_logger.warning(f"Hand {hand_id} already exists and is identical. Skipping.")
-                            continue
-                        else:
-                            pokerstars_parser_logger.critical(
-                                f"Hand {hand_id} already exists but content differs! Ignoring..."
-                            )
-                            continue
-                    
-                    with open(processed_file_path, 'w', encoding='utf-8') as processed_file:
-                        processed_file.write(hand)
-                    pokerstars_parser_logger.debug(f"Processed hand {hand_id} and saved to {processed_file_path}")
-                else:
+                metrics.incr("parser.bytes_read", os.fstat(file.fileno()).st_size)
+                return self.queue_hands(filename, iter_hands(file), filepath=filepath)
+        except OSError as e:
+            pokerstars_parser_logger.error(f"Error processing file {filename}: {e}")
+            return None
+
+    def queue_hands(self, filename: str, hand_texts, quiet_duplicates: bool = False, save_failed: bool = True,
+                    filepath: Optional[str] = None) -> Dict[str, Any]:
+        """Descarta duplicados de las manos de filename y las envía a parsear por bloques.
+
+        Cada chunk_size manos se envía un bloque y, si hay demasiadas manos en curso,
+        se guardan las más antiguas: la memoria no depende del tamaño del fichero.
+        """
+        job = {"filename": filename, "filepath": filepath, "hands": 0, "duplicates": 0, "errors": 0, "saved": 0,
+               "failed": [], "save_failed": save_failed, "chunks": deque(), "queued": False, "read_error": False}
+        self.in_flight.append(job)
+        items = []
+        start = time.perf_counter()
+        # Tiempo de parseo y guardado dentro del bucle, que no cuenta como separación
+        parse_time = 0.0
+        try:
+            for idx, hand_text in enumerate(hand_texts):
+                job["hands"] += 1
+                metrics.observe("parser.hand_chars", len(hand_text))
+                match = re.search(r'Mano n\.º (\d+)', hand_text)
+                if not match:
                     pokerstars_parser_logger.error(
-                        f"No valid hand ID found in file {filename} at hand #{idx+1}: {hand[:60]}..."
+                        f"No valid hand ID found in file {filename} at hand #{idx+1}: {hand_text[:60]}..."
                     )
+                    job["errors"] += 1
+                    job["failed"].append(("no_hand_id", hand_text))
+                    metrics.incr("parser.failed.no_hand_id")
+                    continue
+
+                hand_id = match.group(1)
+                pokerstars_parser_trace_logger.debug("Found hand ID: %s in file %s", hand_id, filename)
+                if self.is_duplicate(hand_id, hand_text, quiet=quiet_duplicates):
+                    job["duplicates"] += 1
+                    continue
+
+                if settings.SAVE_PROCESSED_HANDS:
+                    self.save_hand_text(hand_id, hand_text)
+                self.queued_hands[hand_id] = hand_text
+                items.append((hand_id, hand_text, f"{hand_id}.txt"))
+                if len(items) >= self.chunk_size:
+                    parse_start = time.perf_counter()
+                    job["chunks"].extend(self.submit_hands(items))
+                    items = []
+                    self.drain(self.max_queued())
+                    parse_time += time.perf_counter() - parse_start
+        except Exception as e:
+            # Las manos ya separadas están completas y se guardan; el fichero queda en origen
+            # para reintentarlo y esas manos se detectarán entonces como duplicadas
+            pokerstars_parser_logger.error(f"Error processing file {filename}: {e}")
+            job["read_error"] = True
+
+        # Separación de manos y descarte de duplicados (sin el parseo)
+        metrics.add_time("parser.split", time.perf_counter() - start - parse_time, job["hands"])
+        metrics.incr("parser.hands_split", job["hands"])
+        metrics.observe("parser.hands_per_file", job["hands"])
+
+        # La mano se parsea en memoria y va directamente a la base de datos
+        if items:
+            job["chunks"].extend(self.submit_hands(items))
+        job["queued"] = True
+        return job
+
+    def parse_text(self, filename: str, text: str) -> int:
+        """Parsea y guarda las manos completas de un trozo de historial (modo watch).
+
+        Devuelve cuántas manos nuevas se guardaron.
+        """
+        saved = self.stats["saved"]
+        self.finish_file(self.queue_hands(filename, iter_hands(text.splitlines(keepends=True))))
+        return self.stats["saved"] - saved
+
+    @contextmanager
+    def parser_pool(self):
+        """Pool de procesos para submit_hands mientras dure el bloque (si workers > 1)."""
+        if not self.workers or self.workers <= 1:
+            yield
+            return
+        pokerstars_parser_logger.debug(f"Parallel parse with {self.workers} workers, chunks of {self.chunk_size} hands")
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.name_room, self.hero_name, worker_logging_config())) as executor:
+            self.executor = executor
+            try:
+                yield
+            finally:
+                self.executor = None
+
+    def submit_hands(self, items) -> list:
+        if self.executor is None:
+            return [parse_hand_items(self, items)]
+        return [
+            self.executor.submit(_parse_chunk, items[i:i + self.chunk_size])
+            for i in range(0, len(items), self.chunk_size)
+        ]
+
+    @staticmethod
+    def gather_hands(jobs):
+        # Resultados en el orden en que se enviaron las manos
+        for chunk in jobs:
+            if isinstance(chunk, Future):
+                chunk, worker_metrics = chunk.result()
+                metrics.merge(worker_metrics)
+            yield from chunk
+
+    def max_queued(self) -> int:
+        # Manos en curso permitidas antes de guardar las más antiguas (con pool, varios bloques a la vez)
+        return self.workers * self.chunk_size * 4 if self.executor else 0
+
+    def drain(self, max_queued: int) -> None:
+        """Guarda bloques parseados, del más antiguo al más nuevo, hasta dejar max_queued manos en curso."""
+        while self.in_flight and len(self.queued_hands) > max_queued:
+            job = self.in_flight[0]
+            if not job["chunks"] and not job["queued"]:
+                # Las manos en curso son del fichero que se está separando y aún no se enviaron
+                break
+            self.collect_chunk()
+
+    def collect_chunk(self) -> None:
+        """Guarda el bloque más antiguo en curso y cierra su fichero si era el último."""
+        job = self.in_flight[0]
+        if job["chunks"]:
+            for hand_id, hand, error in self.gather_hands([job["chunks"].popleft()]):
+                hand_text = self.queued_hands.pop(hand_id, None)
+                if error:
+                    job["errors"] += 1
+                    job["failed"].append((error, hand_text))
+                    pokerstars_parser_logger.error(f"Error parsing hand {hand_id} in file {job['filename']}: {error}")
+                elif hand and self.save_hand(hand):
+                    job["saved"] += 1
+            if len(self.pending_hands) >= FLUSH_HANDS:
+                self.flush_hands()
+        if not job["chunks"] and job["queued"]:
+            self.in_flight.popleft()
+            self.close_file(job)
+
+    def finish_file(self, job: Dict[str, Any]) -> None:
+        """Guarda las manos de job (y las de los ficheros anteriores aún en curso) y cierra el fichero."""
+        while any(pending is job for pending in self.in_flight):
+            self.collect_chunk()
+
+    def close_file(self, job: Dict[str, Any]) -> None:
+        """Escribe las manos pendientes, suma las estadísticas y mueve el fichero a backup."""
+        filename = job["filename"]
+        saved_count = job["saved"]
+        self.flush_hands()
+        pokerstars_parser_logger.debug(
+            f"Found {job['hands']} hands in file {filename}, {saved_count} saved, "
+            f"{job['duplicates']} duplicated, {job['errors']} errors"
+        )
+        self.stats["hands"] += job["hands"]
+        self.stats["saved"] += saved_count
+        self.stats["duplicates"] += job["duplicates"]
+        self.stats["errors"] += job["errors"]
+        metrics.incr("parser.hands_saved", saved_count)
+        metrics.incr("parser.duplicates", job["duplicates"])
+        if job["failed"] and job["save_failed"]:
+            self.save_failed_hands(filename, job["failed"])
+
+        if job["filepath"] is None:
+            # Manos leídas en vivo: no hay fichero que mover a backup
+            return
 
+        if job["read_error"]:
+            pokerstars_parser_logger.error(f"File {filename} could not be read completely. Keeping it in the source directory.")
+            return
+
+        # Las manos que fallan lo harán igual en cada lectura: quedan en failed/ y el
+        # fichero va a backup. Solo los errores de lectura lo dejan en origen.
+
+        try:
             # Guardar backup del fichero crudo
             backup_dir = os.path.join(self.source_dir, "backup")
             os.makedirs(backup_dir, exist_ok=True)
             backup_path = os.path.join(backup_dir, filename)
-            shutil.copy2(filepath, backup_path)
+            shutil.copy2(job["filepath"], backup_path)
             pokerstars_parser_logger.debug(f"Backup of {filename} saved to {backup_path}")
 
             # Eliminar el fichero original del origen
-            os.remove(filepath)
+            os.remove(job["filepath"])
             pokerstars_parser_logger.debug(f"Original file {filename} deleted from source directory")
 
         except Exception as e:
             pokerstars_parser_logger.error(f"Error processing file {filename}: {e}")
-            return        
+
+    def is_duplicate(self, hand_id: str, hand_text: str, quiet: bool = False) -> bool:
+        """Comprueba si la mano ya está guardada o en curso, avisando si el contenido difiere.
+
+        Con quiet, los duplicados idénticos solo van al debug (importación del histórico).
+        """
+        if hand_id in self.pending_hands:
+            identical = self.pending_hands[hand_id]["raw_text"] == hand_text
+        elif hand_id in self.queued_hands:
+            identical = self.queued_hands[hand_id] == hand_text
+        elif hand_id in self.index:
+            identical = self.index.matches(hand_id, hand_text)
+        else:
+            return False
+        if identical:
+            pokerstars_parser_logger.log(logging.DEBUG if quiet else logging.WARNING,
+                                         "Hand %s already exists and is identical. Skipping.", hand_id)
+        else:
+            pokerstars_parser_logger.critical("Hand %s already exists but content differs! Ignoring...", hand_id)
+        return True
+
+    def save_failed_hands(self, filename: str, failed: list) -> None:
+        """Guarda en processed/<room>/failed las manos que no se pudieron parsear, con el motivo."""
+        failed_dir = os.path.join(self.processed_dir, "failed")
+        os.makedirs(failed_dir, exist_ok=True)
+        failed_path = os.path.join(failed_dir, os.path.basename(filename))
+        with open(failed_path, 'a', encoding='utf-8') as f:
+            for reason, hand_text in failed:
+                f.write(f"# {' '.join(reason.splitlines())}\n{hand_text}\n\n\n")
+        metrics.incr("parser.hands_failed", len(failed))
+        pokerstars_parser_logger.error(f"{len(failed)} hands of {filename} could not be parsed. Saved to {failed_path}")
+
+    def save_hand_text(self, hand_id: str, hand_text: str) -> None:
+        # Copia de depuración de la mano en texto plano, desactivada por defecto
+        debug_dir = os.path.join(self.processed_dir, "debug")
+        os.makedirs(debug_dir, exist_ok=True)
+        with open(os.path.join(debug_dir, f"{hand_id}.txt"), 'w', encoding='utf-8') as f:
+            f.write(hand_text)
+
+    def save_hand(self, hand: StandardHand) -> bool:
+        if hand.hand_id in self.pending_hands or hand.hand_id in self.index:
+            if hand.hand_id in self.index and not self.index.matches(hand.hand_id, hand.raw_text):
+                pokerstars_parser_logger.critical("Mano %s ya existe con otro contenido. Se omite.", hand.hand_id)
+            else:
+                pokerstars_parser_logger.warning("Mano %s ya existe en la base de datos. Se omite.", hand.hand_id)
+            return False
+        self.pending_hands[hand.hand_id] = hand.__dict__
+        return True
+
+    def flush_hands(self) -> int:
+        # Las manos pendientes se escriben juntas en una sola transacción
+        start = time.perf_counter()
+        written = self.db.insert_hands(self.pending_hands.values())
+        metrics.add_time("db.insert_hands", time.perf_counter() - start, written)
+        for hand_id, hand in self.pending_hands.items():
+            self.index.add(hand_id, hand["raw_text"])
+        self.index.flush()
+        self.pending_hands = {}
+        pokerstars_parser_logger.debug(f"{written} hands written to the hand database.")
+        return written
 
     def parse_files(self):
         pokerstars_parser_logger.debug(f"Starting parser function of {self.name_room}")
         if not self.check_dir():
             return
-        
-        for filename in os.listdir(self.source_dir):
-            filepath = os.path.join(self.source_dir, filename)
-            if not os.path.isfile(filepath):
-                continue  # Ignora carpetas como 'backup'
-            self.format_file(filename)
 
+        filenames = [
+            filename for filename in os.listdir(self.source_dir)
+            if os.path.isfile(os.path.join(self.source_dir, filename))  # Ignora carpetas como 'backup'
+        ]
+        self.stats = {"files": len(filenames), "hands": 0, "saved": 0, "duplicates": 0, "errors": 0}
+
+        with self.parser_pool():
+            # Con pool, varios ficheros se parsean a la vez y se cierran en orden
+            for filename in filenames:
+                self.read_file(filename)
+                self.drain(self.max_queued())
+            while self.in_flight:
+                self.collect_chunk()
+
+        pokerstars_parser_logger.info(
+            f"Parsed {self.stats['hands']} hands from {self.stats['files']} files: {self.stats['saved']} saved, "
+            f"{self.stats['duplicates']} duplicated, {self.stats['errors']} errors"
+        )
         return
-    
+
     def assign_remaining_positions(self, button_seat: Optional[int] = None, overwrite: bool = False, table_size: int = 6, players: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         positions_map = {
             2: ["SB", "BB"],
@@ -136,12 +477,12 @@ class PokerStarsParser(BaseParser):
         # Filtrar jugadores activos con seat válido
         active_players = [p for p in players if p.get("active", False) and p.get("seat") is not None]
         num_active = len(active_players)
-        pokerstars_parser_logger.debug(f"Number of active players: {num_active}")
+        pokerstars_parser_trace_logger.debug("Number of active players: %s", num_active)
         if num_active <= 2:
             return  players
 
         positions_order = positions_map.get(num_active, positions_map[9])
-        pokerstars_parser_logger.debug(f"Positions order for {num_active} players: {positions_order}")
+        pokerstars_parser_trace_logger.debug("Positions order for %s players: %s", num_active, positions_order)
 
         # 1) Buscar BTN ya marcado por el parser
         btn_player = next((p for p in active_players if p.get("position") == "BTN"), None)
@@ -178,289 +519,223 @@ class PokerStarsParser(BaseParser):
         return players
 
 
+    def store_tournament_hand(self, filename: str, hand_text: str) -> None:
+        pokerstars_parser_logger.debug("Mano de torneo detectada. Se omite.")
+        # Guardamos mano en carpeta tournament por el momento
+        tournament_dir = os.path.join(self.processed_dir, "tournament")
+        os.makedirs(tournament_dir, exist_ok=True)
+        backup_path = os.path.join(tournament_dir, filename)
+        with open(backup_path, 'w', encoding='utf-8') as f:
+            f.write(hand_text)
+        pokerstars_parser_logger.debug(f"Tournament hand {filename} saved to {backup_path}")
+
+        # Si la mano venía de un fichero suelto de processed, se elimina
+        filepath = os.path.join(self.processed_dir, filename)
+        if os.path.isfile(filepath):
+            os.remove(filepath)
+            pokerstars_parser_logger.debug(f"Original file {filename} deleted from source directory")
+
     def format_hand(self, hand_text: str, filename: str) -> StandardHand:
-        pokerstars_parser_logger.debug(f"Primeras líneas de la mano:\n{hand_text[:200]}")
+        """Convierte el texto de una mano en StandardHand recorriendo sus líneas una sola vez.
+
+        Cada línea se despacha por su prefijo a la expresión que le corresponde; los
+        efectos sobre los jugadores (posiciones, stacks, folds) se aplican al final,
+        en el mismo orden que el parser anterior (format_hand_legacy en src/tests/benchmark_parser.py).
+        """
+        header_match = None
+        is_zoom = False
+        table_match = None
+        seat_matches = []
+        out_players = set()
+        sb_names = []
+        bb_names = []
+        hero_cards = None
+        actions = {"preflop": [], "flop": [], "turn": [], "river": []}
+        action_log = []
+        board = []
+        win_match = None
+        rake_match = None
 
-        # 1. Extraer cabecera (ID, tipo, fecha, SB, BB, Zoom/normal)
-        header_match = re.search(
-            r"Mano n\.º (\d+) de (?:Zoom de )?PokerStars:  Hold'em No Limit \(([\d\.,]+)[^\d]+\/([\d\.,]+)[^\d]+\).* - ([\d\- :]+) CET",
-            hand_text
-        )
-        if not header_match:
-            if re.search(r"Torneo n\.º \d+", hand_text):
-                pokerstars_parser_logger.debug("Mano de torneo detectada. Se omite.")
-                # Guardamos mano en carpeta tournament por el momento
-                tournament_dir = os.path.join(self.processed_dir, "tournament")
-                filepath = os.path.join(self.processed_dir, filename)
-                os.makedirs(tournament_dir, exist_ok=True)
-                backup_path = os.path.join(tournament_dir, filename)
-                shutil.copy2(filepath, backup_path)
-                pokerstars_parser_logger.debug(f"Backup of {filename} saved to {backup_path}")
-
-                # Eliminar el fichero original del origen
-                os.remove(filepath)
-                pokerstars_parser_logger.debug(f"Original file {filename} deleted from source directory")
-            else:
-                pokerstars_parser_logger.critical("No se pudo extraer la cabecera de la mano.")
-            return None
+        current_street = None
+        actions_closed = False
+        first_line = True
 
+        for raw_line in hand_text.split("\n"):
+            line = raw_line.strip()
+
+            if first_line:
+                first_line = False
+                is_zoom = "Zoom de" in raw_line
+                header_match = HEADER_RE.search(line)
+                if not header_match:
+                    header_match = HEADER_RE.search(hand_text)
+                    if not header_match:
+                        if TOURNAMENT_RE.search(hand_text):
+                            metrics.incr("parser.rejected.tournament")
+                            self.store_tournament_hand(filename, hand_text)
+                        else:
+                            metrics.incr("parser.rejected.no_header")
+                            pokerstars_parser_logger.critical("No se pudo extraer la cabecera de la mano.")
+                        return None
+                continue
+
+            if line.startswith("*** "):
+                if actions_closed:
+                    continue
+                if line.startswith("*** SHOW DOWN ***") or line.startswith("*** RESUMEN ***"):
+                    actions_closed = True
+                    continue
+                for marker, street in STREET_MARKERS:
+                    if line.startswith(marker):
+                        current_street = street
+                        break
+                if current_street == "flop" and not board:
+                    m = FLOP_RE.search(line)
+                    if m:
+                        board += m.group(1).split()
+                elif current_street == "turn":
+                    m = TURN_RE.search(line)
+                    if m:
+                        board.append(m.group(1))
+                elif current_street == "river":
+                    m = RIVER_RE.search(line)
+                    if m:
+                        board.append(m.group(1))
+                continue
+
+            if ": pone la ciega " in line:
+                m = SMALL_BLIND_RE.match(line)
+                if m:
+                    sb_names.append(m.group(1).strip())
+                m = BIG_BLIND_RE.match(line)
+                if m:
+                    bb_names.append(m.group(1).strip())
+
+            # Cabecera de la mesa y asientos: todo lo anterior a las cartas de mano
+            if current_street is None:
+                if line.startswith("Asiento "):
+                    m = SEAT_RE.search(raw_line)
+                    if m:
+                        seat_matches.append(m)
+                elif line.startswith('Mesa "'):
+                    table_match = TABLE_RE.search(line)
+                else:
+                    for out_re in OUT_RES:
+                        m = out_re.match(raw_line)
+                        if m:
+                            out_players.add(m.group(1).strip())
+                continue
+
+            if win_match is None and " se lleva " in line:
+                win_match = WIN_RE.search(line)
+            if rake_match is None and "Comisión" in line:
+                rake_match = RAKE_RE.search(line)
+
+            if actions_closed:
+                continue
+
+            if line.startswith("Repartidas a "):
+                if hero_cards is None:
+                    m = HOLE_CARDS_RE.match(line)
+                    if m and m.group(1) == self.hero_name:
+                        hero_cards = [m.group(2), m.group(3)]
+                continue
+            if "se une a la mesa" in line or "deja la mesa" in line or ":" not in line:
+                continue
+
+            m = ACTION_RE.match(line)
+            if m:
+                action_type = m.lastgroup
+                player = m.group("player").strip()
+                amount_bb = 0.0
+                if action_type in ("CALL", "BET", "RAISE"):
+                    amount_eur = float(m.group(action_type).replace(',', '.'))
+                    amount_bb = round(amount_eur / float(header_match.group(3).replace(',', '.')), 2)
+                actions[current_street].append({
+                    "player": player,
+                    "action": action_type,
+                    "amount": amount_bb
+                })
+                action_log.append((player, action_type, amount_bb))
+
+        # 1. Cabecera (ID, tipo, fecha, SB, BB, Zoom/normal)
         hand_id = header_match.group(1)
-        is_zoom = "Zoom de" in hand_text.splitlines()[0]
         sb = float(header_match.group(2).replace(',', '.'))
         bb = float(header_match.group(3).replace(',', '.'))
         date_played = header_match.group(4)
         game_type = "zoom" if is_zoom else "holdem"
 
-        pokerstars_parser_logger.debug(f"Cabecera extraída: hand_id={hand_id}, is_zoom={is_zoom}, sb={sb}, bb={bb}, date={date_played}, game_type={game_type}")
-
-        # 2. Extraer mesa, tamaño y botón
-        table_match = re.search(r'Mesa "([^"]+)" (\d+)-max El asiento n\.º (\d+) es el botón', hand_text)
+        # 2. Mesa, tamaño y botón
         table_name = table_match.group(1) if table_match else ""
         table_size = int(table_match.group(2)) if table_match else None
         button_seat = int(table_match.group(3)) if table_match else None
 
-        pokerstars_parser_logger.debug(f"Mesa: {table_name}, Tamaño: {table_size}-max, Botón en asiento: {button_seat}")
-
-        preflop_actions_start_index = hand_text.find("*** CARTAS DE MANO ***")
-        if preflop_actions_start_index == -1:
+        if current_street is None:
+            metrics.incr("parser.rejected.no_hole_cards_section")
             pokerstars_parser_logger.critical("No se encontró el inicio de las cartas de mano. No se puede procesar.")
             return None
 
-        initial_text = hand_text[:preflop_actions_start_index]
-
         players = []
-        for m in re.finditer(r"Asiento (\d+):\s*(.+?)\s+\(([\d\.,]+).+en fichas\)( está ausente)?", initial_text):
+        for m in seat_matches:
             seat = int(m.group(1))
-            player_name = m.group(2).strip()
             stack_eur = float(m.group(3).replace(',', '.'))
-            stack_bb = round(stack_eur / bb, 2) if bb > 0 else 0
-            is_active = m.group(4) is None  # Si hay "está ausente", estará en group(4)
-            if seat == button_seat:
-                position = "BTN"
-            else:
-                position = None
             players.append({
-                "name": player_name,
-                "stack": stack_bb,
+                "name": m.group(2).strip(),
+                "stack": round(stack_eur / bb, 2) if bb > 0 else 0,
                 "seat": seat,
-                "position": position,  # Se asignará después si corresponde
+                "position": "BTN" if seat == button_seat else None,
                 "cards": [],
-                "active": is_active
+                "active": m.group(4) is None and m.group(2).strip() not in out_players
             })
-            pokerstars_parser_logger.debug(f"Jugador encontrado: {player_name}, Asiento: {seat}, Stack: {stack_bb} BB, Activo: {is_active}")
 
-        # 3. Detectar jugadores que se han ido
-        out_patterns = [
-            r"^([^\:]+) deja la mesa",
-            r"^([^\:]+) ha agotado su tiempo mientras siga sin conexión",
-            r"^([^\:]+): está ausente$"
-        ]
-        
-        out_players = set()
-        for pattern in out_patterns:
-            for m in re.finditer(pattern, initial_text, flags=re.MULTILINE):
-                out_player = m.group(1).strip()
-                out_players.add(out_player)
-
-        # Actualizar la lista de jugadores
-        for p in players:
-            if p["name"] in out_players:
-                p["active"] = False
-
-        # 4. Detectar posiciones SB y BB
-        for m in re.finditer(r"^(.+?): pone la ciega pequeña", hand_text, flags=re.MULTILINE):
-            sb_player = m.group(1).strip()
-            for p in players:
-                if p["name"] == sb_player:
-                    p["position"] = "SB"
-
-        for m in re.finditer(r"^(.+?): pone la ciega grande", hand_text, flags=re.MULTILINE):
-            bb_player = m.group(1).strip()
-            for p in players:
-                if p["name"] == bb_player:
-                    p["position"] = "BB"
-        pokerstars_parser_logger.debug(f"Jugadores antes de asignación automática: {players}")
-
-        # 5. Asignar posiciones a los jugadores restantes
+        # 3. Posiciones: ciegas y después el resto a partir del botón
+        for names, position in ((sb_names, "SB"), (bb_names, "BB")):
+            for name in names:
+                for p in players:
+                    if p["name"] == name:
+                        p["position"] = position
         players = self.assign_remaining_positions(button_seat=button_seat, overwrite=True, table_size=table_size, players=players)
-        pokerstars_parser_logger.debug(f"Players finales de mano: {players}")
-        
-        # 6. Extraer hero info
-        hero_in_hand = False
-        for p in players:
-            if p["name"] == self.hero_name and p.get("active", False):
-                hero_in_hand = True
-                break
 
-        if not hero_in_hand:
-            pokerstars_parser_logger.warning(f"Hero {self.hero_name} not found in hand {hand_id}. Skipping.")
+        # 4. Hero
+        if not any(p["name"] == self.hero_name and p.get("active", False) for p in players):
+            metrics.incr("parser.rejected.hero_not_seated")
+            pokerstars_parser_logger.warning("Hero %s not found in hand %s. Skipping.", self.hero_name, hand_id)
             return None
-
-        match_hero_cards = re.search(rf"Repartidas a {re.escape(self.hero_name)} \[([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\]", hand_text)
-        hero_cards = []
-        if match_hero_cards:
-            hero_cards = [match_hero_cards.group(1), match_hero_cards.group(2)]
-        else:
-            pokerstars_parser_logger.warning(f"Hero cards not found for {self.hero_name} in hand {hand_id}. Skipping.")
+        if hero_cards is None:
+            metrics.incr("parser.rejected.no_hero_cards")
+            pokerstars_parser_logger.warning("Hero cards not found for %s in hand %s. Skipping.", self.hero_name, hand_id)
             return None
-        
         for p in players:
             if p["name"] == self.hero_name:
                 p["cards"] = hero_cards
-                pokerstars_parser_logger.debug(f"Hero cards: {p["cards"]}")
-                break
-
-        # 7. Extraer acciones por calles (lectura secuencial)
-        actions = {"preflop": [], "flop": [], "turn": [], "river": []}
-        current_street = None
-
-        re_fold = re.compile(r"^(.+?): se retira")
-        re_check = re.compile(r"^(.+?): pasa")
-        re_call = re.compile(r"^(.+?): iguala ([\d\.,]+) €")
-        re_bet = re.compile(r"^(.+?): apuesta ([\d\.,]+) €")
-        re_raise = re.compile(r"^(.+?): sube .* a ([\d\.,]+) €")
-
-        def update_player(name, action_type, amount_bb):
-            """Actualiza el estado de un jugador en la lista players."""
-            for p in players:
-                if p["name"] == name:
-                    if action_type == "FOLD":
-                        p["active"] = False
-                    elif action_type in ("CALL", "BET", "RAISE"):
-                        p["stack"] = round(p["stack"] - amount_bb, 2)
-                    # CHECK no cambia nada
-                    break
-
-        for raw_line in hand_text.splitlines():
-            line = raw_line.strip()
-
-            # Detectar calles
-            if line.startswith("*** CARTAS DE MANO ***"):
-                current_street = "preflop"
-                continue
-            elif line.startswith("*** FLOP ***"):
-                current_street = "flop"
-                continue
-            elif line.startswith("*** TURN ***"):
-                current_street = "turn"
-                continue
-            elif line.startswith("*** RIVER ***"):
-                current_street = "river"
-                continue
-            elif line.startswith("*** SHOW DOWN ***") or line.startswith("*** RESUMEN ***"):
                 break
 
-            # Filtrar líneas irrelevantes
-            if not current_street:
-                continue
-            if line.startswith("Repartidas a "):
-                continue
-            if "se une a la mesa" in line or "deja la mesa" in line:
-                continue
-            if ":" not in line:
-                continue
-
-            # FOLD
-            m = re_fold.match(line)
-            if m:
-                player = m.group(1).strip()
-                actions[current_street].append({
-                    "player": player,
-                    "action": "FOLD",
-                    "amount": 0.0
-                })
-                update_player(player, "FOLD", 0.0)
-                continue
-
-            # CHECK
-            m = re_check.match(line)
-            if m:
-                player = m.group(1).strip()
-                actions[current_street].append({
-                    "player": player,
-                    "action": "CHECK",
-                    "amount": 0.0
-                })
-                update_player(player, "CHECK", 0.0)
-                continue
-
-            # CALL
-            m = re_call.match(line)
-            if m:
-                player = m.group(1).strip()
-                amount_eur = float(m.group(2).replace(',', '.'))
-                amount_bb = round(amount_eur / bb, 2)
-                actions[current_street].append({
-                    "player": player,
-                    "action": "CALL",
-                    "amount": amount_bb
-                })
-                update_player(player, "CALL", amount_bb)
-                continue
-
-            # BET
-            m = re_bet.match(line)
-            if m:
-                player = m.group(1).strip()
-                amount_eur = float(m.group(2).replace(',', '.'))
-                amount_bb = round(amount_eur / bb, 2)
-                actions[current_street].append({
-                    "player": player,
-                    "action": "BET",
-                    "amount": amount_bb
-                })
-                update_player(player, "BET", amount_bb)
-                continue
-
-            # RAISE
-            m = re_raise.match(line)
-            if m:
-                player = m.group(1).strip()
-                amount_eur = float(m.group(2).replace(',', '.'))
-                amount_bb = round(amount_eur / bb, 2)
-                actions[current_street].append({
-                    "player": player,
-                    "action": "RAISE",
-                    "amount": amount_bb
-                })
-                update_player(player, "RAISE", amount_bb)
+        # 5. Estado final de los jugadores tras las acciones
+        by_name = {}
+        for p in players:
+            by_name.setdefault(p["name"], p)
+        for player, action_type, amount_bb in action_log:
+            p = by_name.get(player)
+            if p is None:
                 continue
+            if action_type == "FOLD":
+                p["active"] = False
+            elif action_type in ("CALL", "BET", "RAISE"):
+                p["stack"] = round(p["stack"] - amount_bb, 2)
 
-        pokerstars_parser_logger.debug(f"Acciones extraídas: {actions}")
-        pokerstars_parser_logger.debug(f"Estado final jugadores: {players}")
-
-        # 6. Extraer board
-        board = []
-        board_match = re.search(r"\*\*\* FLOP \*\*\* \[([^\]]+)\]", hand_text)
-        if board_match:
-            board += board_match.group(1).split()
-        turn_match = re.search(r"\*\*\* TURN \*\*\* \[[^\]]+\] \[([^\]]+)\]", hand_text)
-        if turn_match:
-            board.append(turn_match.group(1))
-        river_match = re.search(r"\*\*\* RIVER \*\*\* \[[^\]]+\] \[([^\]]+)\]", hand_text)
-        if river_match:
-            board.append(river_match.group(1))
-        pokerstars_parser_logger.debug(f"Board: {board}")
-
-        # 7. Extraer ganador y cantidad ganada (en BB)
+        # 6. Ganador, cantidad ganada y comisión (en BB)
         winner = None
         win_amount = 0.0
-        win_match = re.search(r"([^\s]+) se lleva ([\d\.,]+)[^\d]+del bote", hand_text)
         if win_match:
             winner = win_match.group(1)
             win_eur = float(win_match.group(2).replace(',', '.'))
             win_amount = round(win_eur / bb, 2) if bb > 0 else 0.0
-        pokerstars_parser_logger.debug(f"Ganador: {winner}, Ganancia (BB): {win_amount}")
 
-        # 8. Extraer comisión/rake (en BB)
         rake = 0.0
-        rake_match = re.search(r"Comisión ([\d\.,]+)[^\d]+", hand_text)
         if rake_match:
             rake_eur = float(rake_match.group(1).replace(',', '.'))
             rake = round(rake_eur / bb, 2) if bb > 0 else 0.0
-        pokerstars_parser_logger.debug(f"Rake (BB): {rake}")
 
-        # 9. Crear objeto StandardHand
         hand = StandardHand(
             hand_id=hand_id,
             room_name=self.name_room,
@@ -478,37 +753,134 @@ class PokerStarsParser(BaseParser):
             rake=rake,
             raw_text=hand_text
         )
-        pokerstars_parser_logger.debug(f"Objeto StandardHand creado: {hand}")
+        pokerstars_parser_trace_logger.debug("Objeto StandardHand creado: %s", hand)
         return hand
 
     def convert_all_to_json(self):
-        os.makedirs(settings.FORMATTED_HANDS_DIR, exist_ok=True)
+        # Las manos nuevas ya se guardan desde format_file. Aquí solo se migran a
+        # la base de datos los ficheros por mano que hayan quedado en processed de versiones anteriores.
+        items = []
         for filename in os.listdir(self.processed_dir):
             filepath = os.path.join(self.processed_dir, filename)
             if not os.path.isfile(filepath):
                 continue
             with open(filepath, 'r', encoding='utf-8') as f:
                 hand_text = f.read()
-            hand = self.format_hand(hand_text, filename=filename)
-            if not hand:
-                continue
-            json_filename = f"pokerstars_{hand.hand_id}.json"
-            json_path = os.path.join(settings.FORMATTED_HANDS_DIR, json_filename)
-            if os.path.exists(json_path):
-                pokerstars_parser_logger.warning(f"Mano {hand.hand_id} ya existe en formatted_hands. Se omite.")
-                continue
-            with open(json_path, 'w', encoding='utf-8') as f_json:
-                import json
-                json.dump(hand.__dict__, f_json, ensure_ascii=False, indent=2)
-            pokerstars_parser_logger.debug(f"Mano {hand.hand_id} convertida a JSON y guardada en formatted_hands.")
+            items.append((filename, hand_text, filename))
+        if not items:
+            return
 
+        converted = []
+        with self.parser_pool():
+            results = list(self.gather_hands(self.submit_hands(items)))
+        for filename, hand, error in results:
+            if error:
+                pokerstars_parser_logger.error(f"Error parsing {filename}: {error}")
+            elif hand and self.save_hand(hand):
+                converted.append(filename)
+        if not converted:
+            return
+        self.flush_hands()
+
+        backup_dir = os.path.join(self.processed_dir, "backup")
+        os.makedirs(backup_dir, exist_ok=True)
+        for filename in converted:
             # Guardar backup del fichero processed
-            backup_dir = os.path.join(self.processed_dir, "backup")
-            os.makedirs(backup_dir, exist_ok=True)
+            filepath = os.path.join(self.processed_dir, filename)
             backup_path = os.path.join(backup_dir, filename)
             shutil.copy2(filepath, backup_path)
             pokerstars_parser_logger.debug(f"Backup of {filename} saved to {backup_path}")
 
             # Eliminar el fichero original del origen
             os.remove(filepath)
-            pokerstars_parser_logger.debug(f"Original file {filename} deleted from source directory")
\ No newline at end of file
+            pokerstars_parser_logger.debug(f"Original file {filename} deleted from source directory")
+
+    # -------------------
+    # Importación única del histórico anterior a la base de datos de manos
+    # -------------------
+    def history_imported(self) -> bool:
+        """Indica si el histórico ya se importó al backend configurado (DB_BACKEND)."""
+        return settings.DB_BACKEND in _load_import_state()
+
+    def import_history(self) -> int:
+        """Carga en la base de datos configurada las manos de versiones anteriores.
+
+        Se reparsean los backups de texto (raw/<room>/backup y processed/<room>/backup)
+        y los JSON de formatted_hands completan las manos que no estén en ellos.
+        Las manos que ya estén en la base de datos se omiten. Devuelve cuántas se guardaron.
+        """
+        pokerstars_parser_logger.info(f"Importing previous hand history into the {settings.DB_BACKEND} database...")
+        saved_before = self.stats["saved"]
+        with self.parser_pool():
+            for folder in (os.path.join(self.source_dir, "backup"), os.path.join(self.processed_dir, "backup")):
+                self.import_text_folder(folder)
+        saved = self.stats["saved"] - saved_before + self.import_json_folder(self.formatted_dir)
+
+        state = _load_import_state()
+        state[settings.DB_BACKEND] = {"date": datetime.now().isoformat(timespec="seconds"), "hands": saved}
+        _save_import_state(state)
+        pokerstars_parser_logger.info(f"History import finished: {saved} hands added")
+        return saved
+
+    def import_text_folder(self, folder: str) -> None:
+        if not os.path.isdir(folder):
+            return
+        filenames = sorted(f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f)))
+        # Los backups de processed son ficheros de una mano: se agrupan para guardar por lotes
+        for start in range(0, len(filenames), IMPORT_BATCH_FILES):
+            batch = filenames[start:start + IMPORT_BATCH_FILES]
+            # Los backups siguen siendo el original: sus fallos no se copian a failed/
+            job = self.queue_hands(folder, _iter_folder_hands(folder, batch), quiet_duplicates=True, save_failed=False)
+            self.finish_file(job)
+
+    def import_json_folder(self, folder: str) -> int:
+        if not os.path.isdir(folder):
+            return 0
+        saved = 0
+        for filename in sorted(os.listdir(folder)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                    hand = StandardHand(**json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                pokerstars_parser_logger.error(f"Could not import {filename}: {e}")
+                continue
+            # Los JSON solo completan: si la mano ya llegó por su texto se deja la reparseada
+            if hand.hand_id in self.pending_hands or hand.hand_id in self.index:
+                continue
+            self.pending_hands[hand.hand_id] = hand.__dict__
+            saved += 1
+            if len(self.pending_hands) >= IMPORT_BATCH_FILES:
+                self.flush_hands()
+        self.flush_hands()
+        return saved
+
+
+# Manos parseadas que se acumulan antes de escribirlas en la base de datos (además de al cerrar cada fichero)
+FLUSH_HANDS = 2000
+
+# Ficheros por lote al importar el histórico
+IMPORT_BATCH_FILES = 500
+
+
+def _iter_folder_hands(folder: str, filenames):
+    for filename in filenames:
+        try:
+            with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                yield from iter_hands(f)
+        except (OSError, UnicodeDecodeError) as e:
+            pokerstars_parser_logger.error(f"Error reading {filename} from {folder}: {e}")
+
+
+def _load_import_state() -> dict:
+    if not os.path.isfile(settings.HISTORY_IMPORT_PATH):
+        return {}
+    with open(settings.HISTORY_IMPORT_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_import_state(state: dict) -> None:
+    os.makedirs(os.path.dirname(settings.HISTORY_IMPORT_PATH), exist_ok=True)
+    with open(settings.HISTORY_IMPORT_PATH, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
@@ -1,16 +1,36 @@
 from src.collectors.pokerstars_collector import PokerStarsCollector
+from src.collectors.pokerstars_tailer import PokerStarsTailer
 from src.parser.pokerstars_parser import PokerStarsParser
+from src.utils.metrics import metrics
 import logging
 
 room_logger = logging.getLogger(__name__)
 
 class PokerStarsRoom(object):
-    def __init__(self, active: bool = False):
+    def __init__(self, active: bool = False, watch: bool = False):
         self.name_room = 'pokerstars'
         self.hero_name = 'SrLyce'
 
         if active:
-            self.collector = PokerStarsCollector(self.name_room, active=True)
-            self.parser = PokerStarsParser(self.name_room, self.hero_name, active=True)
+            with metrics.stage("collect"):
+                self.collector = PokerStarsCollector(self.name_room, active=True)
+            with metrics.stage("parse"):
+                self.parser = PokerStarsParser(self.name_room, self.hero_name, active=True)
 
-        room_logger.debug("PokerStars Room initializated.")
\ No newline at end of file
+        if watch:
+            # En modo watch las manos se leen del directorio del cliente según se escriben
+            self.tailer = PokerStarsTailer(self.name_room)
+            self.parser = PokerStarsParser(self.name_room, self.hero_name, active=False)
+
+        room_logger.debug("PokerStars Room initializated.")
+
+    def poll(self) -> int:
+        """Parsea las manos terminadas desde el último poll. Devuelve cuántas se guardaron."""
+        saved = 0
+        for filename, text in self.tailer.poll():
+            saved += self.parser.parse_text(filename, text)
+        self.tailer.save_state()
+        return saved
+
+    def close(self) -> None:
+        self.parser.db.close()
\ No newline at end of file
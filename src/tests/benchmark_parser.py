@@ -0,0 +1,369 @@
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+
+# Añadimos el path del proyecto para importar settings
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from config import settings
+from src.models.hand_model import StandardHand
+from src.parser.pokerstars_parser import PokerStarsParser, iter_hands
+
+legacy_logger = logging.getLogger(__name__)
+
+DEFAULT_HANDS_DIR = os.path.join(settings.PROCESSED_HAND_HISTORIES_DIR, 'pokerstars', 'backup')
+
+
+def load_hands(folder):
+    hands = []
+    for fname in sorted(os.listdir(folder)):
+        fpath = os.path.join(folder, fname)
+        if not os.path.isfile(fpath):
+            continue
+        with open(fpath, 'r', encoding='utf-8-sig') as f:
+            hands.extend((fname, hand) for hand in iter_hands(f))
+    return hands
+
+
+def format_hand_legacy(parser, hand_text: str, filename: str) -> StandardHand:
+    # Implementación anterior basada en búsquedas sobre el texto completo.
+    # Se conserva como referencia para el benchmark y las comprobaciones de equivalencia.
+    legacy_logger.debug("Primeras líneas de la mano:\n%s", hand_text[:200])
+
+    # 1. Extraer cabecera (ID, tipo, fecha, SB, BB, Zoom/normal)
+    header_match = re.search(
+        r"Mano n\.º (\d+) de (?:Zoom de )?PokerStars:  Hold'em No Limit \(([\d\.,]+)[^\d]+\/([\d\.,]+)[^\d]+\).* - ([\d\- :]+) CET",
+        hand_text
+    )
+    if not header_match:
+        if re.search(r"Torneo n\.º \d+", hand_text):
+            parser.store_tournament_hand(filename, hand_text)
+        else:
+            legacy_logger.critical("No se pudo extraer la cabecera de la mano.")
+        return None
+
+    hand_id = header_match.group(1)
+    is_zoom = "Zoom de" in hand_text.splitlines()[0]
+    sb = float(header_match.group(2).replace(',', '.'))
+    bb = float(header_match.group(3).replace(',', '.'))
+    date_played = header_match.group(4)
+    game_type = "zoom" if is_zoom else "holdem"
+
+    legacy_logger.debug("Cabecera extraída: hand_id=%s, is_zoom=%s, sb=%s, bb=%s, date=%s, game_type=%s", hand_id, is_zoom, sb, bb, date_played, game_type)
+
+    # 2. Extraer mesa, tamaño y botón
+    table_match = re.search(r'Mesa "([^"]+)" (\d+)-max El asiento n\.º (\d+) es el botón', hand_text)
+    table_name = table_match.group(1) if table_match else ""
+    table_size = int(table_match.group(2)) if table_match else None
+    button_seat = int(table_match.group(3)) if table_match else None
+
+    legacy_logger.debug("Mesa: %s, Tamaño: %s-max, Botón en asiento: %s", table_name, table_size, button_seat)
+
+    preflop_actions_start_index = hand_text.find("*** CARTAS DE MANO ***")
+    if preflop_actions_start_index == -1:
+        legacy_logger.critical("No se encontró el inicio de las cartas de mano. No se puede procesar.")
+        return None
+
+    initial_text = hand_text[:preflop_actions_start_index]
+
+    players = []
+    for m in re.finditer(r"Asiento (\d+):\s*(.+?)\s+\(([\d\.,]+).+en fichas\)( está ausente)?", initial_text):
+        seat = int(m.group(1))
+        player_name = m.group(2).strip()
+        stack_eur = float(m.group(3).replace(',', '.'))
+        stack_bb = round(stack_eur / bb, 2) if bb > 0 else 0
+        is_active = m.group(4) is None  # Si hay "está ausente", estará en group(4)
+        if seat == button_seat:
+            position = "BTN"
+        else:
+            position = None
+        players.append({
+            "name": player_name,
+            "stack": stack_bb,
+            "seat": seat,
+            "position": position,  # Se asignará después si corresponde
+            "cards": [],
+            "active": is_active
+        })
+        legacy_logger.debug("Jugador encontrado: %s, Asiento: %s, Stack: %s BB, Activo: %s", player_name, seat, stack_bb, is_active)
+
+    # 3. Detectar jugadores que se han ido
+    out_patterns = [
+        r"^([^\:]+) deja la mesa",
+        r"^([^\:]+) ha agotado su tiempo mientras siga sin conexión",
+        r"^([^\:]+): está ausente$"
+    ]
+    
+    out_players = set()
+    for pattern in out_patterns:
+        for m in re.finditer(pattern, initial_text, flags=re.MULTILINE):
+            out_player = m.group(1).strip()
+            out_players.add(out_player)
+
+    # Actualizar la lista de jugadores
+    for p in players:
+        if p["name"] in out_players:
+            p["active"] = False
+
+    # 4. Detectar posiciones SB y BB
+    for m in re.finditer(r"^(.+?): pone la ciega pequeña", hand_text, flags=re.MULTILINE):
+        sb_player = m.group(1).strip()
+        for p in players:
+            if p["name"] == sb_player:
+                p["position"] = "SB"
+
+    for m in re.finditer(r"^(.+?): pone la ciega grande", hand_text, flags=re.MULTILINE):
+        bb_player = m.group(1).strip()
+        for p in players:
+            if p["name"] == bb_player:
+                p["position"] = "BB"
+    legacy_logger.debug("Jugadores antes de asignación automática: %s", players)
+
+    # 5. Asignar posiciones a los jugadores restantes
+    players = parser.assign_remaining_positions(button_seat=button_seat, overwrite=True, table_size=table_size, players=players)
+    legacy_logger.debug("Players finales de mano: %s", players)
+    
+    # 6. Extraer hero info
+    hero_in_hand = False
+    for p in players:
+        if p["name"] == parser.hero_name and p.get("active", False):
+            hero_in_hand = True
+            break
+
+    if not hero_in_hand:
+        legacy_logger.warning("Hero %s not found in hand %s. Skipping.", parser.hero_name, hand_id)
+        return None
+
+    match_hero_cards = re.search(rf"Repartidas a {re.escape(parser.hero_name)} \[([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\]", hand_text)
+    hero_cards = []
+    if match_hero_cards:
+        hero_cards = [match_hero_cards.group(1), match_hero_cards.group(2)]
+    else:
+        legacy_logger.warning("Hero cards not found for %s in hand %s. Skipping.", parser.hero_name, hand_id)
+        return None
+    
+    for p in players:
+        if p["name"] == parser.hero_name:
+            p["cards"] = hero_cards
+            legacy_logger.debug("Hero cards: %s", p['cards'])
+            break
+
+    # 7. Extraer acciones por calles (lectura secuencial)
+    actions = {"preflop": [], "flop": [], "turn": [], "river": []}
+    current_street = None
+
+    re_fold = re.compile(r"^(.+?): se retira")
+    re_check = re.compile(r"^(.+?): pasa")
+    re_call = re.compile(r"^(.+?): iguala ([\d\.,]+) €")
+    re_bet = re.compile(r"^(.+?): apuesta ([\d\.,]+) €")
+    re_raise = re.compile(r"^(.+?): sube .* a ([\d\.,]+) €")
+
+    def update_player(name, action_type, amount_bb):
+        """Actualiza el estado de un jugador en la lista players."""
+        for p in players:
+            if p["name"] == name:
+                if action_type == "FOLD":
+                    p["active"] = False
+                elif action_type in ("CALL", "BET", "RAISE"):
+                    p["stack"] = round(p["stack"] - amount_bb, 2)
+                # CHECK no cambia nada
+                break
+
+    for raw_line in hand_text.splitlines():
+        line = raw_line.strip()
+
+        # Detectar calles
+        if line.startswith("*** CARTAS DE MANO ***"):
+            current_street = "preflop"
+            continue
+        elif line.startswith("*** FLOP ***"):
+            current_street = "flop"
+            continue
+        elif line.startswith("*** TURN ***"):
+            current_street = "turn"
+            continue
+        elif line.startswith("*** RIVER ***"):
+            current_street = "river"
+            continue
+        elif line.startswith("*** SHOW DOWN ***") or line.startswith("*** RESUMEN ***"):
+            break
+
+        # Filtrar líneas irrelevantes
+        if not current_street:
+            continue
+        if line.startswith("Repartidas a "):
+            continue
+        if "se une a la mesa" in line or "deja la mesa" in line:
+            continue
+        if ":" not in line:
+            continue
+
+        # FOLD
+        m = re_fold.match(line)
+        if m:
+            player = m.group(1).strip()
+            actions[current_street].append({
+                "player": player,
+                "action": "FOLD",
+                "amount": 0.0
+            })
+            update_player(player, "FOLD", 0.0)
+            continue
+
+        # CHECK
+        m = re_check.match(line)
+        if m:
+            player = m.group(1).strip()
+            actions[current_street].append({
+                "player": player,
+                "action": "CHECK",
+                "amount": 0.0
+            })
+            update_player(player, "CHECK", 0.0)
+            continue
+
+        # CALL
+        m = re_call.match(line)
+        if m:
+            player = m.group(1).strip()
+            amount_eur = float(m.group(2).replace(',', '.'))
+            amount_bb = round(amount_eur / bb, 2)
+            actions[current_street].append({
+                "player": player,
+                "action": "CALL",
+                "amount": amount_bb
+            })
+            update_player(player, "CALL", amount_bb)
+            continue
+
+        # BET
+        m = re_bet.match(line)
+        if m:
+            player = m.group(1).strip()
+            amount_eur = float(m.group(2).replace(',', '.'))
+            amount_bb = round(amount_eur / bb, 2)
+            actions[current_street].append({
+                "player": player,
+                "action": "BET",
+                "amount": amount_bb
+            })
+            update_player(player, "BET", amount_bb)
+            continue
+
+        # RAISE
+        m = re_raise.match(line)
+        if m:
+            player = m.group(1).strip()
+            amount_eur = float(m.group(2).replace(',', '.'))
+            amount_bb = round(amount_eur / bb, 2)
+            actions[current_street].append({
+                "player": player,
+                "action": "RAISE",
+                "amount": amount_bb
+            })
+            update_player(player, "RAISE", amount_bb)
+            continue
+
+    legacy_logger.debug("Acciones extraídas: %s", actions)
+    legacy_logger.debug("Estado final jugadores: %s", players)
+
+    # 6. Extraer board
+    board = []
+    board_match = re.search(r"\*\*\* FLOP \*\*\* \[([^\]]+)\]", hand_text)
+    if board_match:
+        board += board_match.group(1).split()
+    turn_match = re.search(r"\*\*\* TURN \*\*\* \[[^\]]+\] \[([^\]]+)\]", hand_text)
+    if turn_match:
+        board.append(turn_match.group(1))
+    river_match = re.search(r"\*\*\* RIVER \*\*\* \[[^\]]+\] \[([^\]]+)\]", hand_text)
+    if river_match:
+        board.append(river_match.group(1))
+    legacy_logger.debug("Board: %s", board)
+
+    # 7. Extraer ganador y cantidad ganada (en BB)
+    winner = None
+    win_amount = 0.0
+    win_match = re.search(r"([^\s]+) se lleva ([\d\.,]+)[^\d]+del bote", hand_text)
+    if win_match:
+        winner = win_match.group(1)
+        win_eur = float(win_match.group(2).replace(',', '.'))
+        win_amount = round(win_eur / bb, 2) if bb > 0 else 0.0
+    legacy_logger.debug("Ganador: %s, Ganancia (BB): %s", winner, win_amount)
+
+    # 8. Extraer comisión/rake (en BB)
+    rake = 0.0
+    rake_match = re.search(r"Comisión ([\d\.,]+)[^\d]+", hand_text)
+    if rake_match:
+        rake_eur = float(rake_match.group(1).replace(',', '.'))
+        rake = round(rake_eur / bb, 2) if bb > 0 else 0.0
+    legacy_logger.debug("Rake (BB): %s", rake)
+
+    # 9. Crear objeto StandardHand
+    hand = StandardHand(
+        hand_id=hand_id,
+        room_name=parser.name_room,
+        game_type=game_type,
+        sb=sb,
+        bb=bb,
+        date_played=date_played,
+        table_name=table_name,
+        table_size=table_size,
+        players=players,
+        actions=actions,
+        board=board,
+        winner=winner,
+        win_amount=win_amount,  # Solo en BB
+        rake=rake,
+        raw_text=hand_text
+    )
+    legacy_logger.debug("Objeto StandardHand creado: %s", hand)
+    return hand
+
+
+def run(format_hand, hands, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for fname, hand in hands:
+            format_hand(hand, fname)
+    elapsed = time.perf_counter() - start
+    return elapsed, len(hands) * repeat / elapsed
+
+
+def check_equivalence(parser, hands):
+    differences = 0
+    for fname, hand in hands:
+        old = format_hand_legacy(parser, hand, fname)
+        new = parser.format_hand(hand, fname)
+        if (old is None) != (new is None) or (old is not None and old.__dict__ != new.__dict__):
+            differences += 1
+            print(f"❌ Resultado distinto en {fname}")
+    return differences
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compara el parser de una pasada con el anterior.")
+    arg_parser.add_argument("--dir", default=DEFAULT_HANDS_DIR, help="Carpeta con historiales de manos")
+    arg_parser.add_argument("--hero", default="SrLyce")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    parser = PokerStarsParser('pokerstars', args.hero, active=False, connect_db=False)
+    # Las manos de torneo no deben mover ficheros durante el benchmark
+    parser.store_tournament_hand = lambda filename, hand_text: None
+
+    hands = load_hands(args.dir)
+    print(f"{len(hands)} manos cargadas de {args.dir}")
+
+    differences = check_equivalence(parser, hands)
+    if differences:
+        print(f"❌ {differences} manos con resultado distinto")
+    else:
+        print("✅ Ambos parsers producen el mismo resultado")
+
+    legacy_time, legacy_rate = run(lambda hand, fname: format_hand_legacy(parser, hand, fname), hands, args.repeat)
+    new_time, new_rate = run(parser.format_hand, hands, args.repeat)
+    print(f"Legacy:     {legacy_rate:10.0f} manos/s ({legacy_time:.2f}s)")
+    print(f"Una pasada: {new_rate:10.0f} manos/s ({new_time:.2f}s)")
+    print(f"Mejora: x{legacy_time / new_time:.2f}")
@@ -0,0 +1,393 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Añadimos el path del proyecto para importar settings
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from config import settings
+from src.tests.hand_generator import write_corpus
+
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_THRESHOLD = 0.15
+EQUITY_LIMIT = 500
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso en MB (None donde no hay resource, p.ej. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da KB y macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+# -------------------
+# 1. Entorno aislado de cada escenario
+# -------------------
+def _sandbox(workdir: str, backend: str) -> None:
+    # Todas las rutas de datos apuntan a workdir para no tocar data/
+    settings.RAW_HAND_HISTORIES_DIR = os.path.join(workdir, 'raw')
+    settings.PROCESSED_HAND_HISTORIES_DIR = os.path.join(workdir, 'processed')
+    settings.FORMATTED_HANDS_DIR = os.path.join(workdir, 'formatted')
+    settings.ANALYZED_HANDS_DIR = os.path.join(workdir, 'analyzed')
+    settings.HAND_STORE_DIR = os.path.join(workdir, 'hand_store')
+    settings.DATABASE_PATH = os.path.join(workdir, 'database', 'hands.db')
+    settings.HAND_INDEX_PATH = os.path.join(workdir, 'database', 'hand_index.bin')
+    settings.COLLECTOR_MANIFEST_PATH = os.path.join(workdir, 'database', 'collector_manifest.json')
+    settings.HISTORY_IMPORT_PATH = os.path.join(workdir, 'database', 'history_import.json')
+    settings.WATCH_STATE_DIR = os.path.join(workdir, 'watch')
+    settings.POKERSTARS_HAND_HISTORY_PATH = os.path.join(workdir, 'client')
+    settings.COLLECTOR_MIN_AGE = 0
+    settings.DB_BACKEND = backend
+
+
+def _corpus_files(corpus_dir: str) -> list:
+    return sorted(
+        os.path.join(corpus_dir, f) for f in os.listdir(corpus_dir)
+        if os.path.isfile(os.path.join(corpus_dir, f))
+    )
+
+
+def _load_hands(corpus_dir: str) -> list:
+    from src.parser.pokerstars_parser import iter_hands
+    hands = []
+    for path in _corpus_files(corpus_dir):
+        with open(path, 'r', encoding='utf-8') as f:
+            hands.extend((os.path.basename(path), hand) for hand in iter_hands(f))
+    return hands
+
+
+def _new_parser():
+    from src.parser.pokerstars_parser import PokerStarsParser
+    parser = PokerStarsParser('pokerstars', settings.POKERSTARS_HERO_NAME, active=False, connect_db=False)
+    parser.store_tournament_hand = lambda filename, hand_text: None
+    return parser
+
+
+def _ingest(corpus_dir: str) -> None:
+    from src.parser.pokerstars_parser import PokerStarsParser
+    shutil.copytree(corpus_dir, os.path.join(settings.RAW_HAND_HISTORIES_DIR, 'pokerstars'))
+    PokerStarsParser('pokerstars', settings.POKERSTARS_HERO_NAME, active=True)
+
+
+def _sandboxed_ingest(corpus_dir: str, workdir: str, backend: str) -> None:
+    logging.disable(logging.CRITICAL)
+    _sandbox(workdir, backend)
+    _ingest(corpus_dir)
+
+
+def _ingest_apart(corpus_dir: str) -> None:
+    # Ingesta en otro proceso: el pico de RSS del escenario queda solo para lo que se mide
+    workdir = os.path.dirname(settings.HAND_STORE_DIR)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        executor.submit(_sandboxed_ingest, corpus_dir, workdir, settings.DB_BACKEND).result()
+
+
+def _analyzer(name: str):
+    from src.analyzers.analyzer import Analyzer
+    analyzers = Analyzer(active=False).analyzers
+    return next(a for a in analyzers if a.__class__.__name__ == name)
+
+
+# -------------------
+# 2. Escenarios: cada uno devuelve (manos procesadas, segundos de la parte medida)
+# -------------------
+def bench_collect(corpus_dir: str, _):
+    from src.collectors.pokerstars_collector import PokerStarsCollector
+    shutil.copytree(corpus_dir, settings.POKERSTARS_HAND_HISTORY_PATH)
+    hands = len(_load_hands(corpus_dir))
+    start = time.perf_counter()
+    PokerStarsCollector('pokerstars', active=True)
+    return hands, time.perf_counter() - start
+
+
+def bench_split(corpus_dir: str, _):
+    from src.parser.pokerstars_parser import iter_hands
+    hands = 0
+    start = time.perf_counter()
+    for path in _corpus_files(corpus_dir):
+        with open(path, 'r', encoding='utf-8') as f:
+            for _ in iter_hands(f):
+                hands += 1
+    return hands, time.perf_counter() - start
+
+
+def bench_format_hand(corpus_dir: str, _):
+    hands = _load_hands(corpus_dir)
+    parser = _new_parser()
+    start = time.perf_counter()
+    for filename, hand in hands:
+        parser.format_hand(hand, filename)
+    return len(hands), time.perf_counter() - start
+
+
+def bench_store_write(corpus_dir: str, backend: str):
+    from src.database.db_manager_factory import create_db_manager
+    parser = _new_parser()
+    # Un lote por fichero, como hace el parser al cerrar cada fichero
+    batches = {}
+    for filename, hand in _load_hands(corpus_dir):
+        parsed = parser.format_hand(hand, filename)
+        if parsed:
+            batches.setdefault(filename, []).append(parsed.__dict__)
+    written = 0
+    with create_db_manager(backend) as db:
+        start = time.perf_counter()
+        for batch in batches.values():
+            written += db.insert_hands(batch)
+        elapsed = time.perf_counter() - start
+    return written, elapsed
+
+
+def bench_ingest(corpus_dir: str, _):
+    hands = len(_load_hands(corpus_dir))
+    start = time.perf_counter()
+    _ingest(corpus_dir)
+    return hands, time.perf_counter() - start
+
+
+def bench_load_hands(corpus_dir: str, _):
+    # Todas las manos en memoria como HandTable: el pico de RSS es el coste del modelo compacto
+    from src.database.db_manager_factory import create_db_manager
+    _ingest_apart(corpus_dir)
+    with create_db_manager() as db:
+        start = time.perf_counter()
+        table = db.load_hands()
+        elapsed = time.perf_counter() - start
+    return len(table), elapsed
+
+
+def bench_analyzer(corpus_dir: str, name: str):
+    from src.database.db_manager_factory import create_db_manager
+    _ingest(corpus_dir)
+    analyzer = _analyzer(name)
+    hands = 0
+    start = time.perf_counter()
+    with create_db_manager() as db:
+        last_seq = db.last_seq()
+        watermark = analyzer.begin_analysis(last_seq)
+        where, params = analyzer.hand_filter(db)
+        for hand_data in db.scan_hands(where=where, params=params, after_seq=watermark, until_seq=last_seq):
+            hands += 1
+            analyzer.process_hand(hand_data)
+    return hands, time.perf_counter() - start
+
+
+def bench_reports(corpus_dir: str, name: str):
+    from src.database.db_manager_factory import create_db_manager
+    _ingest(corpus_dir)
+    analyzer = _analyzer(name)
+    with create_db_manager() as db:
+        last_seq = db.last_seq()
+        watermark = analyzer.begin_analysis(last_seq)
+        where, params = analyzer.hand_filter(db)
+        for hand_data in db.scan_hands(where=where, params=params, after_seq=watermark, until_seq=last_seq):
+            analyzer.process_hand(hand_data)
+    results = len(analyzer.new_results)
+    start = time.perf_counter()
+    analyzer.end_analysis(last_seq)
+    return results, time.perf_counter() - start
+
+
+def bench_analyzers(corpus_dir: str, _):
+    from src.analyzers.analyzer import Analyzer
+    from src.database.db_manager_factory import create_db_manager
+    _ingest(corpus_dir)
+    with create_db_manager() as db:
+        hands = db.count_hands()
+    analyzer = Analyzer(active=False)
+    start = time.perf_counter()
+    analyzer.execute_analyzers()
+    return hands, time.perf_counter() - start
+
+
+def bench_equity(corpus_dir: str, _):
+    from src.evaluators.hand_evaluator import DECK, compute_equity
+    parser = _new_parser()
+    rng = random.Random(0)
+    spots = []
+    # Cartas de hero contra una mano aleatoria en cada flop del corpus
+    for filename, hand in _load_hands(corpus_dir):
+        parsed = parser.format_hand(hand, filename)
+        if not parsed or len(parsed.board) < 3:
+            continue
+        hero = next(p["cards"] for p in parsed.players if p["name"] == parser.hero_name)
+        flop = parsed.board[:3]
+        villain = rng.sample([c for c in DECK if c not in hero and c not in flop], 2)
+        spots.append((hero, villain, flop))
+        if len(spots) >= EQUITY_LIMIT:
+            break
+    start = time.perf_counter()
+    for hero, villain, flop in spots:
+        compute_equity(hero, villain, board=flop, use_cache=False)
+    return len(spots), time.perf_counter() - start
+
+
+def scenarios() -> dict:
+    """Escenarios por nombre: (función, argumento). Hay uno por analizador registrado."""
+    from src.base.base_analyzer import ANALYZER_REGISTRY
+    import src.analyzers.analyzer  # noqa: F401  (registra los analizadores)
+    found = {
+        "collect": (bench_collect, None),
+        "split": (bench_split, None),
+        "format_hand": (bench_format_hand, None),
+        "store_write:sqlite": (bench_store_write, "sqlite"),
+        "store_write:columnar": (bench_store_write, "columnar"),
+        "ingest": (bench_ingest, None),
+        "load_hands": (bench_load_hands, None),
+    }
+    for analyzer_cls in ANALYZER_REGISTRY:
+        found[f"analyzer:{analyzer_cls.__name__}"] = (bench_analyzer, analyzer_cls.__name__)
+        found[f"reports:{analyzer_cls.__name__}"] = (bench_reports, analyzer_cls.__name__)
+    found["analyzers"] = (bench_analyzers, None)
+    found["equity"] = (bench_equity, None)
+    return found
+
+
+def run_scenario(name: str, corpus_dir: str, backend: str) -> dict:
+    """Ejecuta un escenario en el proceso actual dentro de un directorio temporal."""
+    logging.disable(logging.CRITICAL)
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        _sandbox(workdir, backend)
+        func, arg = scenarios()[name]
+        hands, elapsed = func(corpus_dir, arg)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "hands": hands,
+        "wall_s": round(elapsed, 4),
+        "hands_per_s": round(hands / elapsed, 1) if elapsed > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# -------------------
+# 3. Ejecución, resultados y comparación con la referencia
+# -------------------
+def run_suite(sizes, names, seed: int, backend: str, repeat: int = 1, corpus_dir: str = None) -> list:
+    results = []
+    corpora_root = tempfile.mkdtemp(prefix="bench_corpus_")
+    context = multiprocessing.get_context("spawn")
+    try:
+        for size in sizes:
+            if corpus_dir:
+                corpus = corpus_dir
+            else:
+                corpus = os.path.join(corpora_root, str(size))
+                write_corpus(corpus, size, seed=seed)
+            for name in names:
+                best = None
+                for _ in range(repeat):
+                    # Un proceso nuevo por escenario para que el pico de RSS sea solo suyo
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        result = executor.submit(run_scenario, name, corpus, backend).result()
+                    if best is None or result["wall_s"] < best["wall_s"]:
+                        best = result
+                best.update(scenario=name, size=size)
+                results.append(best)
+                rss = f"{best['peak_rss_mb']:8.1f} MB" if best["peak_rss_mb"] is not None else "       -   "
+                print(f"{name:32s} {size:>8d} {best['hands_per_s'] or 0:>12.0f} manos/s {best['wall_s']:>9.3f}s {rss}")
+    finally:
+        shutil.rmtree(corpora_root, ignore_errors=True)
+    return results
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Escenarios más lentos (o con más memoria) que la referencia por encima del umbral."""
+    reference = {(r["scenario"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        base = reference.get((r["scenario"], r["size"]))
+        if not base:
+            continue
+        if base.get("hands_per_s") and r["hands_per_s"] is not None and r["hands_per_s"] < base["hands_per_s"] * (1 - threshold):
+            regressions.append(f"{r['scenario']} ({r['size']}): {r['hands_per_s']:.0f} manos/s frente a {base['hands_per_s']:.0f}")
+        if base.get("peak_rss_mb") and r["peak_rss_mb"] is not None and r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{r['scenario']} ({r['size']}): {r['peak_rss_mb']:.0f} MB frente a {base['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    benchmark_dir = os.path.join(settings.BASE_DIR, 'data', 'benchmarks')
+    arg_parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo: collector, parser, base de datos, analizadores y equity.")
+    arg_parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Tamaños de corpus separados por comas")
+    arg_parser.add_argument("--scenarios", default=None, help="Escenarios separados por comas (por defecto, todos)")
+    arg_parser.add_argument("--corpus", default=None, help="Carpeta con historiales reales en lugar del corpus sintético")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--repeat", type=int, default=1, help="Repeticiones por escenario (se guarda la mejor)")
+    arg_parser.add_argument("--backend", default=settings.DB_BACKEND, choices=("sqlite", "columnar"))
+    arg_parser.add_argument("--out", default=os.path.join(benchmark_dir, "latest.json"))
+    arg_parser.add_argument("--baseline", default=os.path.join(benchmark_dir, "baseline.json"))
+    arg_parser.add_argument("--save-baseline", action="store_true", help="Guarda estos resultados como referencia")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Pérdida relativa tolerada (0.15 = 15%%)")
+    arg_parser.add_argument("--list", action="store_true", help="Muestra los escenarios disponibles")
+    args = arg_parser.parse_args()
+
+    available = scenarios()
+    if args.list:
+        print("\n".join(available))
+        sys.exit(0)
+    names = args.scenarios.split(",") if args.scenarios else list(available)
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        arg_parser.error(f"Escenarios desconocidos: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",")]
+    if args.corpus:
+        sizes = [len(_load_hands(args.corpus))]
+
+    results = run_suite(sizes, names, seed=args.seed, backend=args.backend, repeat=args.repeat, corpus_dir=args.corpus)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": args.backend,
+            "seed": args.seed,
+            "corpus": args.corpus or "synthetic",
+        },
+        "results": results,
+    }
+    _write_json(args.out, report)
+    print(f"Resultados guardados en {args.out}")
+    if args.save_baseline:
+        _write_json(args.baseline, report)
+        print(f"Referencia guardada en {args.baseline}")
+    elif os.path.isfile(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regresiones por encima del {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ Sin regresiones frente a {args.baseline}")
@@ -8,7 +8,12 @@ from config import settings
 
 FOLDERS_TO_CLEAN = [
     settings.ANALYZED_HANDS_DIR,
+    os.path.join(settings.ANALYZED_HANDS_DIR, 'OR'),
+    os.path.join(settings.ANALYZED_HANDS_DIR, 'POT'),
     settings.FORMATTED_HANDS_DIR,
+    settings.HAND_STORE_DIR,
+    os.path.dirname(settings.DATABASE_PATH),
+    settings.WATCH_STATE_DIR,
     os.path.join(settings.PROCESSED_HAND_HISTORIES_DIR, 'pokerstars'),
 ]
 
@@ -0,0 +1,478 @@
+import argparse
+import os
+import random
+import sys
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Añadimos el path del proyecto para importar settings
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from config import settings
+from src.evaluators.hand_evaluator import DECK, evaluate7, hand_category
+
+# Ciegas en céntimos
+STAKES = ((1, 2), (2, 5), (5, 10), (10, 25))
+TABLE_NAMES = (
+    "Sirona", "Esclangona", "Achernar", "Donati", "Kallisto", "Menkar", "Alcyone", "Theodora", "Wezen",
+    "Zosma", "Bellatrix", "Naos", "Merope", "Gienah", "Hadar", "Lesath", "Mirach", "Sadira",
+)
+SYLLABLES = ("ka", "lo", "mi", "ra", "to", "ne", "vi", "sa", "du", "pe", "zo", "li", "ba", "gor", "tex", "fin")
+CATEGORY_NAMES = {
+    "HIGH_CARD": "carta alta", "PAIR": "una pareja", "TWO_PAIR": "doble pareja",
+    "THREE_OF_A_KIND": "trío", "STRAIGHT": "escalera", "FLUSH": "color", "FULL_HOUSE": "full",
+    "FOUR_OF_A_KIND": "póquer", "STRAIGHT_FLUSH": "escalera de color",
+}
+FOLD_LABELS = {"preflop": "antes del Flop", "flop": "en el Flop", "turn": "en el Turn", "river": "en el River"}
+POSITION_LABELS = {"BTN": " (botón)", "SB": " (ciega pequeña)", "BB": " (ciega grande)"}
+# Ficheros de sesión abiertos a la vez al escribir un corpus
+MAX_OPEN_FILES = 32
+
+
+def money(cents: int) -> str:
+    # Igual que el cliente: "2 €", "0.02 €", "3.65 €"
+    return str(cents // 100) if cents % 100 == 0 else f"{cents / 100:.2f}"
+
+
+class _Player:
+    __slots__ = ("name", "seat", "stack", "sitting_out", "cards", "bet", "total", "folded", "all_in", "fold_street")
+
+    def __init__(self, name: str, seat: int, stack: int):
+        self.name = name
+        self.seat = seat
+        self.stack = stack
+        self.sitting_out = False
+
+    def reset(self):
+        self.cards = None
+        self.bet = 0
+        self.total = 0
+        self.folded = False
+        self.all_in = False
+        self.fold_street = None
+
+
+class _Table:
+    def __init__(self, name: str, size: int, stakes, zoom: bool, hands_left: int, opened: datetime):
+        self.name = name
+        self.size = size
+        self.sb, self.bb = stakes
+        self.zoom = zoom
+        self.hands_left = hands_left
+        self.opened = opened
+        self.seats = {}
+        self.button = None
+
+    @property
+    def filename(self) -> str:
+        kind = "Zoom " if self.zoom else ""
+        return (f"HH{self.opened:%Y%m%d} {kind}{self.name} - {money(self.sb)}-{money(self.bb)} - "
+                f"EUR No Limit Hold'em.txt")
+
+
+class HandHistoryGenerator:
+    """Genera historiales sintéticos de PokerStars (idioma español) deterministas a partir de una semilla.
+
+    Simula mesas de cash con stacks que evolucionan entre manos, ciegas, acciones
+    en todas las calles, all-ins con botes secundarios, apuestas no igualadas,
+    jugadores ausentes, entradas y salidas de la mesa y mesas Zoom.
+    """
+
+    def __init__(self, seed: int = 0, hero_name: str = settings.POKERSTARS_HERO_NAME, table_sizes=(6,),
+                 zoom_ratio: float = 0.25, tables: int = 4, sitout_rate: float = 0.03, stakes=STAKES):
+        self.rng = random.Random(seed)
+        self.hero_name = hero_name
+        self.table_sizes = tuple(table_sizes)
+        self.zoom_ratio = zoom_ratio
+        self.n_tables = tables
+        self.sitout_rate = sitout_rate
+        self.stakes = tuple(stakes)
+        self.next_id = 400_000_000_000 + (seed % 1000) * 100_000_000
+        self.clock = datetime(2025, 1, 1, 18, 0, 0) + timedelta(days=seed % 365)
+        self.names = self._make_names(4000)
+        self.tables = []
+
+    def _make_names(self, n: int) -> list:
+        names = set()
+        while len(names) < n:
+            name = "".join(self.rng.choice(SYLLABLES) for _ in range(self.rng.randint(2, 4)))
+            if self.rng.random() < 0.5:
+                name += str(self.rng.randint(1, 999))
+            if self.rng.random() < 0.3:
+                name = name.capitalize()
+            if self.rng.random() < 0.02:
+                name += " " + "".join(self.rng.choice(SYLLABLES) for _ in range(2)).capitalize()
+            if name != self.hero_name:
+                names.add(name)
+        return sorted(names)
+
+    # -------------------
+    # Mesas y jugadores
+    # -------------------
+    def _open_table(self) -> _Table:
+        table = _Table(
+            name=self.rng.choice(TABLE_NAMES) + (f" {self.rng.choice('IVX') * self.rng.randint(1, 3)}" if self.rng.random() < 0.3 else ""),
+            size=self.rng.choice(self.table_sizes),
+            stakes=self.rng.choice(self.stakes),
+            zoom=self.rng.random() < self.zoom_ratio,
+            hands_left=self.rng.randint(50, 400),
+            opened=self.clock,
+        )
+        hero_seat = self.rng.randint(1, table.size)
+        table.seats[hero_seat] = _Player(self.hero_name, hero_seat, self._buy_in(table))
+        self._fill_seats(table, min_players=self.rng.randint(2, table.size))
+        return table
+
+    def _buy_in(self, table: _Table) -> int:
+        return table.bb * self.rng.choice((20, 40, 50, 75, 100, 100, 100, 120, 150, 200))
+
+    def _fill_seats(self, table: _Table, min_players: int) -> list:
+        seated = {p.name for p in table.seats.values()}
+        joined = []
+        free = [s for s in range(1, table.size + 1) if s not in table.seats]
+        self.rng.shuffle(free)
+        while free and len(table.seats) < min_players:
+            name = self.rng.choice(self.names)
+            if name in seated:
+                continue
+            seat = free.pop()
+            table.seats[seat] = _Player(name, seat, self._buy_in(table))
+            seated.add(name)
+            joined.append(table.seats[seat])
+        return joined
+
+    def _prepare_table(self, table: _Table) -> list:
+        """Cambios entre manos: recompras, jugadores que se van, ausencias y nuevos jugadores."""
+        for seat, player in list(table.seats.items()):
+            if player.name == self.hero_name:
+                if player.stack < table.bb * 10:
+                    player.stack = self._buy_in(table)
+                player.sitting_out = self.rng.random() < self.sitout_rate
+                continue
+            if player.stack == 0 or (table.zoom and self.rng.random() < 0.8) or self.rng.random() < 0.02:
+                del table.seats[seat]
+            elif player.stack < table.bb * 15 and self.rng.random() < 0.5:
+                player.stack = self._buy_in(table)
+            elif player.sitting_out:
+                player.sitting_out = self.rng.random() < 0.6
+            else:
+                player.sitting_out = self.rng.random() < self.sitout_rate
+        target = table.size if table.zoom else max(2, min(table.size, len(table.seats) + self.rng.randint(-1, 1)))
+        return self._fill_seats(table, target)
+
+    # -------------------
+    # Una mano
+    # -------------------
+    def hands(self, count: int):
+        """Genera count manos como tuplas (nombre de fichero, texto de la mano)."""
+        for _ in range(count):
+            while len(self.tables) < self.n_tables:
+                self.tables.append(self._open_table())
+            table = self.rng.choice(self.tables)
+            text = self._play_hand(table)
+            table.hands_left -= 1
+            if table.hands_left <= 0:
+                self.tables.remove(table)
+            yield table.filename, text
+
+    def _play_hand(self, table: _Table) -> str:
+        rng = self.rng
+        self._prepare_table(table)
+        self.clock += timedelta(seconds=rng.randint(5, 45))
+        hand_id = self.next_id
+        self.next_id += rng.randint(1, 40)
+
+        seated = sorted(table.seats.values(), key=lambda p: p.seat)
+        for p in seated:
+            p.reset()
+        active = [p for p in seated if not p.sitting_out and p.stack > 0]
+        if len(active) < 2:
+            # Sin rivales: alguien vuelve a sentarse
+            for p in seated:
+                p.sitting_out = False
+            active = [p for p in seated if p.stack > 0]
+
+        # Botón y ciegas
+        seats = [p.seat for p in active]
+        if table.button is None or table.button not in seats:
+            table.button = rng.choice(seats)
+        else:
+            table.button = seats[(seats.index(table.button) + 1) % len(seats)]
+        b = seats.index(table.button)
+        order = active[b + 1:] + active[:b + 1]   # del primero tras el botón al botón
+        if len(active) == 2:
+            sb_player, bb_player = order[1], order[0]
+        else:
+            sb_player, bb_player = order[0], order[1]
+        positions = {table.button: "BTN", sb_player.seat: "SB", bb_player.seat: "BB"}
+
+        header = "Zoom de PokerStars" if table.zoom else "PokerStars"
+        currency = "" if table.zoom else " EUR"
+        et = self.clock - timedelta(hours=6)
+        lines = [
+            f"Mano n.º {hand_id} de {header}:  Hold'em No Limit ({money(table.sb)} €/{money(table.bb)} €{currency}) - "
+            f"{self.clock:%d-%m-%Y %H:%M:%S} CET [{et:%d-%m-%Y %H:%M:%S} ET]",
+            f'Mesa "{table.name}" {table.size}-max El asiento n.º {table.button} es el botón',
+        ]
+        for p in seated:
+            lines.append(f"Asiento {p.seat}: {p.name} ({money(p.stack)} € en fichas) " + ("está ausente" if p.sitting_out else ""))
+
+        deck = list(range(52))
+        rng.shuffle(deck)
+        for p in active:
+            p.cards = (deck.pop(), deck.pop())
+
+        for player, label, amount in ((sb_player, "pequeña", table.sb), (bb_player, "grande", table.bb)):
+            self._put(player, amount)
+            lines.append(f"{player.name}: pone la ciega {label} {money(player.bet)} €" + (" y está all-in" if player.all_in else ""))
+        for p in seated:
+            if p.sitting_out and rng.random() < 0.3:
+                lines.append(f"{p.name}: está ausente ")
+        if not table.zoom and len(table.seats) < table.size and rng.random() < 0.05:
+            free = [s for s in range(1, table.size + 1) if s not in table.seats]
+            newcomer = rng.choice(self.names)
+            if newcomer not in {p.name for p in seated}:
+                seat = rng.choice(free)
+                lines.append(f"{newcomer} se une a la mesa en el asiento n.º {seat} ")
+                table.seats[seat] = _Player(newcomer, seat, self._buy_in(table))
+
+        lines.append("*** CARTAS DE MANO ***")
+        hero = next((p for p in active if p.name == self.hero_name), None)
+        if hero:
+            lines.append(f"Repartidas a {hero.name} [{DECK[hero.cards[0]]} {DECK[hero.cards[1]]}]")
+
+        # Preflop habla primero el de después de la ciega grande; después, el primero tras el botón
+        i = order.index(bb_player)
+        preflop_order = order[i + 1:] + order[:i + 1]
+
+        board = []
+        self._betting_round(table, preflop_order, "preflop", lines, current=bb_player.bet)
+        for street, n_cards in (("flop", 3), ("turn", 1), ("river", 1)):
+            if sum(not p.folded for p in active) < 2:
+                break
+            new_cards = [deck.pop() for _ in range(n_cards)]
+            if street == "flop":
+                lines.append(f"*** FLOP *** [{' '.join(DECK[c] for c in new_cards)}]")
+            else:
+                lines.append(f"*** {street.upper()} *** [{' '.join(DECK[c] for c in board)}] [{DECK[new_cards[0]]}]")
+            board += new_cards
+            for p in active:
+                p.bet = 0
+            if sum(not p.folded and not p.all_in for p in active) >= 2:
+                self._betting_round(table, order, street, lines, current=0)
+
+        return "\n".join(self._finish_hand(table, seated, active, board, positions, lines))
+
+    def _put(self, player: _Player, amount: int) -> int:
+        amount = min(amount, player.stack)
+        player.stack -= amount
+        player.bet += amount
+        player.total += amount
+        if player.stack == 0:
+            player.all_in = True
+        return amount
+
+    def _betting_round(self, table: _Table, order: list, street: str, lines: list, current: int) -> None:
+        rng = self.rng
+        last_raise = table.bb
+        acted = set()
+        idx = 0
+        while True:
+            live = [p for p in order if not p.folded]
+            if len(live) < 2:
+                break
+            pending = [p for p in live if not p.all_in and (p.seat not in acted or p.bet < current)]
+            if not pending:
+                break
+            p = order[idx % len(order)]
+            idx += 1
+            if p.folded or p.all_in or (p.seat in acted and p.bet >= current):
+                continue
+            acted.add(p.seat)
+            to_call = current - p.bet
+            pot = sum(q.total for q in order)
+            roll = rng.random()
+
+            if to_call == 0:
+                if roll < 0.6 or (street == "preflop" and roll < 0.8):
+                    lines.append(f"{p.name}: pasa ")
+                    continue
+                target = max(table.bb, int(pot * rng.uniform(0.33, 1.0)))
+                if roll > 0.97:
+                    target = p.stack
+                amount = self._put(p, target)
+                current = p.bet
+                last_raise = max(last_raise, amount)
+                acted = {p.seat}
+                lines.append(f"{p.name}: apuesta {money(amount)} €" + (" y está all-in" if p.all_in else ""))
+                continue
+
+            fold_chance = 0.55 if street == "preflop" else 0.4
+            if roll < fold_chance:
+                p.folded = True
+                p.fold_street = street
+                lines.append(f"{p.name}: se retira ")
+                if not table.zoom and p.name != self.hero_name and rng.random() < 0.01:
+                    lines.append(f"{p.name} deja la mesa")
+                    table.seats.pop(p.seat, None)
+                continue
+            if roll < fold_chance + 0.33 or p.stack <= to_call:
+                amount = self._put(p, to_call)
+                lines.append(f"{p.name}: iguala {money(amount)} €" + (" y está all-in" if p.all_in else ""))
+                continue
+
+            # Subida: mínimo una subida completa; a veces all-in
+            target = current + max(last_raise, int((pot + to_call) * rng.uniform(0.5, 1.2)))
+            if roll > 0.96:
+                target = p.bet + p.stack
+            self._put(p, target - p.bet)
+            if p.bet <= current:
+                lines.append(f"{p.name}: iguala {money(p.bet - (current - to_call))} € y está all-in")
+                continue
+            last_raise = max(last_raise, p.bet - current)
+            lines.append(f"{p.name}: sube {money(p.bet - current)} € a {money(p.bet)} €" + (" y está all-in" if p.all_in else ""))
+            current = p.bet
+            acted = {p.seat}
+
+        # La parte de la apuesta más alta que nadie igualó vuelve a su dueño
+        bets = sorted((q.bet for q in order), reverse=True)
+        if len(bets) > 1 and bets[0] > bets[1]:
+            top = max(order, key=lambda q: q.bet)
+            returned = bets[0] - bets[1]
+            top.bet -= returned
+            top.total -= returned
+            top.stack += returned
+            top.all_in = top.all_in and returned == 0
+            lines.append(f"La apuesta no igualada ({money(returned)} €) ha sido devuelta a {top.name}")
+
+    def _finish_hand(self, table: _Table, seated: list, active: list, board: list, positions: dict, lines: list) -> list:
+        rng = self.rng
+        contenders = [p for p in active if not p.folded]
+        total_pot = sum(p.total for p in active)
+        rake = min((total_pot * 5 + 99) // 100, table.bb * 12) if board else 0
+
+        # Botes por niveles de aportación: el principal y uno secundario por cada all-in menor
+        pots = []
+        levels = sorted({p.total for p in contenders})
+        previous = 0
+        for level in levels:
+            amount = sum(min(p.total, level) - min(p.total, previous) for p in active)
+            eligible = [p for p in contenders if p.total >= level]
+            if amount:
+                if pots and pots[-1][1] == eligible:
+                    pots[-1][0] += amount
+                else:
+                    pots.append([amount, eligible])
+            previous = level
+        # Fichas de jugadores retirados por encima del último nivel (no debería quedar nada)
+        leftover = total_pot - sum(amount for amount, _ in pots)
+        if leftover:
+            pots[-1][0] += leftover
+        # La comisión se reparte entre los botes en proporción a su tamaño
+        cuts = [rake * amount // total_pot for amount, _ in pots]
+        cuts[max(range(len(pots)), key=lambda n: pots[n][0])] += rake - sum(cuts)
+        for pot, cut in zip(pots, cuts):
+            pot[0] -= cut
+
+        winnings = {}
+        showdown = len(contenders) > 1
+        values = {p.seat: evaluate7(list(p.cards) + board) for p in contenders} if showdown else {}
+        if showdown:
+            lines.append("*** SHOW DOWN ***")
+            for p in contenders:
+                lines.append(f"{p.name}: muestra [{DECK[p.cards[0]]} {DECK[p.cards[1]]}] "
+                             f"({CATEGORY_NAMES[hand_category(values[p.seat])]})")
+
+        for n, (amount, eligible) in enumerate(pots):
+            if showdown:
+                best = max(values[p.seat] for p in eligible)
+                winners = [p for p in eligible if values[p.seat] == best]
+            else:
+                winners = eligible
+            share, remainder = divmod(amount, len(winners))
+            label = "" if len(pots) == 1 else ("principal" if n == 0 else f"secundario{'-' + str(n) if len(pots) > 2 else ''}")
+            for k, w in enumerate(winners):
+                won = share + (1 if k < remainder else 0)
+                winnings[w.seat] = winnings.get(w.seat, 0) + won
+                w.stack += won
+                lines.append(f"{w.name} se lleva {money(won)} € del bote {label}")
+        if not showdown and rng.random() < 0.7:
+            lines.append(f"{contenders[0].name}: no muestra su mano ")
+
+        lines.append("*** RESUMEN ***")
+        if len(pots) == 1:
+            lines.append(f"Bote total {money(total_pot)} € | Comisión {money(rake)} € ")
+        else:
+            parts = [f"Bote total {money(total_pot)} € Bote principal {money(pots[0][0])} €."]
+            for n, (amount, _) in enumerate(pots[1:], start=1):
+                suffix = f"-{n}" if len(pots) > 2 else ""
+                parts.append(f"Bote secundario{suffix} {money(amount)} €.")
+            lines.append(" ".join(parts) + f" | Comisión {money(rake)} € ")
+        if board:
+            lines.append(f"Comunitarias [{' '.join(DECK[c] for c in board)}]")
+
+        for p in seated:
+            prefix = f"Asiento {p.seat}: {p.name}"
+            if p.sitting_out or p.cards is None:
+                lines.append(prefix)
+                continue
+            prefix += POSITION_LABELS.get(positions.get(p.seat), "")
+            if p.folded:
+                no_bet = " (no apostó)" if p.fold_street == "preflop" and p.total == 0 else ""
+                lines.append(f"{prefix} se retiró {FOLD_LABELS[p.fold_street]}{no_bet}")
+            elif not showdown:
+                lines.append(f"{prefix} recaudó ({money(winnings.get(p.seat, 0))} €)")
+            else:
+                cards = f"[{DECK[p.cards[0]]} {DECK[p.cards[1]]}]"
+                category = CATEGORY_NAMES[hand_category(values[p.seat])]
+                if p.seat in winnings:
+                    lines.append(f"{prefix} muestra {cards} y ganó ({money(winnings[p.seat])} €) con {category}")
+                else:
+                    lines.append(f"{prefix} muestra {cards} y perdió con {category}")
+        return lines
+
+
+def generate_hands(count: int, seed: int = 0, **options):
+    """Textos de count manos generadas con la semilla dada."""
+    for _, text in HandHistoryGenerator(seed, **options).hands(count):
+        yield text
+
+
+def write_corpus(out_dir: str, count: int, seed: int = 0, **options) -> list:
+    """Escribe count manos en out_dir, un fichero por sesión de mesa como hace el cliente."""
+    os.makedirs(out_dir, exist_ok=True)
+    # Las sesiones se intercalan: solo quedan abiertos los MAX_OPEN_FILES ficheros usados más recientemente
+    handles = OrderedDict()
+    written = set()
+    try:
+        for filename, text in HandHistoryGenerator(seed, **options).hands(count):
+            f = handles.pop(filename, None)
+            if f is None:
+                if len(handles) >= MAX_OPEN_FILES:
+                    handles.popitem(last=False)[1].close()
+                f = open(os.path.join(out_dir, filename), 'a', encoding='utf-8')
+                written.add(filename)
+            handles[filename] = f
+            f.write(text + "\n\n\n")
+    finally:
+        for f in handles.values():
+            f.close()
+    return sorted(written)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Genera historiales de manos sintéticos de PokerStars.")
+    arg_parser.add_argument("--out", required=True, help="Carpeta de salida")
+    arg_parser.add_argument("--hands", type=int, default=10000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--tables", type=int, default=4, help="Mesas abiertas a la vez")
+    arg_parser.add_argument("--sizes", default="6", help="Tamaños de mesa separados por comas (2-9)")
+    arg_parser.add_argument("--zoom", type=float, default=0.25, help="Proporción de mesas Zoom")
+    arg_parser.add_argument("--hero", default=settings.POKERSTARS_HERO_NAME)
+    args = arg_parser.parse_args()
+
+    sizes = tuple(int(s) for s in args.sizes.split(","))
+    if any(s < 2 or s > 9 for s in sizes):
+        arg_parser.error("Los tamaños de mesa deben estar entre 2 y 9")
+    written = write_corpus(args.out, args.hands, seed=args.seed, hero_name=args.hero, table_sizes=sizes,
+                           tables=args.tables, zoom_ratio=args.zoom)
+    print(f"✅ {args.hands} manos escritas en {len(written)} ficheros de {args.out}")
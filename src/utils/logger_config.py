@@ -1,32 +1,135 @@
+import atexit
 import os
+import multiprocessing
+import queue
 from datetime import datetime
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 from config import settings
 
-def setup_logging():
+# Logger padre de las trazas de debug de cada mano (uno hijo por módulo)
+HAND_TRACE_LOGGER = "hand_trace"
+
+_handlers = []
+_listeners = []
+_worker_queue = None
+
+
+class ThreadQueueHandler(QueueHandler):
+    """QueueHandler para la cola en memoria del propio proceso.
+
+    Solo resuelve el mensaje con sus argumentos, que pueden cambiar después; el
+    formato de la línea y la escritura en disco se hacen en el hilo del listener.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def get_hand_trace_logger(name: str) -> logging.Logger:
+    """Logger para el debug de cada mano; se activa o silencia con set_hand_trace()."""
+    return logging.getLogger(f"{HAND_TRACE_LOGGER}.{name}")
+
+
+def set_hand_trace(enabled: bool) -> None:
+    # Con las trazas apagadas, el debug de cada mano se descarta sin formatear sus argumentos
+    logging.getLogger(HAND_TRACE_LOGGER).setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+def setup_logging(debug: bool = None, hand_trace: bool = None):
+    """Configura los logs: el diario (INFO) y, si debug, un fichero de debug por ejecución.
+
+    Los módulos solo encolan los registros; un QueueListener los escribe en
+    segundo plano. Llamarla de nuevo no hace nada.
+    """
+    if _listeners:
+        return
+    debug = settings.LOG_DEBUG if debug is None else debug
+    hand_trace = settings.LOG_HAND_TRACE if hand_trace is None else hand_trace
 
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    set_hand_trace(debug and hand_trace)
 
     curr_date = datetime.now().strftime("%Y%m%d")
     curr_datetime = datetime.now().strftime("%Y%m%d%H%M")
 
+    os.makedirs(settings.LOGS_DIR, exist_ok=True)
     path_log = os.path.join(settings.LOGS_DIR, f"{curr_date}.log")
 
-    # Crear subcarpeta por fecha para los logs de debug
-    debug_subdir = os.path.join(settings.DEBUG_DIR, curr_date)
-    os.makedirs(debug_subdir, exist_ok=True)
-    path_debug = os.path.join(debug_subdir, f"{curr_datetime}.log")
-
     formatter = logging.Formatter(fmt="%(asctime)s - %(levelname)s - %(name)s: %(message)s", datefmt="%Y-%m-%d | %H:%M")
 
     log_handler = logging.FileHandler(path_log, encoding="utf-8")
     log_handler.setLevel(logging.INFO)
     log_handler.setFormatter(formatter)
-    logger.addHandler(log_handler)
+    _handlers.append(log_handler)
 
-    debug_handler = logging.FileHandler(path_debug, encoding="utf-8")
-    debug_handler.setLevel(logging.DEBUG)
-    debug_handler.setFormatter(formatter)
-    logger.addHandler(debug_handler)
\ No newline at end of file
+    if debug:
+        # Crear subcarpeta por fecha para los logs de debug
+        debug_subdir = os.path.join(settings.DEBUG_DIR, curr_date)
+        os.makedirs(debug_subdir, exist_ok=True)
+        path_debug = os.path.join(debug_subdir, f"{curr_datetime}.log")
+
+        debug_handler = logging.FileHandler(path_debug, encoding="utf-8")
+        debug_handler.setLevel(logging.DEBUG)
+        debug_handler.setFormatter(formatter)
+        _handlers.append(debug_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(ThreadQueueHandler(log_queue))
+    _start_listener(log_queue)
+    atexit.register(shutdown_logging)
+
+
+def _start_listener(log_queue) -> None:
+    listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+def shutdown_logging() -> None:
+    """Escribe los registros pendientes y cierra los ficheros de log."""
+    global _worker_queue
+    for listener in _listeners:
+        listener.stop()
+    _listeners.clear()
+    logger = logging.getLogger()
+    for handler in logger.handlers[:]:
+        if isinstance(handler, ThreadQueueHandler):
+            logger.removeHandler(handler)
+    for handler in _handlers:
+        handler.close()
+    _handlers.clear()
+    if _worker_queue is not None:
+        _worker_queue.close()
+        _worker_queue = None
+
+
+def worker_logging_config():
+    """Argumentos de setup_worker_logging para los procesos del pool (None sin setup_logging)."""
+    global _worker_queue
+    if not _handlers:
+        return None
+    if _worker_queue is None:
+        # Cola entre procesos con su propio listener sobre los mismos ficheros
+        _worker_queue = multiprocessing.Queue()
+        _start_listener(_worker_queue)
+    return _worker_queue, logging.getLogger().level, logging.getLogger(HAND_TRACE_LOGGER).level
+
+
+def setup_worker_logging(config) -> None:
+    """Envía los logs de un proceso del pool a la cola del proceso principal."""
+    logger = logging.getLogger()
+    # Con fork se hereda el handler de la cola en memoria, que nadie lee en este proceso
+    for handler in logger.handlers[:]:
+        if isinstance(handler, ThreadQueueHandler):
+            logger.removeHandler(handler)
+    if config is None:
+        return
+    worker_queue, level, trace_level = config
+    logger.setLevel(level)
+    logging.getLogger(HAND_TRACE_LOGGER).setLevel(trace_level)
+    logger.addHandler(QueueHandler(worker_queue))
@@ -0,0 +1,291 @@
+import cProfile
+import io
+import json
+import logging
+import math
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+metrics_logger = logging.getLogger(__name__)
+
+# Líneas de los informes de cProfile y tracemalloc por etapa
+PROFILE_TOP = 40
+
+
+class Timer(object):
+    """Tiempo acumulado de una operación: número de veces, total, mínimo y máximo."""
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds: float, count: int = 1) -> None:
+        # Con count > 1 el tiempo es de un lote: min y max usan la media del lote
+        per_item = seconds / count if count else seconds
+        self.count += count
+        self.total += seconds
+        if per_item < self.min:
+            self.min = per_item
+        if per_item > self.max:
+            self.max = per_item
+
+    def merge(self, data: dict) -> None:
+        self.count += data["count"]
+        self.total += data["total"]
+        self.min = min(self.min, data["min"])
+        self.max = max(self.max, data["max"])
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class Histogram(object):
+    """Distribución de valores en cubos de potencias de dos (cubo e: valores <= 2**e)."""
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets = defaultdict(int)
+
+    def observe(self, value) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.buckets[None] += 1
+        else:
+            mantissa, exponent = math.frexp(value)
+            self.buckets[exponent - 1 if mantissa == 0.5 else exponent] += 1
+
+    def merge(self, data: dict) -> None:
+        self.count += data["count"]
+        self.total += data["total"]
+        self.min = min(self.min, data["min"])
+        self.max = max(self.max, data["max"])
+        for exponent, count in data["buckets"].items():
+            self.buckets[exponent] += count
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0,
+            "max": self.max if self.count else 0,
+            "buckets": dict(self.buckets),
+        }
+
+
+class Metrics(object):
+    """Contadores, timers e histogramas del proceso, con volcado a JSON y tabla resumen.
+
+    Los procesos del pool de parseo tienen su propia instancia; sus valores se
+    recogen con drain() y se suman a los del proceso principal con merge().
+    """
+
+    def __init__(self):
+        self.started = datetime.now()
+        self.counters = defaultdict(int)
+        self.gauges = {}
+        self.timers = defaultdict(Timer)
+        self.histograms = defaultdict(Histogram)
+        # Funciones que devuelven contadores ajenos (p. ej. aciertos de cachés) al hacer snapshot
+        self.collectors = []
+        self.profile_dir = None
+
+    def reset(self) -> None:
+        self.started = datetime.now()
+        self.counters.clear()
+        self.gauges.clear()
+        self.timers.clear()
+        self.histograms.clear()
+
+    def init_worker(self) -> None:
+        """Estado limpio en un proceso hijo: con fork hereda valores, cProfile y tracemalloc del principal."""
+        self.reset()
+        self.profile_dir = None
+        sys.setprofile(None)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def gauge(self, name: str, value) -> None:
+        self.gauges[name] = value
+
+    def add_time(self, name: str, seconds: float, count: int = 1) -> None:
+        self.timers[name].add(seconds, count)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name].add(time.perf_counter() - start)
+
+    def observe(self, name: str, value) -> None:
+        self.histograms[name].observe(value)
+
+    def add_collector(self, collector) -> None:
+        self.collectors.append(collector)
+
+    # -------------------
+    # Snapshot, combinación entre procesos y volcado
+    # -------------------
+    def snapshot(self) -> dict:
+        counters = dict(self.counters)
+        for collector in self.collectors:
+            try:
+                counters.update(collector())
+            except Exception as e:
+                metrics_logger.warning(f"Metrics collector failed: {e}")
+        return {
+            "counters": dict(sorted(counters.items())),
+            "gauges": dict(sorted(self.gauges.items())),
+            "timers": {name: t.to_dict() for name, t in sorted(self.timers.items())},
+            "histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+        }
+
+    def drain(self) -> dict:
+        """Devuelve los valores propios (sin collectors) y los pone a cero."""
+        data = {
+            "counters": dict(self.counters),
+            "timers": {name: t.to_dict() for name, t in self.timers.items()},
+            "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+        }
+        self.counters.clear()
+        self.timers.clear()
+        self.histograms.clear()
+        return data
+
+    def merge(self, data: dict) -> None:
+        for name, value in data.get("counters", {}).items():
+            self.counters[name] += value
+        for name, value in data.get("timers", {}).items():
+            if value["count"]:
+                self.timers[name].merge(value)
+        for name, value in data.get("histograms", {}).items():
+            if value["count"]:
+                self.histograms[name].merge(value)
+
+    def dump(self, path: str) -> None:
+        data = {
+            "started": self.started.isoformat(timespec="seconds"),
+            "finished": datetime.now().isoformat(timespec="seconds"),
+            **self.snapshot(),
+        }
+        for histogram in data["histograms"].values():
+            histogram["buckets"] = {
+                ("<=0" if exponent is None else f"<={2.0 ** exponent:g}"): count
+                for exponent, count in sorted(histogram["buckets"].items(), key=lambda b: -math.inf if b[0] is None else b[0])
+            }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def summary(self) -> str:
+        """Tabla de texto con todos los valores, agrupados por tipo."""
+        data = self.snapshot()
+        lines = []
+        if data["timers"]:
+            lines.append(f"{'Timer':<40} {'count':>10} {'total s':>10} {'mean ms':>10} {'max ms':>10}")
+            for name, t in data["timers"].items():
+                lines.append(
+                    f"{name:<40} {t['count']:>10} {t['total']:>10.3f} {t['mean'] * 1000:>10.3f} {t['max'] * 1000:>10.3f}"
+                )
+        if data["histograms"]:
+            lines.append("")
+            lines.append(f"{'Histogram':<40} {'count':>10} {'min':>10} {'mean':>10} {'max':>10}")
+            for name, h in data["histograms"].items():
+                lines.append(f"{name:<40} {h['count']:>10} {h['min']:>10g} {h['mean']:>10.1f} {h['max']:>10g}")
+        if data["counters"] or data["gauges"]:
+            lines.append("")
+            lines.append(f"{'Counter':<40} {'value':>10}")
+            for name, value in {**data["counters"], **data["gauges"]}.items():
+                lines.append(f"{name:<40} {value:>10}" if isinstance(value, int) else f"{name:<40} {value:>10.1f}")
+        return "\n".join(lines)
+
+    def report(self, metrics_dir: str) -> str:
+        """Escribe el resumen en el log y el JSON en metrics_dir. Devuelve la tabla."""
+        table = self.summary()
+        path = os.path.join(metrics_dir, f"{self.started.strftime('%Y%m%d%H%M%S')}.json")
+        self.dump(path)
+        metrics_logger.info(f"Métricas de la ejecución ({path}):\n{table}")
+        return table
+
+    # -------------------
+    # Perfilado por etapas (opcional)
+    # -------------------
+    def enable_profiling(self, profile_dir: str) -> None:
+        """Activa cProfile y tracemalloc en cada stage(); los informes van a profile_dir."""
+        self.profile_dir = profile_dir
+        os.makedirs(profile_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        metrics_logger.info(f"Profiling enabled. Profiles in {profile_dir}")
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mide una etapa de la ejecución y, con el perfilado activo, guarda su perfil.
+
+        Las etapas no deben anidarse: cProfile solo admite un perfilador activo.
+        """
+        profiler = None
+        memory_before = None
+        if self.profile_dir:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.take_snapshot()
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(f"stage.{name}", time.perf_counter() - start)
+            if profiler:
+                profiler.disable()
+                self.write_profile(name, profiler, memory_before)
+
+    def write_profile(self, name: str, profiler: cProfile.Profile, memory_before) -> None:
+        base_path = os.path.join(self.profile_dir, name)
+        profiler.dump_stats(f"{base_path}.prof")
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        with open(f"{base_path}.txt", 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+
+        _, peak = tracemalloc.get_traced_memory()
+        self.gauge(f"stage.{name}.peak_mb", round(peak / (1024 * 1024), 1))
+        diff = tracemalloc.take_snapshot().compare_to(memory_before, "lineno")
+        with open(f"{base_path}.mem.txt", 'w', encoding='utf-8') as f:
+            f.write(f"Peak traced memory: {peak / (1024 * 1024):.1f} MB\n\n")
+            for stat in diff[:PROFILE_TOP]:
+                f.write(f"{stat}\n")
+        metrics_logger.debug(f"Profile of stage {name} saved to {base_path}.prof")
+
+
+# Instancia compartida del proceso
+metrics = Metrics()